@@ -2,24 +2,77 @@
 Admin configuration for problems app.
 """
 
-from django.contrib import admin
+from django.contrib import admin, messages
 
-from .models import Problem, Submission
+from .models import Problem, ProblemTestData, Submission, Tag
+from .services.judge_queue import JudgeQueue
+from .services.rejudge_service import RejudgeService
+from .services.search_service import ProblemSearchService
 
 
 @admin.register(Problem)
 class ProblemAdmin(admin.ModelAdmin):
     list_display = ["title", "difficulty", "created_by", "created_at"]
+    list_select_related = ["created_by"]
     list_filter = ["difficulty", "created_at"]
     search_fields = ["title", "description"]
     prepopulated_fields = {"slug": ("title",)}
     ordering = ["-created_at"]
+    actions = ["rejudge_stale_submissions", "rejudge_all_submissions"]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the indexed search instead of ILIKE over every description.
+        if not search_term.strip():
+            return queryset, False
+        return ProblemSearchService.search(queryset, search_term), False
+
+    def _queue_rejudge(self, request, problems):
+        from .tasks import start_rejudge
+
+        # The scan runs on a worker too; the request only queues it.
+        stale = 0
+        for problem in problems:
+            start_rejudge.apply_async((problem.id,), queue=JudgeQueue.get_queue("rejudge"))
+            stale += RejudgeService.get_progress(problem)["stale"]
+        self.message_user(
+            request,
+            f"Rejudging {stale} stale submissions of {len(problems)} problems. "
+            "Run `manage.py rejudge --progress SLUG` to follow it.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Rejudge stale submissions")
+    def rejudge_stale_submissions(self, request, queryset):
+        self._queue_rejudge(request, list(queryset))
+
+    @admin.action(description="Rejudge all submissions")
+    def rejudge_all_submissions(self, request, queryset):
+        problems = list(queryset)
+        for problem in problems:
+            RejudgeService.bump_tests_version(problem)
+        self._queue_rejudge(request, problems)
 
 
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ["user", "problem", "language", "status", "submitted_at"]
+    list_select_related = ["user", "problem"]
     list_filter = ["status", "language", "submitted_at"]
     search_fields = ["user__username", "problem__title"]
     ordering = ["-submitted_at"]
     readonly_fields = ["submitted_at"]
+
+
+@admin.register(ProblemTestData)
+class ProblemTestDataAdmin(admin.ModelAdmin):
+    list_display = ["problem", "case_count", "size_bytes", "version", "updated_at"]
+    list_select_related = ["problem"]
+    search_fields = ["problem__title"]
+    readonly_fields = ["pack_path", "case_count", "size_bytes", "version", "updated_at"]
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ["name", "problem_count"]
+    search_fields = ["name"]
+    readonly_fields = ["problem_count"]
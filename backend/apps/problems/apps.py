@@ -2,9 +2,32 @@
 Problems application configuration.
 """
 
+import functools
+
 from django.apps import AppConfig
 
 
 class ProblemsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.problems"
+
+    def ready(self):
+        from core.health import register_check
+        from core.metrics import registry
+
+        from . import signals  # noqa: F401
+        from .services.judge_queue import JudgeQueue
+        from .services.judge_service import JudgeService
+
+        registry.register_gauge(
+            "judge_queue_depth",
+            "Judge tasks waiting in the broker, by priority.",
+            functools.partial(JudgeQueue.get_gauge, "depth"),
+        )
+        registry.register_gauge(
+            "judge_queue_oldest_age_seconds",
+            "How long the next judge task in line has been waiting, by priority.",
+            functools.partial(JudgeQueue.get_gauge, "oldest_age_s"),
+        )
+        # The web tier can still serve reads without judges, so this only degrades.
+        register_check("judge", JudgeService.check_heartbeat, critical=False)
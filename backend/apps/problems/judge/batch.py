@@ -0,0 +1,153 @@
+"""
+Batched runs: all of a submission's test cases through one sandboxed runner.
+
+``BatchRun`` starts the language's runner once, under the same limits as a
+cold run. The runner loads the program once and, for each test, forks a
+child that runs it with that test's input and output files as its standard
+streams, so the interpreter start-up and the compile are paid once per
+submission instead of once per test. The caller stops at the first failing
+test.
+
+Each child is as isolated as a warm run (see ``interpreters``): it closes
+the runner's control pipes before the program starts, so the program cannot
+forge answers, and it exits with its test, taking any state the program
+changed with it. The runner times and measures the child. Expected outputs
+stay in the worker: packs are readable only by their owner, and the pack
+directory is hidden from the program's mount namespace (see ``sandbox``).
+A runner that stops answering is killed and started again for the next
+test. Like the executor, this module runs in the pool's
+worker processes and must not import Django.
+"""
+
+import json
+import os
+import select
+import subprocess
+import sys
+
+from .interpreters import REPLY_GRACE_SECONDS, RUNNER_DIR
+from .sandbox import (
+    SOURCE_FILENAMES,
+    RunResult,
+    _apply_limits,
+    _kill_group,
+    read_output,
+    runner_request,
+    sandbox_env,
+    stream_paths,
+    write_input,
+)
+
+BATCH_RUNNERS = {
+    "python": [
+        sys.executable,
+        "-I",
+        "-S",
+        "-B",
+        os.path.join(RUNNER_DIR, "python_runner.py"),
+        "batch",
+    ],
+}
+
+# The runner forks a child per test.
+SUPPORTED = hasattr(os, "fork")
+
+
+def supports(language):
+    return SUPPORTED and language in BATCH_RUNNERS
+
+
+class BatchRun:
+    """One runner process serving a submission's tests, one at a time."""
+
+    def __init__(self, language, workdir, limits, test_count):
+        source = os.path.join(workdir, SOURCE_FILENAMES[language])
+        self.command = BATCH_RUNNERS[language] + [source, workdir]
+        self.workdir = workdir
+        self.limits = limits
+        self.paths = stream_paths(workdir)
+        self.request = runner_request(workdir, source, limits)
+        # The kernel's backstop for the runner itself; each child gets its own limit.
+        self.total_cpu_seconds = self.request["cpu_seconds"] * max(test_count, 1)
+        self.process = None
+
+    def _start(self):
+        commands_read, commands_write = os.pipe()
+        replies_read, replies_write = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                self.command + [str(commands_read), str(replies_write)],
+                cwd=self.workdir,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(commands_read, replies_write),
+                env=sandbox_env(),
+                preexec_fn=_apply_limits(self.limits, self.total_cpu_seconds, runs_code=False),
+                start_new_session=True,
+            )
+        except BaseException:
+            os.close(commands_write)
+            os.close(replies_read)
+            raise
+        finally:
+            os.close(commands_read)
+            os.close(replies_write)
+        self._commands = os.fdopen(commands_write, "wb", buffering=0)
+        self._replies = os.fdopen(replies_read, "rb")
+        # Wait until the program is loaded. A runner that never gets there
+        # fails the first test, by timing out or by being gone.
+        ready, _, _ = select.select([self._replies], [], [], REPLY_GRACE_SECONDS)
+        if ready:
+            self._replies.readline()
+
+    def _stop(self):
+        """Kill and reap the runner; return its exit code."""
+        process = self.process
+        self.process = None
+        _kill_group(process.pid)
+        process.wait()
+        self._commands.close()
+        self._replies.close()
+        return process.returncode
+
+    def _request(self):
+        """Send the next test to the runner and return its answer, or None."""
+        try:
+            self._commands.write(json.dumps(self.request).encode() + b"\n")
+        except BrokenPipeError:
+            return None
+        timeout = self.limits.time_limit + REPLY_GRACE_SECONDS
+        ready, _, _ = select.select([self._replies], [], [], timeout)
+        line = self._replies.readline() if ready else b""
+        return json.loads(line) if line else None
+
+    def run(self, stdin_data):
+        """Run the next test with ``stdin_data`` on stdin."""
+        write_input(self.paths, stdin_data)
+        if self.process is None:
+            self._start()
+        reply = self._request()
+        if reply is None:
+            # The runner died or hung, which the program cannot cause from its
+            # child; count the test as failed and start afresh for the next one.
+            reply = {
+                "exit_code": self._stop(),
+                "wall_time_ms": int(self.limits.time_limit * 1000),
+                "peak_rss_kb": 0,
+                "timed_out": False,
+            }
+
+        stdout, stderr = read_output(self.paths, self.limits)
+        return RunResult(
+            exit_code=reply["exit_code"],
+            stdout=stdout,
+            stderr=stderr,
+            wall_time_ms=reply["wall_time_ms"],
+            peak_rss_kb=reply["peak_rss_kb"],
+            timed_out=reply["timed_out"],
+        )
+
+    def close(self):
+        if self.process is not None:
+            self._stop()
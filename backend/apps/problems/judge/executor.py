@@ -0,0 +1,132 @@
+"""
+Judge executor - evaluates one submission against its test cases.
+
+This module runs inside the judge pool's worker processes, so it must stay
+free of Django imports: everything it needs arrives as plain arguments.
+"""
+
+import os
+import shutil
+
+from . import batch as batched
+from . import interpreters
+from .sandbox import LANGUAGE_COMMANDS, RunLimits, prepare_workdir
+from .testdata import count_test_cases, iter_test_cases
+
+ACCEPTED = "accepted"
+WRONG_ANSWER = "wrong_answer"
+TIME_LIMIT_EXCEEDED = "time_limit_exceeded"
+MEMORY_LIMIT_EXCEEDED = "memory_limit_exceeded"
+ERROR = "error"
+
+MAX_ERROR_MESSAGE_LENGTH = 2000
+MAX_STDERR_LENGTH = 1000  # the end of a failed run's stderr, shown to the submitter
+
+
+def normalize_output(output):
+    """Ignore trailing whitespace on each line and trailing blank lines."""
+    if isinstance(output, str):
+        output = output.encode("utf-8")
+    return b"\n".join(line.rstrip() for line in bytes(output).rstrip().splitlines())
+
+
+def _verdict(status, runtime, memory, error_message="", test_results=()):
+    return {
+        "status": status,
+        "runtime": runtime,
+        "memory": memory,
+        "error_message": error_message[:MAX_ERROR_MESSAGE_LENGTH],
+        "test_results": list(test_results),
+    }
+
+
+def _clean_stderr(stderr, workdir):
+    """The end of a run's stderr, without the judge's paths or control characters."""
+    stderr = stderr.replace(workdir + os.sep, "")
+    stderr = "".join(char for char in stderr if char.isprintable() or char in "\n\t").strip()
+    if len(stderr) > MAX_STDERR_LENGTH:
+        stderr = "..." + stderr[-MAX_STDERR_LENGTH:]
+    return stderr
+
+
+def _classify_failure(result, limits, test_number, workdir):
+    """Return ``(status, message)`` for a run that did not exit cleanly, else None."""
+    if result.timed_out or result.killed_by_cpu_limit:
+        return TIME_LIMIT_EXCEEDED, f"Time limit exceeded on test {test_number}"
+    if result.peak_rss_kb * 1024 >= limits.memory_limit_bytes or "MemoryError" in result.stderr:
+        return MEMORY_LIMIT_EXCEEDED, f"Memory limit exceeded on test {test_number}"
+    if result.exit_code != 0:
+        stderr = _clean_stderr(result.stderr, workdir)
+        return ERROR, f"Runtime error on test {test_number}:\n{stderr}"
+    return None
+
+
+class _SeparateRuns:
+    """Run every test in a process of its own (forked from a warm template or cold)."""
+
+    def __init__(self, language, command, workdir, limits):
+        self.language = language
+        self.command = command
+        self.workdir = workdir
+        self.limits = limits
+
+    def run(self, stdin_data):
+        return interpreters.run(self.language, self.command, self.workdir, stdin_data, self.limits)
+
+    def close(self):
+        pass
+
+
+def _run_tests(runner, test_cases, limits):
+    runtime = memory = 0
+    test_results = []
+    for test_number, (stdin_data, expected) in enumerate(iter_test_cases(test_cases), start=1):
+        result = runner.run(stdin_data)
+        runtime = max(runtime, result.wall_time_ms)
+        memory = max(memory, result.peak_rss_kb)
+
+        failure = _classify_failure(result, limits, test_number, runner.workdir)
+        if failure is None and normalize_output(result.stdout) != normalize_output(expected):
+            failure = WRONG_ANSWER, f"Wrong answer on test {test_number}"
+        test_results.append(
+            {
+                "test": test_number,
+                "status": failure[0] if failure else ACCEPTED,
+                "runtime": result.wall_time_ms,
+                "memory": result.peak_rss_kb,
+            }
+        )
+        if failure:
+            return _verdict(failure[0], runtime, memory, failure[1], test_results)
+    return _verdict(ACCEPTED, runtime, memory, test_results=test_results)
+
+
+def evaluate(code, language, test_cases, limits=None, batch=False):
+    """
+    Run ``code`` against ``test_cases`` and return the verdict as a dict.
+
+    ``test_cases`` is a pack file path or a sequence of ``(input, expected_output)``
+    pairs. Evaluation stops at the first failing test. ``runtime`` is the
+    slowest test's wall time in milliseconds, ``memory`` the highest peak RSS
+    in KB, and ``test_results`` lists each test that ran with its status,
+    runtime and memory.
+
+    With ``batch``, languages that support it run every test in a single
+    sandboxed process (see ``batch.BatchRun``).
+    """
+    limits = limits or RunLimits()
+    if language not in LANGUAGE_COMMANDS:
+        return _verdict(ERROR, None, None, f"Unsupported language: {language}")
+
+    workdir, command = prepare_workdir(code, language)
+    try:
+        if batch and batched.supports(language):
+            runner = batched.BatchRun(language, workdir, limits, count_test_cases(test_cases))
+        else:
+            runner = _SeparateRuns(language, command, workdir, limits)
+        try:
+            return _run_tests(runner, test_cases, limits)
+        finally:
+            runner.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
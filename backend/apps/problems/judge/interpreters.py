@@ -0,0 +1,165 @@
+"""
+Warm template interpreters for sandboxed runs.
+
+Booting an interpreter for every test run costs tens of milliseconds, more
+than many solutions take, and it inflates their measured runtime. Instead,
+each judge pool worker keeps one already-booted template process per
+language in ``TEMPLATES``. Every run is a child forked from the template
+with the same limits ``sandbox.run_program`` applies, and its wall time
+starts at the fork.
+
+A template is replaced after ``max_runs`` runs and after any run that hit a
+limit. Languages without a template, and runs whose template fails, fall
+back to ``sandbox.run_program``. Like the executor, this module runs in the
+pool's worker processes, one run at a time, and must not import Django.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+
+from .sandbox import (
+    SOURCE_FILENAMES,
+    RunResult,
+    isolate_runner,
+    read_output,
+    run_program,
+    runner_request,
+    sandbox_env,
+    stream_paths,
+    write_input,
+)
+
+logger = logging.getLogger(__name__)
+
+RUNNER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TEMPLATES = {
+    "python": [sys.executable, "-I", "-S", "-B", os.path.join(RUNNER_DIR, "python_runner.py")],
+}
+
+# How much longer than the time limit to wait for a template's answer.
+REPLY_GRACE_SECONDS = 5
+
+_templates = {}
+_max_runs = 0  # 0 disables warm runs
+
+
+class TemplateError(Exception):
+    """The template process failed; the run must be retried without it."""
+
+
+class WarmInterpreter:
+    """A running template process and the runs it has served."""
+
+    def __init__(self, command):
+        self.runs = 0
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=tempfile.gettempdir(),
+            env=sandbox_env(),
+            # The template forks the runs, and each drops to the sandbox user.
+            preexec_fn=isolate_runner,
+            start_new_session=True,
+        )
+
+    def run(self, source, workdir, stdin_data, limits):
+        paths = stream_paths(workdir)
+        write_input(paths, stdin_data)
+
+        request = runner_request(workdir, source, limits)
+        self.runs += 1
+        try:
+            self.process.stdin.write(json.dumps(request).encode() + b"\n")
+            self.process.stdin.flush()
+        except OSError as exc:
+            raise TemplateError("template is gone") from exc
+        reply = self._read_reply(limits.time_limit + REPLY_GRACE_SECONDS)
+
+        stdout, stderr = read_output(paths, limits)
+        return RunResult(
+            exit_code=reply["exit_code"],
+            stdout=stdout,
+            stderr=stderr,
+            wall_time_ms=reply["wall_time_ms"],
+            peak_rss_kb=reply["peak_rss_kb"],
+            timed_out=reply["timed_out"],
+        )
+
+    def _read_reply(self, timeout):
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        line = self.process.stdout.readline() if ready else b""
+        if not line:
+            raise TemplateError("template did not answer")
+        return json.loads(line)
+
+    def close(self):
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(self.process.pid, signal.SIGKILL)
+        self.process.wait()
+        # A request written just before the template died may still be buffered.
+        with contextlib.suppress(BrokenPipeError):
+            self.process.stdin.close()
+        self.process.stdout.close()
+
+
+def configure(max_runs):
+    """Enable warm runs in this process (0 disables them) and start the templates."""
+    global _max_runs
+    _max_runs = max_runs
+    for language in TEMPLATES:
+        if max_runs:
+            _replace(language)
+        else:
+            _discard(language)
+
+
+def _discard(language):
+    interpreter = _templates.pop(language, None)
+    if interpreter is not None:
+        interpreter.close()
+
+
+def _replace(language):
+    _discard(language)
+    # Started now, so it has booted by the time the next run needs it.
+    _templates[language] = WarmInterpreter(TEMPLATES[language])
+
+
+def _hit_limit(result, limits):
+    return (
+        result.timed_out
+        or result.exit_code < 0
+        or result.peak_rss_kb * 1024 >= limits.memory_limit_bytes
+    )
+
+
+def run(language, command, workdir, stdin_data, limits):
+    """Run the program once, on a warm template when one is available."""
+    if not _max_runs or language not in TEMPLATES:
+        return run_program(command, workdir, stdin_data, limits)
+
+    interpreter = _templates.get(language)
+    if interpreter is None:
+        _replace(language)
+        interpreter = _templates[language]
+    source = os.path.join(workdir, SOURCE_FILENAMES[language])
+    try:
+        result = interpreter.run(source, workdir, stdin_data, limits)
+    except TemplateError:
+        logger.warning("Warm %s interpreter failed; running cold", language)
+        _replace(language)
+        return run_program(command, workdir, stdin_data, limits)
+
+    if interpreter.runs >= _max_runs or _hit_limit(result, limits):
+        _replace(language)
+    return result
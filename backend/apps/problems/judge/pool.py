@@ -0,0 +1,93 @@
+"""
+Pre-forked judge worker pool.
+
+One pool exists per Celery worker process. Its workers are started once and
+reused for every submission, so a judge task only pays for the sandboxed runs
+themselves, never for booting Django or the pool.
+"""
+
+import multiprocessing
+import os
+import resource
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import executor, interpreters, sandbox
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(nice_increment, interpreter_max_runs, sandbox_user, hidden_paths):
+    """
+    Lower worker priority so judging never starves the host, set up isolation
+    and warm the interpreters.
+
+    A worker that cannot isolate submitted code fails to start, which breaks
+    the pool: judging stops rather than running code unconfined.
+    """
+    if nice_increment:
+        os.nice(nice_increment)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    sandbox.configure_isolation(sandbox_user, hidden_paths)
+    interpreters.configure(interpreter_max_runs)
+
+
+def _mp_context():
+    # forkserver keeps workers independent of the (threaded) Celery parent.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def get_pool(
+    max_workers=None, nice_increment=0, interpreter_max_runs=0, sandbox_user="", hidden_paths=()
+):
+    """
+    Return the process-wide judge pool, starting it on first use.
+
+    Submitted code runs as ``sandbox_user`` in its own namespaces, with
+    ``hidden_paths`` hidden (see ``sandbox.configure_isolation``); an empty
+    ``sandbox_user`` runs it without isolation.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count(),
+                mp_context=_mp_context(),
+                initializer=_init_worker,
+                initargs=(nice_increment, interpreter_max_runs, sandbox_user, hidden_paths),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the pool's workers; the next ``get_pool`` call starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def run_in_pool(code, language, test_cases, limits, timeout=None, batch=False, **pool_options):
+    """
+    Evaluate a submission on a pool worker and block until its verdict is ready.
+
+    Pass a pack file path as ``test_cases`` where possible: only the path is
+    sent to the worker, which maps the pack itself. ``batch`` runs all the
+    tests in one sandboxed process where the language supports it.
+    """
+    for attempt in range(2):
+        try:
+            future = get_pool(**pool_options).submit(
+                executor.evaluate, code, language, test_cases, limits, batch
+            )
+            return future.result(timeout=timeout)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); replace the pool and retry once.
+            if attempt:
+                raise
+            shutdown_pool()
@@ -0,0 +1,243 @@
+"""
+Runner for warm and batched Python runs.
+
+Started as a standalone script (``python -I -S -B python_runner.py``), so it
+may only use the standard library. It has two modes:
+
+* template (no arguments), for ``interpreters.WarmInterpreter``: reads one
+  JSON request per line on stdin, forks a child per request that runs the
+  submitted program under the requested limits, and answers with one JSON
+  line on stdout.
+* ``batch SOURCE WORKDIR COMMANDS_FD REPLIES_FD``, for ``batch.BatchRun``:
+  compiles the program once, then forks a child per JSON request read from
+  ``COMMANDS_FD`` that runs it, and answers each on ``REPLIES_FD`` after a
+  first ``ready`` line.
+
+Either way the program only ever runs in a forked child that has closed every
+fd above 2, so it cannot write to the control pipes, and that exits with its
+run, so nothing it changed (builtins, modules, threads) reaches the next run.
+When the request names a ``uid`` and ``gid``, the child switches to them for
+good before the program starts, so it cannot signal or inspect the runner.
+"""
+
+import ctypes
+import gc
+import json
+import os
+import resource
+import signal
+import sys
+import time
+import traceback
+import types
+
+# Imported before forking, so solutions that use them do not pay for it.
+PR_SET_NO_NEW_PRIVS = 38
+
+PRELOAD = (
+    "bisect",
+    "collections",
+    "functools",
+    "heapq",
+    "itertools",
+    "math",
+    "re",
+    "string",
+    "typing",
+)
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # The child may not have become a group leader yet.
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    except PermissionError:
+        pass
+
+
+def _redirect(paths):
+    """Point fds 0-2 and ``sys``'s streams at the run's input and output files."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    for fd, path, mode in (
+        (0, paths["stdin"], os.O_RDONLY),
+        (1, paths["stdout"], flags),
+        (2, paths["stderr"], flags),
+    ):
+        opened = os.open(path, mode, 0o600)
+        if opened != fd:
+            os.dup2(opened, fd)
+            os.close(opened)
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", errors="backslashreplace", closefd=False)
+
+
+def _apply_limits(request):
+    limits = (
+        (resource.RLIMIT_CPU, request["cpu_seconds"]),
+        (resource.RLIMIT_AS, request["memory_limit_bytes"]),
+        (resource.RLIMIT_FSIZE, request["output_limit_bytes"]),
+        (resource.RLIMIT_CORE, 0),
+        (resource.RLIMIT_NOFILE, 32),
+    )
+    for kind, value in limits:
+        resource.setrlimit(kind, (value, value))
+
+
+def _drop_privileges(request):
+    if request["uid"] is None:
+        return
+    if ctypes.CDLL(None, use_errno=True).prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "cannot set no_new_privs")
+    os.setgroups([])
+    os.setgid(request["gid"])
+    os.setuid(request["uid"])
+
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code & 0xFF
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _compile(source):
+    """Return the program's code object, or the exception compiling it raised."""
+    try:
+        with open(source, encoding="utf-8") as source_file:
+            return compile(source_file.read(), source, "exec")
+    except Exception as exc:
+        return exc
+
+
+def _execute(program, source):
+    """Run ``program`` as a fresh ``__main__`` and return its exit code."""
+    main = types.ModuleType("__main__")
+    main.__file__ = source
+    sys.modules["__main__"] = main
+    sys.argv = [source]
+    exit_code = 0
+    try:
+        if isinstance(program, BaseException):
+            raise program.with_traceback(None)
+        exec(program, main.__dict__)
+    except SystemExit as exc:
+        exit_code = _exit_code(exc.code)
+    except BaseException:
+        exc_type, exc, tb = sys.exc_info()
+        # Start the traceback at the program, as a fresh interpreter would.
+        traceback.print_exception(exc_type, exc, tb.tb_next if tb else None)
+        exit_code = 1
+    _join_threads()
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        exit_code = exit_code or 120
+    return exit_code
+
+
+def _join_threads():
+    """Wait for the program's non-daemon threads, as interpreter shutdown would."""
+    threading = sys.modules.get("threading")
+    if threading is None:
+        return
+    for thread in threading.enumerate():
+        if thread is not threading.main_thread() and not thread.daemon:
+            try:
+                thread.join()
+            except RuntimeError:
+                pass
+
+
+def _run_child(request, program):
+    """Run the program in this forked child; never returns."""
+    os.setsid()
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    _redirect(request)
+    # Drops the control pipes too: the program cannot talk to the template or runner.
+    os.closerange(3, os.sysconf("SC_OPEN_MAX"))
+    os.chdir(request["cwd"])
+    _apply_limits(request)
+    if program is None:
+        program = _compile(request["source"])
+    _drop_privileges(request)
+    os._exit(_execute(program, request["source"]))
+
+
+def run(request, program=None):
+    """Run the program in a forked child, compiling it there unless ``program`` is given."""
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_child(request, program)
+        finally:
+            os._exit(1)
+
+    timed_out = False
+
+    def on_alarm(signum, frame):
+        nonlocal timed_out
+        timed_out = True
+        _kill_group(pid)
+
+    signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, request["time_limit"])
+    try:
+        _, status, usage = os.wait4(pid, 0)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    wall_time_ms = int((time.perf_counter() - started) * 1000)
+    # Anything the program forked is still in its process group.
+    _kill_group(pid)
+    return {
+        "exit_code": os.waitstatus_to_exitcode(status),
+        "wall_time_ms": wall_time_ms,
+        "peak_rss_kb": usage.ru_maxrss,
+        "timed_out": timed_out,
+    }
+
+
+def _preload():
+    for name in PRELOAD:
+        __import__(name)
+    # Keep the parent's objects out of the children's collections (and copy-on-write).
+    gc.collect()
+    gc.freeze()
+
+
+def template():
+    _preload()
+    control_in, control_out = sys.stdin.buffer, sys.stdout.buffer
+    for line in control_in:
+        control_out.write(json.dumps(run(json.loads(line))).encode() + b"\n")
+        control_out.flush()
+
+
+def batch(source, workdir, commands_fd, replies_fd):
+    commands = os.fdopen(int(commands_fd), "rb")
+    replies = os.fdopen(int(replies_fd), "wb")
+    os.chdir(workdir)
+    program = _compile(source)
+    _preload()
+    # The judge starts timing the first test after this, not at start-up.
+    replies.write(b"ready\n")
+    replies.flush()
+    for line in commands:
+        replies.write(json.dumps(run(json.loads(line), program)).encode() + b"\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["batch"]:
+        batch(*sys.argv[2:])
+    else:
+        template()
@@ -0,0 +1,353 @@
+"""
+Sandboxed execution of a single program run.
+
+Each run is a fresh child process with kernel resource limits applied before
+exec. Wall time is measured by the parent and peak RSS comes from the
+child's rusage, so neither can be faked by the submitted code.
+
+With isolation configured (``configure_isolation``, done by the judge pool's
+workers), submitted code also runs as a dedicated unprivileged user, in its
+own network namespace (no network at all) and mount namespace (with
+``hidden_paths`` covered by empty read-only mounts), with an empty scratch
+directory as its working directory. It then cannot read the worker's
+environment or files, nor other runs' working directories, whose names
+cannot be listed. Setting up namespaces needs root (``CAP_SYS_ADMIN``);
+without isolation, code runs as the worker's own user.
+"""
+
+import contextlib
+import ctypes
+import os
+import pwd
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+# Interpreter command lines per submission language. ``{source}`` is replaced
+# with the path of the file holding the submitted code.
+LANGUAGE_COMMANDS = {
+    "python": [sys.executable, "-I", "-S", "-B", "{source}"],
+}
+
+SOURCE_FILENAMES = {
+    "python": "solution.py",
+}
+
+
+@dataclass
+class RunLimits:
+    """Resource limits applied to every sandboxed run."""
+
+    time_limit: float = 2.0
+    memory_limit_mb: int = 256
+    output_limit_kb: int = 1024
+
+    @property
+    def memory_limit_bytes(self):
+        return self.memory_limit_mb * 1024 * 1024
+
+
+class SandboxError(Exception):
+    """Isolation was requested but cannot be set up on this host."""
+
+
+@dataclass
+class Isolation:
+    """Who submitted code runs as, and what is hidden from it."""
+
+    uid: int
+    gid: int
+    hidden_paths: tuple = ()
+
+
+_isolation = None
+
+# From <sched.h> and <sys/mount.h>.
+_CLONE_NEWNS = 0x00020000
+_CLONE_NEWIPC = 0x08000000
+_CLONE_NEWNET = 0x40000000
+_MS_RDONLY, _MS_NOSUID, _MS_NODEV, _MS_NOEXEC = 1, 2, 4, 8
+_MS_REC, _MS_PRIVATE = 1 << 14, 1 << 18
+_PR_SET_NO_NEW_PRIVS = 38
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+def _check(result):
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def _enter_namespaces(isolation):
+    """Move this process into fresh network and mount namespaces, hiding paths."""
+    _check(_libc.unshare(_CLONE_NEWNS | _CLONE_NEWNET | _CLONE_NEWIPC))
+    # Keep the mounts below from propagating back to the host.
+    _check(_libc.mount(b"none", b"/", None, _MS_REC | _MS_PRIVATE, None))
+    flags = _MS_RDONLY | _MS_NOSUID | _MS_NODEV | _MS_NOEXEC
+    for path in isolation.hidden_paths:
+        if os.path.isdir(path):
+            _check(_libc.mount(b"tmpfs", os.fsencode(path), b"tmpfs", flags, b"size=4k,mode=000"))
+
+
+def _drop_privileges(isolation):
+    """Become the sandbox user for good; setuid programs cannot give privileges back."""
+    _check(_libc.prctl(_PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0))
+    os.setgroups([])
+    os.setgid(isolation.gid)
+    os.setuid(isolation.uid)
+
+
+def configure_isolation(user, hidden_paths=()):
+    """
+    Run submitted code as ``user`` (a name or uid) in its own namespaces, or
+    without isolation when ``user`` is empty.
+
+    Raises ``SandboxError`` when isolation cannot be set up here, so a
+    misconfigured judge fails instead of running code unconfined.
+    """
+    global _isolation
+    if not user:
+        _isolation = None
+        return
+    try:
+        entry = pwd.getpwuid(int(user)) if str(user).isdigit() else pwd.getpwnam(user)
+    except KeyError:
+        raise SandboxError(f"Sandbox user {user!r} does not exist") from None
+    if entry.pw_uid == 0 or entry.pw_gid == 0:
+        raise SandboxError("The sandbox user must not be root")
+    isolation = Isolation(entry.pw_uid, entry.pw_gid, tuple(map(str, hidden_paths)))
+    _probe(isolation)
+    _isolation = isolation
+
+
+def _probe(isolation):
+    """Set isolation up once in a throwaway child, to fail early if it cannot work."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            _enter_namespaces(isolation)
+            _drop_privileges(isolation)
+            stdlib = os.path.dirname(os.__file__)
+            if not (os.access(sys.executable, os.X_OK) and os.access(stdlib, os.R_OK | os.X_OK)):
+                raise PermissionError(f"the sandbox user cannot run {sys.executable}")
+        except BaseException as exc:
+            os.write(write_fd, str(exc).encode()[:512])
+            os._exit(1)
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as errors:
+        error = errors.read().decode(errors="replace")
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SandboxError(f"Cannot isolate submitted code: {error or 'child failed'}")
+
+
+def isolation_ids():
+    """``(uid, gid)`` submitted code runs as, or ``(None, None)`` without isolation."""
+    if _isolation is None:
+        return None, None
+    return _isolation.uid, _isolation.gid
+
+
+def isolate_runner():
+    """``preexec_fn`` for a runner that forks the runs: namespaces only, it stays privileged."""
+    if _isolation is not None:
+        _enter_namespaces(_isolation)
+
+
+@dataclass
+class RunResult:
+    """Outcome of a single sandboxed run."""
+
+    exit_code: int
+    stdout: bytes
+    stderr: str
+    wall_time_ms: int
+    peak_rss_kb: int
+    timed_out: bool = False
+
+    @property
+    def killed_by_cpu_limit(self):
+        return self.exit_code == -signal.SIGXCPU
+
+
+def sandbox_env():
+    """The only environment variables a submitted program sees."""
+    return {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "PYTHONHASHSEED": "0"}
+
+
+def _apply_limits(limits, cpu_seconds=None, runs_code=True):
+    """
+    Build a ``preexec_fn`` that isolates the child and applies ``limits``.
+
+    A child that forks the actual runs (``runs_code=False``) enters the
+    namespaces but keeps its user; its children drop privileges themselves.
+    """
+    cpu_seconds = cpu_seconds or int(limits.time_limit) + 1
+    output_bytes = limits.output_limit_kb * 1024
+    isolation = _isolation
+
+    def preexec():
+        if isolation is not None:
+            _enter_namespaces(isolation)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        resource.setrlimit(
+            resource.RLIMIT_AS, (limits.memory_limit_bytes, limits.memory_limit_bytes)
+        )
+        resource.setrlimit(resource.RLIMIT_FSIZE, (output_bytes, output_bytes))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (32, 32))
+        if isolation is not None and runs_code:
+            _drop_privileges(isolation)
+
+    return preexec
+
+
+def _kill_group(pgid):
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pgid, signal.SIGKILL)
+
+
+def _read_limited(handle, limit_bytes):
+    handle.seek(0)
+    return handle.read(limit_bytes)
+
+
+def stream_paths(workdir):
+    """The files a runner process uses as a run's stdin, stdout and stderr."""
+    return {name: os.path.join(workdir, f".{name}") for name in ("stdin", "stdout", "stderr")}
+
+
+def scratch_dir(workdir):
+    """The empty directory, writable by the sandbox user, that programs run in."""
+    return os.path.join(workdir, "scratch")
+
+
+def runner_request(workdir, source, limits):
+    """The request a runner process needs to fork one run of ``source``."""
+    uid, gid = isolation_ids()
+    return {
+        **stream_paths(workdir),
+        "source": source,
+        "cwd": scratch_dir(workdir),
+        "uid": uid,
+        "gid": gid,
+        "time_limit": limits.time_limit,
+        "cpu_seconds": int(limits.time_limit) + 1,
+        "memory_limit_bytes": limits.memory_limit_bytes,
+        "output_limit_bytes": limits.output_limit_kb * 1024,
+    }
+
+
+def write_input(paths, stdin_data):
+    if isinstance(stdin_data, str):
+        stdin_data = stdin_data.encode("utf-8")
+    # Opened as stdin before the run drops privileges; the program cannot open it by path.
+    fd = os.open(paths["stdin"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, "wb") as stdin_file:
+        stdin_file.write(stdin_data)
+
+
+def read_output(paths, limits):
+    """Return the run's ``(stdout, stderr)``, each cut to the output limit."""
+    output_limit = limits.output_limit_kb * 1024
+    with open(paths["stdout"], "rb") as stdout_file, open(paths["stderr"], "rb") as stderr_file:
+        return (
+            _read_limited(stdout_file, output_limit),
+            _read_limited(stderr_file, output_limit).decode("utf-8", errors="replace"),
+        )
+
+
+def run_program(command, workdir, stdin_data, limits):
+    """
+    Run ``command`` once with ``stdin_data`` (str or bytes-like) on stdin under ``limits``.
+
+    Input and output go through temporary files rather than pipes so the
+    parent can block in ``wait4`` and collect the child's rusage directly.
+    """
+    output_limit = limits.output_limit_kb * 1024
+    with (
+        tempfile.TemporaryFile(dir=workdir) as stdin_file,
+        tempfile.TemporaryFile(dir=workdir) as stdout_file,
+        tempfile.TemporaryFile(dir=workdir) as stderr_file,
+    ):
+        if isinstance(stdin_data, str):
+            stdin_data = stdin_data.encode("utf-8")
+        stdin_file.write(stdin_data)
+        stdin_file.seek(0)
+
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            cwd=scratch_dir(workdir),
+            stdin=stdin_file,
+            stdout=stdout_file,
+            stderr=stderr_file,
+            env=sandbox_env(),
+            preexec_fn=_apply_limits(limits),
+            start_new_session=True,
+        )
+
+        timed_out = threading.Event()
+        reaped = threading.Lock()
+
+        def kill_on_timeout():
+            with reaped:
+                if process.returncode is None:
+                    timed_out.set()
+                    _kill_group(process.pid)
+
+        timer = threading.Timer(limits.time_limit, kill_on_timeout)
+        timer.start()
+        try:
+            _, wait_status, usage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        with reaped:
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+        wall_time_ms = int((time.perf_counter() - started) * 1000)
+        # Anything the program forked is still in its process group.
+        _kill_group(process.pid)
+
+        return RunResult(
+            exit_code=process.returncode,
+            stdout=_read_limited(stdout_file, output_limit),
+            stderr=_read_limited(stderr_file, output_limit).decode("utf-8", errors="replace"),
+            wall_time_ms=wall_time_ms,
+            peak_rss_kb=usage.ru_maxrss,
+            timed_out=timed_out.is_set(),
+        )
+
+
+def _work_root():
+    # Searchable but not listable: a program cannot find other runs' directories.
+    root = os.path.join(tempfile.gettempdir(), "judge-runs")
+    os.makedirs(root, exist_ok=True)
+    os.chmod(root, 0o711)
+    return root
+
+
+def prepare_workdir(code, language):
+    """Write ``code`` into a fresh working directory and return its command."""
+    workdir = tempfile.mkdtemp(prefix="judge-", dir=_work_root())
+    os.chmod(workdir, 0o711)
+    source_path = os.path.join(workdir, SOURCE_FILENAMES[language])
+    with open(source_path, "w", encoding="utf-8") as source_file:
+        source_file.write(code)
+    # A cold run's interpreter reads the source as the sandbox user.
+    os.chmod(source_path, 0o644)
+    scratch = scratch_dir(workdir)
+    os.mkdir(scratch, 0o700)
+    uid, gid = isolation_ids()
+    if uid is not None:
+        os.chown(scratch, uid, gid)
+    command = [part.format(source=source_path) for part in LANGUAGE_COMMANDS[language]]
+    return workdir, command
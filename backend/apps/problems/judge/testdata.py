@@ -0,0 +1,153 @@
+"""
+Packed on-disk test-case format.
+
+A pack is a single file the judge memory-maps and walks without parsing:
+
+    header   magic ``CMTC``, format version (u16), reserved (u16), case count (u32)
+    index    one ``(input offset, input length, output offset, output length)``
+             entry of four u64 values per case
+    data     raw input and expected-output bytes, back to back
+
+Offsets are absolute, so a case is two ``memoryview`` slices of the mapping
+and the kernel pages large inputs in on demand.
+"""
+
+import contextlib
+import mmap
+import os
+import shutil
+import struct
+
+MAGIC = b"CMTC"
+FORMAT_VERSION = 1
+
+# Packs hold expected outputs: owner only.
+PACK_MODE = 0o600
+
+HEADER = struct.Struct("<4sHHI")
+INDEX_ENTRY = struct.Struct("<QQQQ")
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class PackFormatError(ValueError):
+    """Raised when a pack file is malformed."""
+
+
+class CasePack:
+    """Read-only, memory-mapped view of a pack file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as pack_file:
+            size = os.fstat(pack_file.fileno()).st_size
+            if size < HEADER.size:
+                raise PackFormatError(f"{path} is too small to be a test-case pack")
+            self._mmap = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise PackFormatError(f"{path} is not a version {FORMAT_VERSION} test-case pack")
+        if HEADER.size + count * INDEX_ENTRY.size > size:
+            self.close()
+            raise PackFormatError(f"{path} is truncated")
+        self.count = count
+        self._view = memoryview(self._mmap)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield self[number]
+
+    def __getitem__(self, number):
+        """Return ``(input, expected_output)`` as zero-copy memoryviews."""
+        if not 0 <= number < self.count:
+            raise IndexError(number)
+        in_offset, in_length, out_offset, out_length = INDEX_ENTRY.unpack_from(
+            self._mmap, HEADER.size + number * INDEX_ENTRY.size
+        )
+        return (
+            self._view[in_offset : in_offset + in_length],
+            self._view[out_offset : out_offset + out_length],
+        )
+
+    def close(self):
+        self._view = None
+        # Slices handed out by ``__getitem__`` keep the mapping alive until
+        # they are garbage-collected; it is unmapped with the last of them.
+        with contextlib.suppress(BufferError):
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _copy_into(source, destination):
+    """Stream ``source`` (a path or bytes) into ``destination``; return bytes written."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        destination.write(source)
+        return len(source)
+    start = destination.tell()
+    with open(source, "rb") as source_file:
+        shutil.copyfileobj(source_file, destination, COPY_CHUNK_SIZE)
+    return destination.tell() - start
+
+
+def write_pack(path, cases):
+    """
+    Write ``cases`` to a pack at ``path`` and return the number of cases.
+
+    ``cases`` is a sized sequence of ``(input, expected_output)`` pairs where
+    each side is either a file path, streamed in fixed-size chunks, or bytes.
+    The pack is written to a temporary file and moved into place atomically
+    so judges never observe a half-written pack. Only its owner can read it:
+    submitted code runs as another user (see ``sandbox``).
+    """
+    count = len(cases)
+    tmp_path = f"{path}.tmp"
+    data_start = HEADER.size + count * INDEX_ENTRY.size
+    index = []
+    with open(tmp_path, "wb") as pack_file:
+        os.fchmod(pack_file.fileno(), PACK_MODE)
+        pack_file.seek(data_start)
+        for input_source, output_source in cases:
+            in_offset = pack_file.tell()
+            in_length = _copy_into(input_source, pack_file)
+            out_offset = pack_file.tell()
+            out_length = _copy_into(output_source, pack_file)
+            index.append(INDEX_ENTRY.pack(in_offset, in_length, out_offset, out_length))
+
+        pack_file.seek(0)
+        pack_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count))
+        pack_file.write(b"".join(index))
+        pack_file.flush()
+        os.fsync(pack_file.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def iter_test_cases(source):
+    """
+    Yield ``(input, expected_output)`` pairs from ``source``.
+
+    ``source`` is either a pack file path or an in-memory sequence of pairs.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with CasePack(source) as pack:
+            yield from pack
+    else:
+        yield from source
+
+
+def count_test_cases(source):
+    """Return how many test cases ``source`` (a pack path or a sequence) holds."""
+    if isinstance(source, (str, os.PathLike)):
+        with CasePack(source) as pack:
+            return len(pack)
+    return len(source)
@@ -0,0 +1,56 @@
+"""
+Bulk-import hidden test cases into packed test data files.
+
+Usage:
+    python manage.py import_testcases ROOT            # ROOT/<problem-slug>/*.in, *.out
+    python manage.py import_testcases DIR --problem two-sum
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.problems.models import Problem
+from apps.problems.services.testdata_service import ProblemTestDataService
+
+
+class Command(BaseCommand):
+    help = "Pack NAME.in / NAME.out test case files into the judge's test data store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", type=Path)
+        parser.add_argument(
+            "--problem",
+            metavar="SLUG",
+            help="Import DIRECTORY itself for this problem instead of one subdirectory per slug.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        if not directory.is_dir():
+            raise CommandError(f"{directory} is not a directory")
+
+        if options["problem"]:
+            targets = [(options["problem"], directory)]
+        else:
+            targets = [(path.name, path) for path in sorted(directory.iterdir()) if path.is_dir()]
+
+        failures = 0
+        for slug, case_directory in targets:
+            try:
+                problem = Problem.objects.only("id").get(slug=slug)
+                test_data = ProblemTestDataService.import_directory(problem, case_directory)
+            except (Problem.DoesNotExist, FileNotFoundError) as exc:
+                failures += 1
+                message = "problem not found" if isinstance(exc, Problem.DoesNotExist) else exc
+                self.stderr.write(self.style.ERROR(f"{slug}: {message}"))
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{slug}: {test_data.case_count} cases, "
+                    f"{test_data.size_bytes} bytes (v{test_data.version})"
+                )
+            )
+
+        if failures:
+            raise CommandError(f"{failures} of {len(targets)} imports failed")
@@ -0,0 +1,28 @@
+"""
+Show the judge queues: waiting tasks and how long the next one has waited.
+
+Usage:
+    python manage.py judge_queues
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from redis import RedisError
+
+from apps.problems.services.judge_queue import JudgeQueue
+
+
+class Command(BaseCommand):
+    help = "Print the depth and the oldest task's age of every judge queue, by priority."
+
+    def handle(self, *args, **options):
+        try:
+            stats = JudgeQueue.get_stats()
+        except RedisError as e:
+            raise CommandError(f"Could not read the judge queues: {e}") from e
+
+        self.stdout.write(f"{'priority':<12} {'queue':<20} {'depth':>7} {'oldest':>10}")
+        for priority, entry in stats.items():
+            age = entry["oldest_age_s"]
+            oldest = "?" if age is None else f"{age:.1f}s"
+            queue, depth = entry["queue"], entry["depth"]
+            self.stdout.write(f"{priority:<12} {queue:<20} {depth:>7} {oldest:>10}")
@@ -0,0 +1,65 @@
+"""
+Rejudge the stale submissions of problems after their tests change.
+
+Usage:
+    python manage.py rejudge two-sum                # queue stale submissions
+    python manage.py rejudge two-sum --all          # make every submission stale first
+    python manage.py rejudge two-sum --progress     # how many are still stale
+
+Runs are resumable: running the command again queues whatever is still stale.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.problems.models import Problem
+from apps.problems.services.rejudge_service import RejudgeService
+
+
+class Command(BaseCommand):
+    help = "Queue the submissions judged against older tests for rejudging, one run per program."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="+", metavar="SLUG")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Bump the tests version first, so every submission is rejudged.",
+        )
+        parser.add_argument(
+            "--progress", action="store_true", help="Only report how many submissions are stale."
+        )
+
+    def handle(self, *args, **options):
+        problems = {
+            problem.slug: problem for problem in Problem.objects.filter(slug__in=options["slugs"])
+        }
+        missing = sorted(set(options["slugs"]) - set(problems))
+        if missing:
+            raise CommandError(f"Unknown problems: {', '.join(missing)}")
+
+        for slug in options["slugs"]:
+            problem = problems[slug]
+            if options["progress"]:
+                self._report(problem)
+                continue
+            if options["all"]:
+                RejudgeService.bump_tests_version(problem)
+
+            def progress(programs, slug=slug):
+                self.stdout.write(f"{slug}: {programs} programs queued", ending="\r")
+
+            queued = RejudgeService.start(problem, on_progress=progress)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{slug}: queued {queued['programs']} programs in {queued['tasks']} tasks"
+                )
+            )
+            self._report(problem)
+
+    def _report(self, problem):
+        progress = RejudgeService.get_progress(problem)
+        current = progress["total"] - progress["stale"]
+        self.stdout.write(
+            f"{problem.slug}: {current}/{progress['total']} submissions judged against "
+            f"tests v{progress['tests_version']}, {progress['stale']} stale"
+        )
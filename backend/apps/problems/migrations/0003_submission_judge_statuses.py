@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="submission",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("accepted", "Accepted"),
+                    ("wrong_answer", "Wrong Answer"),
+                    ("time_limit_exceeded", "Time Limit Exceeded"),
+                    ("memory_limit_exceeded", "Memory Limit Exceeded"),
+                    ("error", "Error"),
+                ],
+                default="pending",
+                max_length=32,
+            ),
+        ),
+    ]
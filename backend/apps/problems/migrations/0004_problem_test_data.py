@@ -0,0 +1,41 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0003_submission_judge_statuses"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProblemTestData",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("pack_path", models.CharField(max_length=500)),
+                ("case_count", models.PositiveIntegerField(default=0)),
+                ("size_bytes", models.PositiveBigIntegerField(default=0)),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "problem",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="test_data",
+                        to="problems.problem",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "problem_test_data",
+            },
+        ),
+    ]
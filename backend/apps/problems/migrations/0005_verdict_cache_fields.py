@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0004_problem_test_data"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="problem",
+            name="tests_version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="code_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["problem", "language", "code_hash"], name="submission_code_hash_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0005_verdict_cache_fields"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="problem",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.AlterModelOptions(
+            name="submission",
+            options={"ordering": ["-submitted_at", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="problem",
+            index=models.Index(fields=["created_at", "id"], name="problem_created_keyset_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["user", "submitted_at", "id"], name="submission_user_keyset_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Tag.name's max_length; copied so the migration does not depend on live code.
+MAX_TAG_LENGTH = 50
+
+
+def backfill_tags(apps, schema_editor):
+    Problem = apps.get_model("problems", "Problem")
+    Tag = apps.get_model("problems", "Tag")
+    ProblemTag = apps.get_model("problems", "ProblemTag")
+
+    counts = {}
+    links = []
+    for problem_id, tags in Problem.objects.values_list("id", "tags").iterator():
+        names = {
+            str(tag).strip().lower()[:MAX_TAG_LENGTH].strip()
+            for tag in tags or []
+            if str(tag).strip()
+        }
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+            links.append((problem_id, name))
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, problem_count=count) for name, count in counts.items()],
+        batch_size=500,
+    )
+    tag_ids = dict(Tag.objects.values_list("name", "id"))
+    ProblemTag.objects.bulk_create(
+        [ProblemTag(problem_id=problem_id, tag_id=tag_ids[name]) for problem_id, name in links],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0006_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("problem_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "tags",
+                "ordering": ["-problem_count", "name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProblemTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "problem",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="problem_tags",
+                        to="problems.problem",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="problem_tags",
+                        to="problems.tag",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "problem_tags",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="problemtag",
+            constraint=models.UniqueConstraint(
+                fields=("tag", "problem"), name="problem_tag_unique"
+            ),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:48
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Postgres-only: the trigger keeps search_vector current on every write, and
+# the GIN indexes back full-text and trigram matching. Other backends (sqlite
+# in local tests) keep the plain column and search by substring instead.
+CREATE_SEARCH_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION problems_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER problems_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON problems
+    FOR EACH ROW EXECUTE FUNCTION problems_search_vector_update()
+    """,
+    "UPDATE problems SET title = title",
+    "CREATE INDEX problem_search_vector_idx ON problems USING gin (search_vector)",
+    "CREATE INDEX problem_title_trgm_idx ON problems USING gin (title gin_trgm_ops)",
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS problem_title_trgm_idx",
+    "DROP INDEX IF EXISTS problem_search_vector_idx",
+    "DROP TRIGGER IF EXISTS problems_search_vector_trigger ON problems",
+    "DROP FUNCTION IF EXISTS problems_search_vector_update()",
+]
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0007_normalized_tags"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="problem",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(_run_on_postgres(CREATE_SEARCH_SQL), _run_on_postgres(DROP_SEARCH_SQL)),
+    ]
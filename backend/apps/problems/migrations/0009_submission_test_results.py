@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0008_problem_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submission",
+            name="test_results",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("problems", "0009_submission_test_results"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submission",
+            name="tests_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -2,7 +2,11 @@
 Problem models.
 """
 
+import os
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 User = get_user_model()
@@ -27,25 +31,71 @@ class Problem(models.Model):
     starter_code = models.TextField()
     solution = models.TextField(blank=True)
     hints = models.JSONField(default=list)
+    # Bumped whenever the judge's tests for this problem change.
+    tests_version = models.PositiveIntegerField(default=1)
+    # Weighted title/description vector, maintained by a database trigger on Postgres.
+    search_vector = SearchVectorField(null=True, editable=False)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="problems_created")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "problems"
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Backs keyset pagination of the problem list.
+            models.Index(fields=["created_at", "id"], name="problem_created_keyset_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class Tag(models.Model):
+    """A problem tag with a precomputed problem count, for filtering and facets."""
+
+    name = models.CharField(max_length=50, unique=True)
+    problem_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "tags"
+        ordering = ["-problem_count", "name"]
+
+    def __str__(self):
+        return self.name
+
+
+class ProblemTag(models.Model):
+    """
+    Normalized copy of ``Problem.tags``, kept in sync on save.
+
+    The unique ``(tag, problem)`` index answers "problems with tag X" without
+    scanning the problems table.
+    """
+
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name="problem_tags")
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="problem_tags")
+
+    class Meta:
+        db_table = "problem_tags"
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "problem"], name="problem_tag_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.problem_id}:{self.tag_id}"
+
+
 class Submission(models.Model):
     """User submission for a problem."""
 
     STATUS_CHOICES = [
         ("pending", "Pending"),
+        ("running", "Running"),
         ("accepted", "Accepted"),
         ("wrong_answer", "Wrong Answer"),
+        ("time_limit_exceeded", "Time Limit Exceeded"),
+        ("memory_limit_exceeded", "Memory Limit Exceeded"),
         ("error", "Error"),
     ]
 
@@ -53,15 +103,48 @@ class Submission(models.Model):
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name="submissions")
     code = models.TextField()
     language = models.CharField(max_length=50)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    status = models.CharField(max_length=32, choices=STATUS_CHOICES, default="pending")
     runtime = models.IntegerField(null=True, blank=True)
     memory = models.IntegerField(null=True, blank=True)
     error_message = models.TextField(blank=True)
+    # Per test that ran: {"test", "status", "runtime", "memory"}.
+    test_results = models.JSONField(default=list, blank=True)
+    code_hash = models.CharField(max_length=64, blank=True)  # SHA-256 of normalized code
+    # Problem.tests_version the verdict was judged against (0: not recorded).
+    tests_version = models.PositiveIntegerField(default=0)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "submissions"
-        ordering = ["-submitted_at"]
+        ordering = ["-submitted_at", "-id"]
+        indexes = [
+            # Backs keyset pagination of a user's submission history.
+            models.Index(fields=["user", "submitted_at", "id"], name="submission_user_keyset_idx"),
+            models.Index(
+                fields=["problem", "language", "code_hash"], name="submission_code_hash_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.problem.title} - {self.status}"
+
+
+class ProblemTestData(models.Model):
+    """Hidden test cases for a problem, stored as a packed file on disk."""
+
+    problem = models.OneToOneField(Problem, on_delete=models.CASCADE, related_name="test_data")
+    pack_path = models.CharField(max_length=500)  # Relative to JUDGE_TESTDATA_ROOT
+    case_count = models.PositiveIntegerField(default=0)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "problem_test_data"
+
+    def __str__(self):
+        return f"Problem {self.problem_id} tests v{self.version} ({self.case_count} cases)"
+
+    @property
+    def absolute_path(self):
+        return os.path.join(settings.JUDGE_TESTDATA_ROOT, self.pack_path)
@@ -0,0 +1,11 @@
+"""
+Pagination classes for the problems app.
+"""
+
+from core.pagination import KeysetPagination
+
+
+class SubmissionPagination(KeysetPagination):
+    """Newest-first keyset pagination over ``(submitted_at, id)``."""
+
+    ordering_field = "submitted_at"
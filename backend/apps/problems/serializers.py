@@ -2,12 +2,25 @@
 Problem serializers.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 
+from core.serializers import SparseFieldsetMixin
+
 from .models import Problem, Submission
+from .services.tag_service import MAX_TAG_LENGTH
+
 
+class ProblemSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact Problem representation for list pages."""
 
-class ProblemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Problem
+        fields = ["id", "slug", "title", "difficulty", "tags"]
+        read_only_fields = fields
+
+
+class ProblemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Problem model."""
 
     class Meta:
@@ -28,8 +41,18 @@ class ProblemSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    def validate_tags(self, value):
+        if not isinstance(value, list) or not all(isinstance(tag, str) for tag in value):
+            raise serializers.ValidationError("Tags must be a list of strings")
+        too_long = [tag for tag in value if len(tag.strip()) > MAX_TAG_LENGTH]
+        if too_long:
+            raise serializers.ValidationError(
+                f"Tags must be at most {MAX_TAG_LENGTH} characters: {', '.join(too_long)}"
+            )
+        return value
+
 
-class SubmissionSerializer(serializers.ModelSerializer):
+class SubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Submission model."""
 
     problem_title = serializers.CharField(source="problem.title", read_only=True)
@@ -59,3 +82,24 @@ class SubmissionSerializer(serializers.ModelSerializer):
             "error_message",
             "submitted_at",
         ]
+
+
+class SubmissionEntrySerializer(serializers.Serializer):
+    """One solution of a batch submit."""
+
+    problem_id = serializers.IntegerField(min_value=1)
+    code = serializers.CharField(trim_whitespace=False)
+    language = serializers.CharField(max_length=50, default="python")
+
+
+class SubmissionBatchSerializer(serializers.Serializer):
+    """Request body of the batch submit endpoint."""
+
+    submissions = SubmissionEntrySerializer(many=True, allow_empty=False)
+
+    def validate_submissions(self, value):
+        if len(value) > settings.SUBMIT_BATCH_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"At most {settings.SUBMIT_BATCH_MAX_SIZE} submissions per request"
+            )
+        return value
@@ -0,0 +1,156 @@
+"""
+Judge queues - priorities, per-user fairness and the queue readout.
+
+Judge tasks go to one broker queue per priority (``settings.JUDGE_QUEUES``,
+highest first). Workers consume them with Kombu's ``priority`` queue order,
+so an interactive submission never waits behind a contest burst or a bulk
+rejudge. Interactive tasks also carry their user: at most
+``JUDGE_USER_CONCURRENCY`` of a user's submissions are judged at once, and a
+task over the cap goes back to the end of its queue, behind everybody else's,
+after an exponentially growing, jittered delay.
+
+The caps live in the broker's Redis as one sorted set per user, holding the
+submissions being judged scored by when their claim lapses, so a worker that
+dies mid-task cannot keep a slot for longer than the task timeout.
+"""
+
+import json
+import logging
+import random
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Drop lapsed claims, then claim a slot if the submission already has one or
+# the user is under the cap.
+_ACQUIRE_SLOT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZSCORE', KEYS[1], ARGV[3]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+# Both queue gauges are read from one broker round trip per scrape.
+STATS_REUSE_SECONDS = 1.0
+
+_client = None
+_acquire_slot = None
+_stats = {"at": None, "value": None}
+
+
+def _get_client():
+    global _client, _acquire_slot
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.CELERY_BROKER_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+        _acquire_slot = _client.register_script(_ACQUIRE_SLOT)
+    return _client
+
+
+def _enqueued_at(message):
+    """The ``enqueued_at`` header of a raw Kombu message, if it has one."""
+    if message is None:
+        return None
+    try:
+        return json.loads(message)["headers"].get("enqueued_at")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+class JudgeQueue:
+    """Routing, fairness and statistics of the judge queues."""
+
+    @staticmethod
+    def get_queue(priority):
+        return settings.JUDGE_QUEUES[priority]
+
+    @staticmethod
+    def slot_key(user_id):
+        return f"judge_slots_{user_id}"
+
+    @staticmethod
+    def acquire_slot(user_id, submission_id):
+        """
+        Claim one of the user's judge slots for a submission.
+
+        Returns False when the user is at the cap. Without Redis the cap
+        cannot be enforced and the claim succeeds: fairness is not worth
+        stopping the judge for.
+        """
+        now = time.time()
+        lease = settings.JUDGE_TASK_TIMEOUT + 60
+        try:
+            _get_client()
+            claimed = _acquire_slot(
+                keys=[JudgeQueue.slot_key(user_id)],
+                args=[now, settings.JUDGE_USER_CONCURRENCY, submission_id, now + lease, lease],
+            )
+        except redis.RedisError:
+            logger.warning("Could not claim a judge slot for user %s", user_id, exc_info=True)
+            return True
+        return bool(claimed)
+
+    @staticmethod
+    def retry_delay(retries):
+        """Seconds before a capped task is queued again, after ``retries`` earlier turns."""
+        base = settings.JUDGE_USER_RETRY_DELAY
+        ceiling = min(base * 2**retries, settings.JUDGE_USER_RETRY_MAX_DELAY)
+        # Jitter spreads out a user's capped tasks instead of retrying them in lockstep.
+        return random.uniform(base, max(ceiling, base))
+
+    @staticmethod
+    def release_slot(user_id, submission_id):
+        try:
+            _get_client().zrem(JudgeQueue.slot_key(user_id), submission_id)
+        except redis.RedisError:
+            # The claim lapses on its own.
+            logger.warning("Could not release a judge slot for user %s", user_id, exc_info=True)
+
+    @staticmethod
+    def get_stats():
+        """
+        Return ``{priority: {"queue", "depth", "oldest_age_s"}}`` from the broker.
+
+        ``oldest_age_s`` is how long the task next in line has been waiting:
+        0 for an empty queue, None when its message does not say.
+        """
+        queues = settings.JUDGE_QUEUES
+        with _get_client().pipeline(transaction=False) as pipe:
+            for queue in queues.values():
+                pipe.llen(queue)
+                # Kombu pushes on the left and pops on the right.
+                pipe.lindex(queue, -1)
+            replies = pipe.execute()
+
+        now = time.time()
+        stats = {}
+        for index, (priority, queue) in enumerate(queues.items()):
+            depth, oldest = replies[2 * index : 2 * index + 2]
+            enqueued_at = _enqueued_at(oldest)
+            if not depth:
+                oldest_age_s = 0.0
+            elif enqueued_at is None:
+                oldest_age_s = None
+            else:
+                oldest_age_s = round(max(now - enqueued_at, 0.0), 3)
+            stats[priority] = {"queue": queue, "depth": depth, "oldest_age_s": oldest_age_s}
+        return stats
+
+    @staticmethod
+    def get_gauge(field):
+        """Samples of one ``get_stats`` field per priority, for ``/metrics``."""
+        now = time.monotonic()
+        if _stats["at"] is None or now - _stats["at"] > STATS_REUSE_SECONDS:
+            _stats["value"], _stats["at"] = JudgeQueue.get_stats(), now
+        return [
+            ({"priority": priority}, entry[field])
+            for priority, entry in _stats["value"].items()
+            if entry[field] is not None
+        ]
@@ -0,0 +1,208 @@
+"""
+Judge service layer - queues submissions and records verdicts.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.health import HealthCheckError
+
+from ..judge.pool import run_in_pool
+from ..judge.sandbox import RunLimits
+from ..models import Submission
+from .judge_queue import JudgeQueue
+from .submission_events import SubmissionEvents
+from .verdict_cache import VerdictCache
+
+logger = logging.getLogger(__name__)
+
+JUDGE_HEARTBEAT_KEY = "judge_heartbeat"
+
+
+class JudgeService:
+    """Service for submission evaluation."""
+
+    @staticmethod
+    def get_limits():
+        """Build the sandbox limits from settings."""
+        return RunLimits(
+            time_limit=settings.JUDGE_TIME_LIMIT,
+            memory_limit_mb=settings.JUDGE_MEMORY_LIMIT_MB,
+            output_limit_kb=settings.JUDGE_OUTPUT_LIMIT_KB,
+        )
+
+    @staticmethod
+    def get_test_cases(problem):
+        """
+        Return the judge's test source for a problem.
+
+        Problems with imported test data are judged against their pack file
+        (only the path travels to the pool); others fall back to the examples.
+        """
+        test_data = getattr(problem, "test_data", None)
+        if test_data is not None and test_data.case_count:
+            return test_data.absolute_path
+        return [
+            (example.get("input", ""), example.get("output", "")) for example in problem.examples
+        ]
+
+    @staticmethod
+    def record_heartbeat():
+        """Mark a judge worker as alive; any live worker keeps the key fresh."""
+        cache.set(JUDGE_HEARTBEAT_KEY, time.time(), timeout=settings.JUDGE_HEARTBEAT_TIMEOUT)
+
+    @staticmethod
+    def start_heartbeat():
+        """Record a heartbeat every ``JUDGE_HEARTBEAT_INTERVAL`` seconds from a daemon thread."""
+
+        def beat():
+            while True:
+                try:
+                    JudgeService.record_heartbeat()
+                except Exception:
+                    logger.warning("Could not record judge heartbeat", exc_info=True)
+                time.sleep(settings.JUDGE_HEARTBEAT_INTERVAL)
+
+        threading.Thread(target=beat, name="judge-heartbeat", daemon=True).start()
+
+    @staticmethod
+    def check_heartbeat():
+        """Readiness check: fail unless a judge worker has reported in recently."""
+        last_seen = cache.get(JUDGE_HEARTBEAT_KEY)
+        if last_seen is None:
+            raise HealthCheckError("no judge worker heartbeat")
+        age = time.time() - last_seen
+        if age > settings.JUDGE_HEARTBEAT_TIMEOUT:
+            raise HealthCheckError(f"last judge heartbeat {age:.0f}s ago")
+        return {"heartbeat_age_s": round(age, 1)}
+
+    @staticmethod
+    def enqueue(submission, priority="interactive"):
+        """
+        Queue a submission for judging once the current transaction commits.
+
+        ``priority`` picks the queue (see ``JudgeQueue``); only interactive
+        submissions count against their user's concurrency cap.
+        """
+        from ..tasks import judge_submission
+
+        user_id = submission.user_id if priority == "interactive" else None
+
+        def send():
+            judge_submission.apply_async(
+                (submission.id,),
+                {"user_id": user_id},
+                queue=JudgeQueue.get_queue(priority),
+                headers={"enqueued_at": time.time()},
+            )
+
+        transaction.on_commit(send)
+
+    @staticmethod
+    def enqueue_many(submission_ids, priority="contest"):
+        """
+        Queue many submissions for judging once the current transaction commits.
+
+        A single fan-out message goes to the broker; a worker then publishes
+        the individual judge tasks (see ``send_many``). Batches are never
+        counted against a user's concurrency cap.
+        """
+        from ..tasks import enqueue_submissions
+
+        submission_ids = list(submission_ids)
+        if not submission_ids:
+            return
+
+        def send():
+            enqueued_at = time.time()
+            enqueue_submissions.apply_async(
+                (submission_ids, priority, enqueued_at),
+                queue=JudgeQueue.get_queue(priority),
+                headers={"enqueued_at": enqueued_at},
+            )
+
+        transaction.on_commit(send)
+
+    @staticmethod
+    def send_many(submission_ids, priority, enqueued_at):
+        """Publish a judge task per submission over one broker connection."""
+        from ..tasks import judge_submission
+
+        queue = JudgeQueue.get_queue(priority)
+        with judge_submission.app.producer_or_acquire() as producer:
+            for submission_id in submission_ids:
+                judge_submission.apply_async(
+                    (submission_id,),
+                    {"user_id": None},
+                    queue=queue,
+                    # Queue latency counts from the batch submit, not the fan-out.
+                    headers={"enqueued_at": enqueued_at},
+                    producer=producer,
+                )
+
+    @staticmethod
+    def evaluate(problem, code, language, code_hash=""):
+        """Judge ``code`` against the problem's current tests and cache the verdict."""
+        verdict = run_in_pool(
+            code,
+            language,
+            JudgeService.get_test_cases(problem),
+            JudgeService.get_limits(),
+            timeout=settings.JUDGE_TASK_TIMEOUT,
+            batch=settings.JUDGE_BATCH_TESTS,
+            max_workers=settings.JUDGE_POOL_SIZE,
+            nice_increment=settings.JUDGE_NICE,
+            interpreter_max_runs=settings.JUDGE_INTERPRETER_MAX_RUNS,
+            sandbox_user=settings.JUDGE_SANDBOX_USER,
+            hidden_paths=tuple(settings.JUDGE_SANDBOX_HIDDEN_PATHS),
+        )
+        VerdictCache.set(
+            problem.id,
+            problem.tests_version,
+            language,
+            code_hash or VerdictCache.hash_code(code),
+            verdict,
+        )
+        return verdict
+
+    @staticmethod
+    def judge_submission(submission_id):
+        """Evaluate a pending submission and store its verdict."""
+        try:
+            submission = Submission.objects.select_related("problem", "problem__test_data").get(
+                id=submission_id
+            )
+        except Submission.DoesNotExist:
+            logger.warning("Submission %s vanished before judging", submission_id)
+            return None
+
+        Submission.objects.filter(id=submission_id).update(status="running")
+        SubmissionEvents.publish(submission_id, {"status": "running"})
+
+        problem = submission.problem
+        try:
+            verdict = JudgeService.evaluate(
+                problem, submission.code, submission.language, submission.code_hash
+            )
+        except Exception:
+            logger.exception("Judging submission %s failed", submission_id)
+            verdict = {
+                "status": "error",
+                "runtime": None,
+                "memory": None,
+                "error_message": "Internal judge error",
+                "test_results": [],
+            }
+            # No tests version: a rejudge of the problem retries it.
+            fields = verdict
+        else:
+            fields = {**verdict, "tests_version": problem.tests_version}
+
+        Submission.objects.filter(id=submission_id).update(**fields)
+        SubmissionEvents.publish(submission_id, verdict)
+        return verdict
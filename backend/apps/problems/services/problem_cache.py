@@ -0,0 +1,117 @@
+"""
+Versioned, stampede-protected cache of serialized problem details.
+
+Each slug has a version counter; payloads are stored under the current
+version, so invalidating a problem is a single ``incr`` and stale payloads
+simply age out. Versions and payloads are read through the two-tier cache,
+so a hot problem is usually served without leaving the process.
+
+Entries are refreshed probabilistically ahead of expiry (XFetch), and only
+one process recomputes a given entry at a time while the others keep
+serving the previous payload.
+"""
+
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import tiered_cache
+
+# Larger values refresh earlier; 1.0 is the value recommended for XFetch.
+EARLY_RECOMPUTE_BETA = 1.0
+LOCK_TIMEOUT = 10  # seconds a recompute may hold the lock
+WAIT_INTERVAL = 0.05  # seconds between polls while another process recomputes
+WAIT_TIMEOUT = 1.0
+
+
+class ProblemCache:
+    """Cache of pre-serialized problem payloads."""
+
+    @staticmethod
+    def version_key(slug):
+        return f"problem_version_{slug}"
+
+    @staticmethod
+    def get_version(slug):
+        """Return the current cache version for a slug."""
+        key = ProblemCache.version_key(slug)
+        version = tiered_cache.get(key)
+        if version is None:
+            cache.add(key, 1, timeout=None)
+            version = tiered_cache.get(key, 1)
+        return version
+
+    @staticmethod
+    def invalidate(*slugs):
+        """Move slugs to a new version, orphaning every payload cached for them."""
+        for slug in slugs:
+            key = ProblemCache.version_key(slug)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, 2, timeout=None)
+            tiered_cache.invalidate(key)
+
+    @staticmethod
+    def get_or_compute(slug, compute):
+        """
+        Return the cached payload for ``slug``, computing it with ``compute()`` if needed.
+
+        ``compute`` returns a picklable payload, or None when the problem does
+        not exist (which is never cached).
+        """
+        version = ProblemCache.get_version(slug)
+        key = f"problem_detail_{slug}_v{version}"
+        entry = tiered_cache.get(key)
+        if entry is not None and not ProblemCache._should_refresh(entry):
+            return entry["data"]
+
+        lock_key = f"{key}_lock"
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                return ProblemCache._recompute(key, compute)
+            finally:
+                cache.delete(lock_key)
+
+        if entry is not None:
+            # Someone else is already refreshing; the current payload is still valid.
+            return entry["data"]
+        entry = ProblemCache._wait_for(key)
+        if entry is not None:
+            return entry["data"]
+        return compute()
+
+    @staticmethod
+    def _should_refresh(entry):
+        # XFetch: the closer to expiry and the slower the recompute, the likelier
+        # a request refreshes early. 1 - random() keeps the log argument in (0, 1].
+        jitter = -entry["delta"] * EARLY_RECOMPUTE_BETA * math.log(1.0 - random.random())
+        return time.time() + jitter >= entry["expires_at"]
+
+    @staticmethod
+    def _recompute(key, compute):
+        started = time.monotonic()
+        data = compute()
+        if data is None:
+            return None
+        ttl = settings.PROBLEM_CACHE_TTL
+        entry = {
+            "data": data,
+            "delta": time.monotonic() - started,
+            "expires_at": time.time() + ttl,
+        }
+        tiered_cache.set(key, entry, ttl)
+        return data
+
+    @staticmethod
+    def _wait_for(key):
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            entry = tiered_cache.get(key)
+            if entry is not None:
+                return entry
+        return None
@@ -2,9 +2,34 @@
 Problem service layer - handles business logic.
 """
 
-from django.core.cache import cache
-
 from ..models import Problem, Submission
+from ..serializers import ProblemSerializer
+from .judge_service import JudgeService
+from .problem_cache import ProblemCache
+from .tag_service import MATCH_ALL, TagService
+from .verdict_cache import VerdictCache
+
+SUBMISSION_LIST_FIELDS = (
+    "id",
+    "user",
+    "user__username",
+    "problem",
+    "problem__title",
+    "code",
+    "language",
+    "status",
+    "runtime",
+    "memory",
+    "error_message",
+    "submitted_at",
+)
+
+
+def _verdict_fields(problem, cached_verdict):
+    """Fields of a new submission: its cached verdict, or pending."""
+    if cached_verdict is None:
+        return {"status": "pending"}
+    return {**cached_verdict, "tests_version": problem.tests_version}
 
 
 class ProblemService:
@@ -19,39 +44,106 @@ class ProblemService:
             if "difficulty" in filters:
                 queryset = queryset.filter(difficulty=filters["difficulty"])
             if "tags" in filters:
-                queryset = queryset.filter(tags__contains=filters["tags"])
+                queryset = TagService.filter_problems(
+                    queryset, filters["tags"], filters.get("match", MATCH_ALL)
+                )
 
         return queryset
 
     @staticmethod
-    def get_problem_by_slug(slug):
-        """Get problem by slug with caching."""
-        cache_key = f"problem_{slug}"
-        problem = cache.get(cache_key)
+    def get_problem_detail(slug):
+        """Return the serialized problem for ``slug`` from the cache, or None."""
 
-        if not problem:
-            try:
-                problem = Problem.objects.get(slug=slug)
-                cache.set(cache_key, problem, 600)  # Cache for 10 minutes
-            except Problem.DoesNotExist:
-                return None
+        def serialize():
+            problem = Problem.objects.filter(slug=slug).first()
+            return None if problem is None else dict(ProblemSerializer(problem).data)
 
-        return problem
+        return ProblemCache.get_or_compute(slug, serialize)
 
     @staticmethod
     def create_submission(user, problem_id, code, language):
-        """Create a new submission."""
+        """Create a new submission, reusing the verdict of identical earlier code."""
         try:
             problem = Problem.objects.get(id=problem_id)
-            submission = Submission.objects.create(
-                user=user, problem=problem, code=code, language=language, status="pending"
-            )
-            # In production, trigger async task to evaluate submission
-            return submission
         except Problem.DoesNotExist:
             return None
 
+        code_hash = VerdictCache.hash_code(code)
+        cached_verdict = VerdictCache.get(problem.id, problem.tests_version, language, code_hash)
+        submission = Submission.objects.create(
+            user=user,
+            problem=problem,
+            code=code,
+            language=language,
+            code_hash=code_hash,
+            **_verdict_fields(problem, cached_verdict),
+        )
+        if cached_verdict is None:
+            JudgeService.enqueue(submission)
+        return submission
+
     @staticmethod
-    def get_user_submissions(user_id):
-        """Get all submissions for a user."""
-        return Submission.objects.filter(user_id=user_id)
+    def create_submissions(user, entries, priority="contest"):
+        """
+        Create many submissions at once, e.g. from an autograder.
+
+        ``entries`` are dicts with ``problem_id``, ``code`` and ``language``.
+        The problems are fetched in one query and the cached verdicts in one
+        cache round trip; the rows are inserted with ``bulk_create`` and the
+        ones still pending are queued with a single broker message.
+
+        Returns ``(submissions, missing_problem_ids)``; nothing is created
+        when any problem does not exist.
+        """
+        problem_ids = {entry["problem_id"] for entry in entries}
+        problems = Problem.objects.only("id", "title", "tests_version").in_bulk(problem_ids)
+        missing = sorted(problem_ids - problems.keys())
+        if missing:
+            return [], missing
+
+        programs = [
+            (
+                entry["problem_id"],
+                problems[entry["problem_id"]].tests_version,
+                entry["language"],
+                VerdictCache.hash_code(entry["code"]),
+            )
+            for entry in entries
+        ]
+        cached_verdicts = VerdictCache.get_many(programs)
+        submissions = []
+        for entry, program in zip(entries, programs):
+            problem = problems[entry["problem_id"]]
+            submissions.append(
+                Submission(
+                    user=user,
+                    problem=problem,
+                    code=entry["code"],
+                    language=entry["language"],
+                    code_hash=program[-1],
+                    **_verdict_fields(problem, cached_verdicts.get(program)),
+                )
+            )
+        Submission.objects.bulk_create(submissions)
+        JudgeService.enqueue_many(
+            [submission.id for submission in submissions if submission.status == "pending"],
+            priority,
+        )
+        return submissions, []
+
+    @staticmethod
+    def get_user_submissions(user_id, include_code=True):
+        """
+        Get all submissions for a user.
+
+        The problem title and username are joined in, so serializing the list
+        costs one query however many rows it has.
+        """
+        queryset = (
+            Submission.objects.filter(user_id=user_id)
+            .select_related("problem", "user")
+            .only(*SUBMISSION_LIST_FIELDS)
+        )
+        if not include_code:
+            queryset = queryset.defer("code")
+        return queryset
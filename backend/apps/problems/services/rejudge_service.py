@@ -0,0 +1,184 @@
+"""
+Rejudge service - re-evaluates a problem's submissions after its tests change.
+
+Every submission records the ``Problem.tests_version`` its verdict was judged
+against; the ones behind the problem's current version are stale. ``start``
+streams the distinct programs (language and code hash) among the stale
+submissions with a server-side cursor and queues them in batches on the
+rejudge queue, so each program is judged once however often it was
+submitted. A batch task judges its programs, reusing verdicts already cached
+for the new tests, and writes them to every stale copy with ``bulk_update``.
+
+Rejudging is resumable: a second ``start`` only finds the submissions that
+are still stale, and programs judged in the meantime come from the verdict
+cache instead of being run again.
+"""
+
+import itertools
+import logging
+import time
+
+from django.db.models import Count, F, Min, Q
+
+from ..models import Problem, Submission
+from .judge_queue import JudgeQueue
+from .judge_service import JudgeService
+from .verdict_cache import VERDICT_FIELDS, VerdictCache
+
+logger = logging.getLogger(__name__)
+
+PROGRAMS_PER_TASK = 20
+SCAN_CHUNK_SIZE = 2000
+UPDATE_BATCH_SIZE = 500
+
+# Their own judge tasks are still coming, against the current tests.
+IN_FLIGHT_STATUSES = ("pending", "running")
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class RejudgeService:
+    """Bulk rejudging of a problem's stale submissions."""
+
+    @staticmethod
+    def get_stale_submissions(problem):
+        return (
+            Submission.objects.filter(
+                problem_id=problem.id, tests_version__lt=problem.tests_version
+            )
+            .exclude(status__in=IN_FLIGHT_STATUSES)
+            .order_by()
+        )
+
+    @staticmethod
+    def get_progress(problem):
+        """Return how many of the problem's judged submissions are current and how many stale."""
+        counts = (
+            Submission.objects.filter(problem_id=problem.id)
+            .exclude(status__in=IN_FLIGHT_STATUSES)
+            .aggregate(
+                total=Count("id"),
+                stale=Count("id", filter=Q(tests_version__lt=problem.tests_version)),
+            )
+        )
+        return {"tests_version": problem.tests_version, **counts}
+
+    @staticmethod
+    def bump_tests_version(problem):
+        """Make every submission of ``problem`` stale, e.g. after a judge change."""
+        Problem.objects.filter(id=problem.id).update(tests_version=F("tests_version") + 1)
+        problem.refresh_from_db(fields=["tests_version"])
+
+    @staticmethod
+    def backfill_code_hashes(problem):
+        """Hash stale submissions saved before code hashes were recorded."""
+        queryset = RejudgeService.get_stale_submissions(problem).filter(code_hash="")
+        updated = 0
+        for batch in _batched(
+            queryset.only("id", "code").iterator(chunk_size=SCAN_CHUNK_SIZE), UPDATE_BATCH_SIZE
+        ):
+            for submission in batch:
+                submission.code_hash = VerdictCache.hash_code(submission.code)
+            Submission.objects.bulk_update(batch, ["code_hash"])
+            updated += len(batch)
+        return updated
+
+    @staticmethod
+    def iter_programs(problem):
+        """Yield ``[submission_id, language, code_hash]`` once per distinct stale program."""
+        programs = (
+            RejudgeService.get_stale_submissions(problem)
+            .values_list("language", "code_hash")
+            .annotate(sample_id=Min("id"))
+            .order_by("language", "code_hash")
+        )
+        for language, code_hash, sample_id in programs.iterator(chunk_size=SCAN_CHUNK_SIZE):
+            yield [sample_id, language, code_hash]
+
+    @staticmethod
+    def start(problem, on_progress=None):
+        """
+        Queue every stale program of ``problem`` for rejudging.
+
+        ``on_progress(programs_queued)`` is called after each queued batch.
+        Returns the number of programs and tasks queued.
+        """
+        from ..tasks import rejudge_programs
+
+        RejudgeService.backfill_code_hashes(problem)
+        queue = JudgeQueue.get_queue("rejudge")
+        programs = tasks = 0
+        # One broker connection for the whole fan-out.
+        with rejudge_programs.app.producer_or_acquire() as producer:
+            for batch in _batched(RejudgeService.iter_programs(problem), PROGRAMS_PER_TASK):
+                rejudge_programs.apply_async(
+                    (problem.id, problem.tests_version, batch),
+                    queue=queue,
+                    headers={"enqueued_at": time.time()},
+                    producer=producer,
+                )
+                programs += len(batch)
+                tasks += 1
+                if on_progress:
+                    on_progress(programs)
+        logger.info("Queued %s programs of problem %s for rejudging", programs, problem.id)
+        return {"programs": programs, "tasks": tasks}
+
+    @staticmethod
+    def rejudge_programs(problem_id, tests_version, programs):
+        """Judge a batch of programs and update their stale submissions; return how many."""
+        problem = Problem.objects.select_related("test_data").filter(id=problem_id).first()
+        if problem is None or problem.tests_version != tests_version:
+            # Deleted, or the tests changed again and a newer rejudge covers it.
+            return 0
+
+        codes = dict(
+            Submission.objects.filter(id__in=[sample_id for sample_id, _, _ in programs])
+            .values_list("id", "code")
+            .iterator()
+        )
+        verdicts = {}
+        for sample_id, language, code_hash in programs:
+            verdict = VerdictCache.get(problem.id, tests_version, language, code_hash)
+            if verdict is None and sample_id in codes:
+                try:
+                    verdict = JudgeService.evaluate(problem, codes[sample_id], language, code_hash)
+                except Exception:
+                    # Stays stale; the next rejudge of the problem retries it.
+                    logger.exception("Rejudging submission %s failed", sample_id)
+            if verdict is not None:
+                verdicts[(language, code_hash)] = verdict
+        return RejudgeService.write_verdicts(problem, verdicts)
+
+    @staticmethod
+    def write_verdicts(problem, verdicts):
+        """Store ``{(language, code_hash): verdict}`` on the stale copies of those programs."""
+        if not verdicts:
+            return 0
+        fields = [*VERDICT_FIELDS, "tests_version"]
+        defaults = {
+            field: Submission._meta.get_field(field).get_default() for field in VERDICT_FIELDS
+        }
+        stale = (
+            RejudgeService.get_stale_submissions(problem)
+            .filter(code_hash__in={code_hash for _, code_hash in verdicts})
+            .only("id", "language", "code_hash")
+        )
+        updated = 0
+        for batch in _batched(stale.iterator(chunk_size=SCAN_CHUNK_SIZE), UPDATE_BATCH_SIZE):
+            changed = []
+            for submission in batch:
+                verdict = verdicts.get((submission.language, submission.code_hash))
+                if verdict is None:
+                    continue
+                for field in VERDICT_FIELDS:
+                    setattr(submission, field, verdict.get(field, defaults[field]))
+                submission.tests_version = problem.tests_version
+                changed.append(submission)
+            Submission.objects.bulk_update(changed, fields)
+            updated += len(changed)
+        return updated
@@ -0,0 +1,45 @@
+"""
+Problem search service layer - ranked full-text search with typo tolerance.
+
+On Postgres, queries hit the trigger-maintained ``search_vector`` column
+(title weighted above description) and a trigram index on the title, both
+GIN-indexed. Other databases fall back to substring matching.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+SEARCH_CONFIG = "english"
+
+
+class ProblemSearchService:
+    """Service for searching problems."""
+
+    @staticmethod
+    def search(queryset, query):
+        """Filter ``queryset`` to problems matching ``query``, annotated with ``rank``."""
+        query = query.strip()
+        if connection.vendor != "postgresql":
+            return ProblemSearchService._substring_search(queryset, query)
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        # The trigram branch catches misspelt titles the stemmed vector cannot match;
+        # Postgres ORs the two GIN index scans together.
+        return queryset.filter(
+            Q(search_vector=search_query) | Q(title__trigram_similar=query)
+        ).annotate(
+            rank=SearchRank(F("search_vector"), search_query) + TrigramSimilarity("title", query)
+        )
+
+    @staticmethod
+    def _substring_search(queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+        ).annotate(
+            rank=Case(
+                When(title__icontains=query, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
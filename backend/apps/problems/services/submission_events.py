@@ -0,0 +1,118 @@
+"""
+Submission events - judge state transitions over Redis pub/sub.
+
+The judge publishes every status change of a submission on its own channel;
+the streaming endpoint subscribes to that channel, so a client waiting for a
+verdict holds one idle connection instead of polling.
+
+Browsers' ``EventSource`` cannot send an ``Authorization`` header, so
+clients first exchange their JWT for a stream ticket: a random, single-use
+token that expires after ``SUBMISSION_EVENTS_TICKET_TTL`` seconds and only
+opens the stream of one submission. Only the ticket appears in URLs and
+access logs.
+"""
+
+import contextlib
+import json
+import logging
+import secrets
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = {
+    "accepted",
+    "wrong_answer",
+    "time_limit_exceeded",
+    "memory_limit_exceeded",
+    "error",
+}
+
+EVENT_FIELDS = ("id", "status", "runtime", "memory", "error_message")
+
+_publisher = None
+
+
+def _get_publisher():
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(
+            settings.SUBMISSION_EVENTS_REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+    return _publisher
+
+
+class SubmissionEvents:
+    """Publish and subscribe to submission status changes."""
+
+    @staticmethod
+    def channel(submission_id):
+        return f"submission_events_{submission_id}"
+
+    @staticmethod
+    def make_event(submission_id, data):
+        """Build the event payload from a verdict dict or ``values()`` row."""
+        event = {field: data.get(field) for field in EVENT_FIELDS}
+        event["id"] = submission_id
+        return event
+
+    @staticmethod
+    def ticket_key(ticket):
+        return f"submission_events_ticket_{ticket}"
+
+    @staticmethod
+    def issue_ticket(user_id, submission_id):
+        """Return a new ticket that lets ``user_id`` open the submission's stream once."""
+        ticket = secrets.token_urlsafe(32)
+        cache.set(
+            SubmissionEvents.ticket_key(ticket),
+            {"user_id": user_id, "submission_id": submission_id},
+            settings.SUBMISSION_EVENTS_TICKET_TTL,
+        )
+        return ticket
+
+    @staticmethod
+    async def redeem_ticket(ticket, submission_id):
+        """Consume a ticket for the submission's stream; return its user id, or None."""
+        key = SubmissionEvents.ticket_key(ticket)
+        grant = await cache.aget(key)
+        # Only the request that deletes the ticket may use it.
+        if grant is None or not await cache.adelete(key):
+            return None
+        if grant["submission_id"] != submission_id:
+            return None
+        return grant["user_id"]
+
+    @staticmethod
+    def publish(submission_id, data):
+        """Publish a status change; delivery is best effort and never fails the caller."""
+        event = SubmissionEvents.make_event(submission_id, data)
+        try:
+            _get_publisher().publish(SubmissionEvents.channel(submission_id), json.dumps(event))
+        except redis.RedisError:
+            logger.warning("Could not publish event for submission %s", submission_id)
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def subscribe(submission_id):
+        """Yield an asyncio pub/sub object subscribed to the submission's channel."""
+        client = aioredis.Redis.from_url(settings.SUBMISSION_EVENTS_REDIS_URL)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(SubmissionEvents.channel(submission_id))
+            yield pubsub
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+    @staticmethod
+    async def next_event(pubsub, timeout):
+        """Wait up to ``timeout`` seconds for the next event; return None on timeout."""
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message["data"])
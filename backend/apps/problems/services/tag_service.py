@@ -0,0 +1,87 @@
+"""
+Tag service layer - keeps the normalized tag index and counts in sync.
+"""
+
+from django.db import transaction
+from django.db.models import F
+
+from ..models import ProblemTag, Tag
+
+MATCH_ALL = "all"
+MATCH_ANY = "any"
+MAX_TAG_LENGTH = Tag._meta.get_field("name").max_length
+
+
+def normalize_tags(tags):
+    """
+    Lowercase, strip and de-duplicate tag names, dropping empty ones.
+
+    Names are cut to ``MAX_TAG_LENGTH`` so problems saved without going through
+    the API (admin, fixtures, imports) cannot overflow the tag index.
+    """
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return sorted(
+        {str(tag).strip().lower()[:MAX_TAG_LENGTH].strip() for tag in tags if str(tag).strip()}
+    )
+
+
+class TagService:
+    """Service for tag-related operations."""
+
+    @staticmethod
+    def filter_problems(queryset, tags, match=MATCH_ALL):
+        """Restrict a Problem queryset to problems with all (or any) of ``tags``."""
+        tags = normalize_tags(tags)
+        if not tags:
+            return queryset
+        if match == MATCH_ANY:
+            return queryset.filter(
+                id__in=ProblemTag.objects.filter(tag__name__in=tags).values("problem_id")
+            )
+        for tag in tags:
+            queryset = queryset.filter(
+                id__in=ProblemTag.objects.filter(tag__name=tag).values("problem_id")
+            )
+        return queryset
+
+    @staticmethod
+    def get_tag_counts():
+        """Return ``{"name", "problem_count"}`` rows for tags in use, most used first."""
+        return list(Tag.objects.filter(problem_count__gt=0).values("name", "problem_count"))
+
+    @staticmethod
+    @transaction.atomic
+    def sync_problem_tags(problem):
+        """Make the problem's ProblemTag rows and the tag counts match ``problem.tags``."""
+        wanted = set(normalize_tags(problem.tags))
+        current = set(
+            ProblemTag.objects.filter(problem=problem).values_list("tag__name", flat=True)
+        )
+
+        added = wanted - current
+        if added:
+            Tag.objects.bulk_create([Tag(name=name) for name in added], ignore_conflicts=True)
+            tag_ids = list(Tag.objects.filter(name__in=added).values_list("id", flat=True))
+            ProblemTag.objects.bulk_create(
+                [ProblemTag(problem=problem, tag_id=tag_id) for tag_id in tag_ids]
+            )
+            Tag.objects.filter(id__in=tag_ids).update(problem_count=F("problem_count") + 1)
+
+        removed = current - wanted
+        if removed:
+            ProblemTag.objects.filter(problem=problem, tag__name__in=removed).delete()
+            TagService._decrement(removed)
+
+    @staticmethod
+    def release_problem_tags(problem):
+        """Decrement counts for a problem that is about to be deleted."""
+        names = list(ProblemTag.objects.filter(problem=problem).values_list("tag__name", flat=True))
+        if names:
+            TagService._decrement(names)
+
+    @staticmethod
+    def _decrement(names):
+        Tag.objects.filter(name__in=names, problem_count__gt=0).update(
+            problem_count=F("problem_count") - 1
+        )
@@ -0,0 +1,122 @@
+"""
+Test data service layer - imports hidden test cases into packed files.
+
+Every import writes a new pack version. Superseded packs stay on disk until
+no submission made before the import is still waiting for or in the judge,
+which may be reading them; ``prune_packs`` then deletes them.
+"""
+
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ..judge.testdata import write_pack
+from ..models import Problem, ProblemTestData, Submission
+from .rejudge_service import IN_FLIGHT_STATUSES
+
+INPUT_SUFFIX = ".in"
+OUTPUT_SUFFIXES = (".out", ".ans")
+
+
+def _private_dir(path):
+    """Create ``path`` and its parents, if needed, and make ``path`` owner-only."""
+    path.mkdir(parents=True, exist_ok=True)
+    path.chmod(0o700)
+
+
+def _natural_key(path):
+    """Sort ``2.in`` before ``10.in``."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path.stem)]
+
+
+class ProblemTestDataService:
+    """Service for problem test data."""
+
+    @staticmethod
+    def collect_cases(directory):
+        """
+        Pair ``NAME.in`` files with ``NAME.out`` (or ``NAME.ans``) in ``directory``.
+
+        Only paths are returned; file contents are streamed later by the pack writer.
+        """
+        directory = Path(directory)
+        cases = []
+        for input_path in sorted(directory.glob(f"*{INPUT_SUFFIX}"), key=_natural_key):
+            for suffix in OUTPUT_SUFFIXES:
+                output_path = input_path.with_suffix(suffix)
+                if output_path.exists():
+                    cases.append((input_path, output_path))
+                    break
+            else:
+                raise FileNotFoundError(f"No expected output for {input_path}")
+        return cases
+
+    @staticmethod
+    def import_directory(problem, directory):
+        """Pack the cases in ``directory`` and make them the problem's test data."""
+        cases = ProblemTestDataService.collect_cases(directory)
+        if not cases:
+            raise FileNotFoundError(f"No *{INPUT_SUFFIX} files in {directory}")
+
+        with transaction.atomic():
+            test_data, _ = ProblemTestData.objects.select_for_update().get_or_create(
+                problem=problem
+            )
+            superseded = bool(test_data.pack_path)
+
+            version = test_data.version + 1
+            pack_path = os.path.join(f"problem_{problem.id}", f"v{version}.pack")
+            absolute_path = Path(settings.JUDGE_TESTDATA_ROOT) / pack_path
+            _private_dir(Path(settings.JUDGE_TESTDATA_ROOT))
+            _private_dir(absolute_path.parent)
+            write_pack(absolute_path, cases)
+
+            test_data.pack_path = pack_path
+            test_data.case_count = len(cases)
+            test_data.size_bytes = absolute_path.stat().st_size
+            test_data.version = version
+            test_data.save()
+            Problem.objects.filter(id=problem.id).update(tests_version=F("tests_version") + 1)
+
+        if superseded:
+            ProblemTestDataService.schedule_prune(problem.id)
+        return test_data
+
+    @staticmethod
+    def schedule_prune(problem_id):
+        """Delete the problem's superseded packs later, once judges are done with them."""
+        from ..tasks import prune_test_packs
+
+        transaction.on_commit(
+            lambda: prune_test_packs.apply_async(
+                (problem_id,), countdown=settings.JUDGE_TESTDATA_PRUNE_DELAY
+            )
+        )
+
+    @staticmethod
+    def prune_packs(problem_id):
+        """
+        Delete the problem's superseded packs.
+
+        Returns False, keeping them, while a submission made before the current
+        pack is still pending or running: its judge may read the old pack.
+        """
+        test_data = ProblemTestData.objects.filter(problem_id=problem_id).first()
+        if test_data is None or not test_data.pack_path:
+            return True
+        in_flight = Submission.objects.filter(
+            problem_id=problem_id,
+            status__in=IN_FLIGHT_STATUSES,
+            submitted_at__lt=test_data.updated_at,
+        )
+        if in_flight.exists():
+            return False
+        current = Path(test_data.absolute_path)
+        for path in current.parent.glob("v*.pack"):
+            if path != current:
+                path.unlink(missing_ok=True)
+        return True
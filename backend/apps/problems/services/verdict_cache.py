@@ -0,0 +1,71 @@
+"""
+Content-addressed verdict cache.
+
+Verdicts are keyed by problem, test revision, language and a hash of the
+normalized code, so resubmitting identical code is answered without judging.
+Bumping ``Problem.tests_version`` orphans every key for the old tests.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Verdicts that depend only on the code and the tests. Time and memory limit
+# verdicts vary with machine load, and "error" also covers judge failures (a
+# runner killed by the OOM killer or a worker shutdown, a failed fork), so
+# those submissions are always re-judged.
+CACHEABLE_STATUSES = {"accepted", "wrong_answer"}
+
+VERDICT_FIELDS = ("status", "runtime", "memory", "error_message", "test_results")
+
+
+class VerdictCache:
+    """Cache of judge verdicts for identical programs."""
+
+    @staticmethod
+    def normalize_code(code):
+        """
+        Normalize code so whitespace-only edits hash the same.
+
+        Line endings, trailing whitespace and leading/trailing blank lines are
+        ignored; indentation is kept because it is significant in Python.
+        """
+        lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+        return "\n".join(lines).strip("\n")
+
+    @staticmethod
+    def hash_code(code):
+        """Return the hex SHA-256 of the normalized code."""
+        return hashlib.sha256(VerdictCache.normalize_code(code).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(problem_id, tests_version, language, code_hash):
+        return f"verdict_{problem_id}_{tests_version}_{language}_{code_hash}"
+
+    @staticmethod
+    def get(problem_id, tests_version, language, code_hash):
+        """Return a cached verdict dict, or None."""
+        return cache.get(VerdictCache.make_key(problem_id, tests_version, language, code_hash))
+
+    @staticmethod
+    def get_many(programs):
+        """
+        Look up many verdicts in one cache round trip.
+
+        ``programs`` holds ``(problem_id, tests_version, language, code_hash)``
+        tuples; returns the cached verdicts keyed by those tuples.
+        """
+        keys = {VerdictCache.make_key(*program): program for program in programs}
+        return {keys[key]: verdict for key, verdict in cache.get_many(list(keys)).items()}
+
+    @staticmethod
+    def set(problem_id, tests_version, language, code_hash, verdict):
+        """Store ``verdict`` if its status is deterministic."""
+        if verdict.get("status") not in CACHEABLE_STATUSES:
+            return
+        cache.set(
+            VerdictCache.make_key(problem_id, tests_version, language, code_hash),
+            {field: verdict[field] for field in VERDICT_FIELDS if field in verdict},
+            settings.JUDGE_VERDICT_CACHE_TTL,
+        )
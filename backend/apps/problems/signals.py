@@ -0,0 +1,63 @@
+"""
+Signal handlers for the problems app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Problem
+from .services.problem_cache import ProblemCache
+from .services.tag_service import TagService
+
+
+@receiver(pre_save, sender=Problem)
+def bump_tests_version(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Examples double as judge tests, so editing them invalidates cached verdicts."""
+    if raw or instance.pk is None:
+        return
+    # A save restricted to other fields cannot change the examples (and could
+    # not persist the bumped version either).
+    if update_fields is not None and "examples" not in update_fields:
+        return
+    previous = Problem.objects.filter(pk=instance.pk).values_list("examples", flat=True).first()
+    if previous is not None and previous != instance.examples:
+        instance.tests_version += 1
+
+
+@receiver(post_save, sender=Problem)
+def sync_problem_tags(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the normalized tag index and tag counts in step with ``Problem.tags``."""
+    if raw or (update_fields is not None and "tags" not in update_fields):
+        return
+    TagService.sync_problem_tags(instance)
+
+
+@receiver(pre_delete, sender=Problem)
+def release_problem_tags(sender, instance, **kwargs):
+    TagService.release_problem_tags(instance)
+
+
+@receiver(pre_save, sender=Problem)
+def remember_previous_slug(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the stored slug so a rename also invalidates the old cache entry."""
+    instance._previous_slug = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and "slug" not in update_fields:
+        return
+    instance._previous_slug = (
+        Problem.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Problem)
+def invalidate_cached_problem(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, "_previous_slug", None)} - {None}
+    # After commit, so a concurrent reader cannot re-cache the old row.
+    transaction.on_commit(lambda: ProblemCache.invalidate(*slugs))
+
+
+@receiver(post_delete, sender=Problem)
+def invalidate_deleted_problem(sender, instance, **kwargs):
+    transaction.on_commit(lambda: ProblemCache.invalidate(instance.slug))
@@ -0,0 +1,62 @@
+"""
+Celery tasks for the problems app.
+"""
+
+from celery import shared_task
+from celery.signals import worker_ready
+from django.conf import settings
+
+from .models import Problem
+from .services.judge_queue import JudgeQueue
+from .services.judge_service import JudgeService
+from .services.rejudge_service import RejudgeService
+from .services.testdata_service import ProblemTestDataService
+
+
+@shared_task(bind=True, acks_late=True, ignore_result=True, max_retries=None)
+def judge_submission(self, submission_id, user_id=None):
+    """Evaluate a submission on the judge pool, within its user's concurrency cap."""
+    # A task that has waited out JUDGE_USER_MAX_RETRIES turns is judged regardless.
+    capped = user_id is not None and self.request.retries < settings.JUDGE_USER_MAX_RETRIES
+    if capped and not JudgeQueue.acquire_slot(user_id, submission_id):
+        # Back to the end of the queue, behind other users' submissions.
+        raise self.retry(countdown=JudgeQueue.retry_delay(self.request.retries))
+    try:
+        JudgeService.judge_submission(submission_id)
+    finally:
+        if capped:
+            JudgeQueue.release_slot(user_id, submission_id)
+
+
+@shared_task(acks_late=True, ignore_result=True)
+def enqueue_submissions(submission_ids, priority, enqueued_at):
+    """Fan a batch submit out into one judge task per submission."""
+    JudgeService.send_many(submission_ids, priority, enqueued_at)
+
+
+@shared_task(acks_late=True, ignore_result=True)
+def start_rejudge(problem_id):
+    """Queue the stale submissions of a problem for rejudging."""
+    problem = Problem.objects.filter(id=problem_id).first()
+    if problem is not None:
+        RejudgeService.start(problem)
+
+
+@shared_task(acks_late=True, ignore_result=True)
+def rejudge_programs(problem_id, tests_version, programs):
+    """Judge a batch of distinct programs and write back their verdicts."""
+    RejudgeService.rejudge_programs(problem_id, tests_version, programs)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=24)
+def prune_test_packs(self, problem_id):
+    """Delete superseded test packs, waiting while older submissions are still judged."""
+    if not ProblemTestDataService.prune_packs(problem_id):
+        # Left on disk after the last retry; the next import schedules another prune.
+        raise self.retry(countdown=settings.JUDGE_TESTDATA_PRUNE_DELAY)
+
+
+@worker_ready.connect
+def start_judge_heartbeat(**kwargs):
+    """Let readiness probes see that a judge worker is consuming the queue."""
+    JudgeService.start_heartbeat()
@@ -4,11 +4,35 @@ Problems URL patterns.
 
 from django.urls import path
 
-from .views import ProblemDetailView, ProblemListView, get_user_submissions, submit_solution
+from .views import (
+    ProblemDetailView,
+    ProblemListView,
+    get_user_submissions,
+    search_problems,
+    submission_events,
+    submission_events_ticket,
+    submit_batch,
+    submit_solution,
+    tag_facets,
+)
 
 urlpatterns = [
     path("", ProblemListView.as_view(), name="problem-list"),
-    path("<slug:slug>/", ProblemDetailView.as_view(), name="problem-detail"),
+    path("search/", search_problems, name="problem-search"),
+    path("tags/", tag_facets, name="problem-tags"),
     path("submit/", submit_solution, name="submit-solution"),
+    path("submit/batch/", submit_batch, name="submit-batch"),
     path("submissions/", get_user_submissions, name="user-submissions"),
+    path(
+        "submissions/<int:submission_id>/events/",
+        submission_events,
+        name="submission-events",
+    ),
+    path(
+        "submissions/<int:submission_id>/events/ticket/",
+        submission_events_ticket,
+        name="submission-events-ticket",
+    ),
+    # Keep last: the slug pattern would also match "search", "tags", "submit" and "submissions".
+    path("<slug:slug>/", ProblemDetailView.as_view(), name="problem-detail"),
 ]
@@ -2,30 +2,60 @@
 Problem views - API endpoints.
 """
 
+import json
+import time
+
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.idempotency import idempotent
+from core.query_budget import query_budget
 
-from .models import Problem
-from .serializers import ProblemSerializer, SubmissionSerializer
+from .models import Problem, Submission
+from .pagination import SubmissionPagination
+from .serializers import (
+    ProblemSerializer,
+    ProblemSummarySerializer,
+    SubmissionBatchSerializer,
+    SubmissionSerializer,
+)
 from .services.problem_service import ProblemService
+from .services.search_service import ProblemSearchService
+from .services.submission_events import FINAL_STATUSES, SubmissionEvents
+from .services.tag_service import MATCH_ANY, TagService
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
 
 
 class ProblemListView(generics.ListAPIView):
-    """List all problems."""
+    """List all problems as compact summaries."""
 
-    serializer_class = ProblemSerializer
+    serializer_class = ProblemSummarySerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 2  # Authenticated user + one page
 
     def get_queryset(self):
         filters = {}
         if self.request.query_params.get("difficulty"):
             filters["difficulty"] = self.request.query_params.get("difficulty")
         if self.request.query_params.get("tags"):
+            # ?tags=dp,graph matches problems with both; add &match=any for either.
             filters["tags"] = self.request.query_params.get("tags")
+            if self.request.query_params.get("match") == MATCH_ANY:
+                filters["match"] = MATCH_ANY
 
-        return ProblemService.get_problems_list(filters)
+        # Fetch only the serialized columns (plus the pagination key) as dicts.
+        fields = set(self.get_serializer().fields) | {"id", "created_at"}
+        return ProblemService.get_problems_list(filters).values(*fields)
 
 
 class ProblemDetailView(generics.RetrieveAPIView):
@@ -35,12 +65,51 @@ class ProblemDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = "slug"
     queryset = Problem.objects.all()
+    query_budget = 2  # Authenticated user + problem (on a cache miss)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = ProblemService.get_problem_detail(kwargs[self.lookup_field])
+        if data is None:
+            raise NotFound()
+        fields = ProblemSerializer.get_requested_fields(request)
+        if fields:
+            data = {name: value for name, value in data.items() if name in fields}
+        return Response(data)
 
 
+@query_budget(2)  # Authenticated user + tags
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def tag_facets(request):
+    """List tags in use with their problem counts."""
+    return Response(TagService.get_tag_counts())
+
+
+@query_budget(2)  # Authenticated user + matches
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search_problems(request):
+    """Search problems by title and description, best matches first."""
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return Response({"results": []})
+    try:
+        limit = int(request.query_params.get("limit", SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        limit = SEARCH_DEFAULT_LIMIT
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    matches = ProblemSearchService.search(Problem.objects.all(), query)
+    rows = matches.order_by("-rank", "-id").values(*ProblemSummarySerializer.Meta.fields)[:limit]
+    return Response({"results": ProblemSummarySerializer(rows, many=True).data})
+
+
+@query_budget(3)  # Authenticated user + problem + insert
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent
 def submit_solution(request):
-    """Submit solution for a problem."""
+    """Submit solution for a problem; retries with the same Idempotency-Key are replayed."""
     problem_id = request.data.get("problem_id")
     code = request.data.get("code")
     language = request.data.get("language", "python")
@@ -53,15 +122,140 @@ def submit_solution(request):
     submission = ProblemService.create_submission(request.user, problem_id, code, language)
 
     if submission:
-        return Response(SubmissionSerializer(submission).data, status=status.HTTP_201_CREATED)
+        serializer = SubmissionSerializer(submission, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     return Response({"error": "Problem not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+@query_budget(3)  # Authenticated user + problems + insert
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@idempotent
+def submit_batch(request):
+    """Submit many solutions in one request (autograder integrations)."""
+    serializer = SubmissionBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    submissions, missing = ProblemService.create_submissions(
+        request.user, serializer.validated_data["submissions"]
+    )
+    if missing:
+        return Response(
+            {"error": "Problem not found", "problem_ids": missing},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    serializer = SubmissionSerializer(submissions, many=True, context={"request": request})
+    return Response({"results": serializer.data}, status=status.HTTP_201_CREATED)
+
+
+@query_budget(2)  # Authenticated user + one page
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_user_submissions(request):
-    """Get all submissions for current user."""
-    submissions = ProblemService.get_user_submissions(request.user.id)
-    serializer = SubmissionSerializer(submissions, many=True)
-    return Response(serializer.data)
+    """Get the current user's submissions, newest first, one keyset page at a time."""
+    fields = SubmissionSerializer.get_requested_fields(request)
+    submissions = ProblemService.get_user_submissions(
+        request.user.id, include_code=fields is None or "code" in fields
+    )
+    paginator = SubmissionPagination()
+    page = paginator.paginate_queryset(submissions, request)
+    serializer = SubmissionSerializer(page, many=True, context={"request": request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+def _format_sse(event):
+    return f"event: status\ndata: {json.dumps(event)}\n\n"
+
+
+async def _get_submission_state(submission_id):
+    row = (
+        await Submission.objects.filter(id=submission_id)
+        .values("status", "runtime", "memory", "error_message")
+        .afirst()
+    )
+    return SubmissionEvents.make_event(submission_id, row)
+
+
+async def _submission_event_stream(initial):
+    """Yield SSE frames until the submission reaches a final status."""
+    submission_id = initial["id"]
+    yield _format_sse(initial)
+    if initial["status"] in FINAL_STATUSES:
+        return
+
+    deadline = time.monotonic() + settings.SUBMISSION_EVENTS_MAX_DURATION
+    async with SubmissionEvents.subscribe(submission_id) as pubsub:
+        # The verdict may have landed between the first read and subscribing.
+        current = await _get_submission_state(submission_id)
+        if current["status"] != initial["status"]:
+            yield _format_sse(current)
+            if current["status"] in FINAL_STATUSES:
+                return
+
+        while time.monotonic() < deadline:
+            event = await SubmissionEvents.next_event(pubsub, settings.SUBMISSION_EVENTS_KEEPALIVE)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield _format_sse(event)
+            if event["status"] in FINAL_STATUSES:
+                return
+
+
+def _authenticate_header(request):
+    """Return the user id of the request's ``Authorization: Bearer`` JWT, or None."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError):
+        return None
+
+
+@query_budget(2)  # Authenticated user + ownership check
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def submission_events_ticket(request, submission_id):
+    """Issue a single-use ticket for opening a submission's event stream."""
+    if not Submission.objects.filter(id=submission_id, user_id=request.user.id).exists():
+        return Response({"error": "Submission not found"}, status=status.HTTP_404_NOT_FOUND)
+    ticket = SubmissionEvents.issue_ticket(request.user.id, submission_id)
+    return Response({"ticket": ticket}, status=status.HTTP_201_CREATED)
+
+
+async def submission_events(request, submission_id):
+    """
+    Stream status changes of one of the user's submissions as server-sent events.
+
+    Authenticated with a ``ticket`` query parameter from the ticket endpoint,
+    or with an ``Authorization`` header for clients that can send one.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    ticket = request.GET.get("ticket")
+    if ticket:
+        user_id = await SubmissionEvents.redeem_ticket(ticket, submission_id)
+    else:
+        user_id = _authenticate_header(request)
+    if user_id is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    owned = await Submission.objects.filter(
+        id=submission_id, user_id=user_id, user__is_active=True
+    ).aexists()
+    if not owned:
+        return JsonResponse({"error": "Submission not found"}, status=404)
+
+    initial = await _get_submission_state(submission_id)
+    response = StreamingHttpResponse(
+        _submission_event_stream(initial), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Stop nginx from buffering the stream
+    return response
@@ -0,0 +1,49 @@
+"""
+Authentication classes for the users app.
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .services.user_cache import UserCache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user from a cached snapshot.
+
+    Behaves like ``JWTAuthentication`` (inactive users and, if enabled,
+    revoked tokens are rejected) without a user query on every request.
+    A token already validated by ``ReplicaRoutingMiddleware`` is not
+    validated again.
+    """
+
+    def authenticate(self, request):
+        validated_token = getattr(request, "validated_jwt", None)
+        if validated_token is None:
+            return super().authenticate(request)
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cached = UserCache.get(user_id)
+        if cached is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user, password_digest = cached
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
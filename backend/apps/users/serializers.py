@@ -5,10 +5,12 @@ User serializers.
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from core.serializers import SparseFieldsetMixin
+
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for user profile."""
 
     class Meta:
@@ -0,0 +1,72 @@
+"""
+Short-lived snapshots of authenticated users.
+
+Authentication only needs a handful of columns, so those are cached per user
+and turned back into a ``User`` instance without touching the database. The
+password hash is never cached; only the digest simplejwt compares for token
+revocation is.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.cache import tiered_cache
+
+User = get_user_model()
+
+SNAPSHOT_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "bio",
+    "avatar_url",
+    "last_login",
+    "date_joined",
+    "created_at",
+    "updated_at",
+)
+
+
+class UserCache:
+    """Cache of user snapshots used by authentication."""
+
+    @staticmethod
+    def make_key(user_id):
+        return f"user_snapshot_{user_id}"
+
+    @staticmethod
+    def get(user_id):
+        """
+        Return ``(user, password_digest)`` for ``user_id``, or None if there is no such user.
+
+        The user is built from the snapshot with every other field deferred, so
+        a ``save()`` on it only writes the snapshot fields and never the password.
+        """
+        key = UserCache.make_key(user_id)
+        snapshot = tiered_cache.get(key)
+        if snapshot is None:
+            row = User.objects.filter(id=user_id).values(*SNAPSHOT_FIELDS, "password").first()
+            if row is None:
+                return None
+            password = row.pop("password")
+            snapshot = {
+                "fields": row,
+                "password_digest": get_md5_hash_password(password),
+            }
+            tiered_cache.set(key, snapshot, settings.USER_SNAPSHOT_TTL)
+
+        fields = snapshot["fields"]
+        # from_db() expects values in model field order.
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in fields]
+        user = User.from_db("default", names, [fields[name] for name in names])
+        return user, snapshot["password_digest"]
+
+    @staticmethod
+    def invalidate(user_id):
+        tiered_cache.delete(UserCache.make_key(user_id))
@@ -3,7 +3,10 @@ User service layer - handles business logic.
 """
 
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+
+from core.cache import tiered_cache
+
+from .user_cache import UserCache
 
 User = get_user_model()
 
@@ -15,7 +18,7 @@ class UserService:
     def get_user_profile(user_id):
         """Get user profile with caching."""
         cache_key = f"user_profile_{user_id}"
-        profile = cache.get(cache_key)
+        profile = tiered_cache.get(cache_key)
 
         if not profile:
             try:
@@ -27,7 +30,7 @@ class UserService:
                     "bio": user.bio,
                     "avatar_url": user.avatar_url,
                 }
-                cache.set(cache_key, profile, 300)  # Cache for 5 minutes
+                tiered_cache.set(cache_key, profile, 300)  # Cache for 5 minutes
             except User.DoesNotExist:
                 return None
 
@@ -45,7 +48,8 @@ class UserService:
 
             # Invalidate cache
             cache_key = f"user_profile_{user_id}"
-            cache.delete(cache_key)
+            tiered_cache.delete(cache_key)
+            UserCache.invalidate(user_id)
 
             return user
         except User.DoesNotExist:
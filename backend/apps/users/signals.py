@@ -0,0 +1,26 @@
+"""
+Signal handlers for the users app.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .services.user_cache import UserCache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_snapshot(sender, instance, update_fields=None, **kwargs):
+    """Password changes, deactivation and profile edits all go through save()."""
+    # Logins only touch last_login, which authentication does not depend on.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    transaction.on_commit(lambda: UserCache.invalidate(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: UserCache.invalidate(instance.pk))
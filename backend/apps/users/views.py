@@ -7,6 +7,9 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from core.query_budget import query_budget
 
 from .serializers import UserRegistrationSerializer, UserSerializer
 from .services.user_service import UserService
@@ -17,6 +20,7 @@ class UserRegistrationView(generics.CreateAPIView):
 
     permission_classes = [AllowAny]
     serializer_class = UserRegistrationSerializer
+    query_budget = 3  # Username and email uniqueness checks + insert
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -38,6 +42,19 @@ class UserRegistrationView(generics.CreateAPIView):
         )
 
 
+class LoginView(TokenObtainPairView):
+    """Obtain an access/refresh token pair."""
+
+    query_budget = 2  # User lookup + last_login update
+
+
+class RefreshTokenView(TokenRefreshView):
+    """Exchange a refresh token for a new access token."""
+
+    query_budget = 0
+
+
+@query_budget(2)  # Authenticated user + profile on a cache miss
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_profile(request):
@@ -48,11 +65,12 @@ def get_profile(request):
     return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+@query_budget(3)  # Authenticated user + load + update
 @api_view(["PATCH"])
 @permission_classes([IsAuthenticated])
 def update_profile(request):
     """Update current user profile."""
     user = UserService.update_user_profile(request.user.id, request.data)
     if user:
-        return Response(UserSerializer(user).data)
+        return Response(UserSerializer(user, context={"request": request}).data)
     return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
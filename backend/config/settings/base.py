@@ -6,6 +6,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -28,6 +29,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third party apps
     "rest_framework",
     "rest_framework_simplejwt",
@@ -41,6 +43,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.MetricsMiddleware",
+    # Outside QueryBudgetMiddleware so request logs can include the query count.
+    "core.middleware.LoggingMiddleware",
+    # Inside the metrics and logging middleware so their timings include compression.
+    "core.middleware.CompressionMiddleware",
+    "core.middleware.ProfilingMiddleware",
+    "core.middleware.QueryBudgetMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -48,7 +58,6 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "core.middleware.LoggingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -81,9 +90,46 @@ DATABASES = {
         "HOST": os.getenv("POSTGRES_HOST", "db"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
         "ATOMIC_REQUESTS": False,
+        # Fail instead of hanging when the server is unreachable (seconds).
+        "OPTIONS": {"connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5"))},
     }
 }
 
+# Connection reuse, per worker process:
+#   "none"       - open and close a connection for every request
+#   "persistent" - keep one connection per thread for DB_CONN_MAX_AGE seconds,
+#                  health-checked before reuse (sync gunicorn workers)
+#   "pool"       - share DB_POOL_SIZE connections between all threads of the
+#                  process (ASGI and threaded Celery workers)
+DB_CONNECTION_MODE = os.getenv("DB_CONNECTION_MODE", "persistent")
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))  # seconds to wait for a connection
+
+if DB_CONNECTION_MODE == "persistent":
+    DATABASES["default"].update(CONN_MAX_AGE=DB_CONN_MAX_AGE, CONN_HEALTH_CHECKS=True)
+elif DB_CONNECTION_MODE == "pool":
+    DATABASES["default"].update(
+        ENGINE="core.db.backends.postgresql_pool",
+        CONN_MAX_AGE=0,  # "closing" returns the connection to the pool
+        POOL={"MAX_SIZE": DB_POOL_SIZE, "TIMEOUT": DB_POOL_TIMEOUT},
+    )
+
+# Read replicas: comma-separated hosts sharing the primary's credentials. Safe
+# requests read from them; see core.db.router.
+REPLICA_DATABASES = []
+for index, host in enumerate(filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(","))):
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = dict(DATABASES["default"], HOST=host.strip(), TEST={"MIRROR": "default"})
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ["core.db.router.ReplicaRouter"]
+# Seconds a user keeps reading from the primary after a write.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+# Views that run more queries than their declared ``query_budget`` log a warning.
+# Strict mode raises instead; it is meant for the test suite (tests/conftest.py).
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -118,17 +164,36 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # REST Framework
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("apps.users.authentication.CachedJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # orjson-backed; both fall back to the stdlib json module when orjson is missing.
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Responses of at least RESPONSE_COMPRESSION_MIN_SIZE bytes are sent brotli- or
+# gzip-compressed when the client accepts it.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 4  # 0-11; low levels suit per-request compression
+
+# CORS (allowed origins are set per environment). Browsers may send
+# Idempotency-Key and read whether a response was replayed.
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
 # JWT Settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
@@ -141,6 +206,9 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Seconds an authenticated user's snapshot is reused; edits invalidate it immediately.
+USER_SNAPSHOT_TTL = int(os.getenv("USER_SNAPSHOT_TTL", "60"))
+
 # Redis Cache
 CACHES = {
     "default": {
@@ -148,10 +216,23 @@ CACHES = {
         "LOCATION": os.getenv("REDIS_URL", "redis://redis:6379/1"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Seconds; a slow Redis fails cache calls instead of hanging requests.
+            "SOCKET_CONNECT_TIMEOUT": float(os.getenv("REDIS_CONNECT_TIMEOUT", "1")),
+            "SOCKET_TIMEOUT": float(os.getenv("REDIS_SOCKET_TIMEOUT", "1")),
         },
     }
 }
 
+# In-process tier of core.cache.tiered_cache, kept coherent over Redis pub/sub.
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "1024"))
+LOCAL_CACHE_TIMEOUT = int(os.getenv("LOCAL_CACHE_TIMEOUT", "30"))  # bounds missed invalidations
+CACHE_INVALIDATION_REDIS_URL = os.getenv(
+    "CACHE_INVALIDATION_REDIS_URL", CACHES["default"]["LOCATION"]
+)
+
+# Seconds a serialized problem stays cached; edits invalidate it immediately.
+PROBLEM_CACHE_TTL = int(os.getenv("PROBLEM_CACHE_TTL", "600"))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
@@ -159,12 +240,113 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Judge tasks are long: each worker thread reserves one task at a time, so a
+# queued submission is never held back by a busy worker while others idle.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Workers drain their queues strictly in the order given to ``-Q``.
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "priority"}
+# One queue per judge priority, highest first (apps.problems.services.judge_queue).
+JUDGE_QUEUES = {
+    "interactive": "judge.interactive",
+    "contest": "judge.contest",
+    "rejudge": "judge.rejudge",
+}
+CELERY_TASK_ROUTES = {
+    "apps.problems.tasks.judge_submission": {"queue": JUDGE_QUEUES["interactive"]},
+}
+
+# Metrics (/metrics). With several worker processes, point METRICS_MULTIPROC_DIR
+# at a directory they share (emptied on start) so scrapes report all workers.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = 5  # seconds between per-worker snapshots
+# When set, scrapes must send "Authorization: Bearer <METRICS_TOKEN>". Without a
+# token, only clients in METRICS_ALLOWED_NETWORKS (loopback by default) may scrape.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_NETWORKS = [
+    network.strip()
+    for network in os.getenv("METRICS_ALLOWED_NETWORKS", "127.0.0.0/8,::1/128").split(",")
+    if network.strip()
+]
+
+# Profiling (core.profiling). Requests are profiled when PROFILING_ENABLED, when
+# sampled, or when sent with "X-Profile: <PROFILING_HEADER_TOKEN>".
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_HEADER_TOKEN = os.getenv("PROFILING_HEADER_TOKEN", "")
+PROFILING_CPROFILE = os.getenv("PROFILING_CPROFILE", "false").lower() == "true"
+PROFILING_BUFFER_SIZE = 100  # entries kept per ring buffer
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Readiness probe (core.health): checks run in parallel, each bounded by the
+# timeout, and the report is reused by the process for HEALTH_CACHE_SECONDS.
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "1.0"))
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+
+# Judge
+# Sandboxed runs per worker node; defaults to one per core.
+JUDGE_POOL_SIZE = int(os.getenv("JUDGE_POOL_SIZE", "0")) or os.cpu_count()
+JUDGE_TIME_LIMIT = float(os.getenv("JUDGE_TIME_LIMIT", "2.0"))  # seconds per test
+JUDGE_MEMORY_LIMIT_MB = int(os.getenv("JUDGE_MEMORY_LIMIT_MB", "256"))
+JUDGE_OUTPUT_LIMIT_KB = int(os.getenv("JUDGE_OUTPUT_LIMIT_KB", "1024"))
+JUDGE_TASK_TIMEOUT = int(os.getenv("JUDGE_TASK_TIMEOUT", "300"))  # seconds per submission
+JUDGE_NICE = int(os.getenv("JUDGE_NICE", "5"))
+# Packed hidden test cases; must be shared by web and judge containers.
+JUDGE_TESTDATA_ROOT = Path(os.getenv("JUDGE_TESTDATA_ROOT", BASE_DIR / "testdata"))
+# Submitted code runs as this unprivileged user, without network and with
+# JUDGE_SANDBOX_HIDDEN_PATHS (shared memory, the test data and any listed in the
+# environment) hidden (apps.problems.judge.sandbox). The judge worker
+# must be root (CAP_SYS_ADMIN) to set this up and refuses to judge if it cannot.
+# An empty value turns isolation off: for local development only.
+JUDGE_SANDBOX_USER = os.getenv("JUDGE_SANDBOX_USER", "judge")
+JUDGE_SANDBOX_HIDDEN_PATHS = ["/dev/shm", str(JUDGE_TESTDATA_ROOT)] + [
+    path.strip() for path in os.getenv("JUDGE_SANDBOX_HIDDEN_PATHS", "").split(",") if path.strip()
+]
+# Interactive submissions of one user judged at once; the rest wait their turn.
+JUDGE_USER_CONCURRENCY = int(os.getenv("JUDGE_USER_CONCURRENCY", "2"))
+# A capped task is queued again after a jittered, doubling delay between these bounds
+# (seconds); after JUDGE_USER_MAX_RETRIES turns it is judged over the cap.
+JUDGE_USER_RETRY_DELAY = 1
+JUDGE_USER_RETRY_MAX_DELAY = 30
+JUDGE_USER_MAX_RETRIES = int(os.getenv("JUDGE_USER_MAX_RETRIES", "20"))
+# Runs forked from a warm template interpreter before it is replaced; 0 spawns one per run.
+JUDGE_INTERPRETER_MAX_RUNS = int(os.getenv("JUDGE_INTERPRETER_MAX_RUNS", "200"))
+# Run all of a submission's tests in one sandboxed process (languages that support it).
+JUDGE_BATCH_TESTS = os.getenv("JUDGE_BATCH_TESTS", "true").lower() == "true"
+JUDGE_VERDICT_CACHE_TTL = int(os.getenv("JUDGE_VERDICT_CACHE_TTL", str(60 * 60 * 24)))
+# Seconds after an import before superseded packs are deleted (and between retries
+# while submissions made before the import are still being judged).
+JUDGE_TESTDATA_PRUNE_DELAY = int(os.getenv("JUDGE_TESTDATA_PRUNE_DELAY", str(JUDGE_TASK_TIMEOUT)))
+# Judge workers record a heartbeat this often; readiness reports them stale after the timeout.
+JUDGE_HEARTBEAT_INTERVAL = 10
+JUDGE_HEARTBEAT_TIMEOUT = int(os.getenv("JUDGE_HEARTBEAT_TIMEOUT", "60"))
+
+# Submissions
+# POST /problems/submit/batch/ accepts at most this many submissions per request.
+SUBMIT_BATCH_MAX_SIZE = int(os.getenv("SUBMIT_BATCH_MAX_SIZE", "100"))
+# Responses to requests sent with an Idempotency-Key are replayed for this long
+# (core.idempotency); a request that dies mid-way holds its key for the lock TTL.
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", str(60 * 60 * 24)))
+IDEMPOTENCY_LOCK_TTL = 60
+
+# Submission events (server-sent events, served by the ASGI app)
+SUBMISSION_EVENTS_REDIS_URL = os.getenv("SUBMISSION_EVENTS_REDIS_URL", CELERY_BROKER_URL)
+SUBMISSION_EVENTS_KEEPALIVE = 15  # seconds between keepalive comments
+SUBMISSION_EVENTS_MAX_DURATION = 300  # seconds before the stream is closed
+SUBMISSION_EVENTS_TICKET_TTL = 30  # seconds a stream ticket stays redeemable
 
 # Logging
 # Ensure logs directory exists
 LOGS_DIR = BASE_DIR / "logs"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+# "queue": records are queued and written by background threads (JSON lines to
+# django.jsonl, text to the console), so request threads never block on disk or
+# stderr. "sync": the plain StreamHandler and FileHandler writing django.log on
+# the calling thread.
+LOG_MODE = os.getenv("LOG_MODE", "queue")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records dropped beyond this
+APPS_LOG_LEVEL = os.getenv("APPS_LOG_LEVEL", "INFO")
 
 LOGGING = {
     "version": 1,
@@ -180,15 +362,31 @@ LOGGING = {
         },
     },
     "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
-        },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": LOGS_DIR / "django.log",
-            "formatter": "verbose",
-        },
+        "console": (
+            {
+                "class": "core.jsonlog.QueueStreamHandler",
+                "formatter": "verbose",
+                "max_queue_size": LOG_QUEUE_SIZE,
+            }
+            if LOG_MODE == "queue"
+            else {
+                "class": "logging.StreamHandler",
+                "formatter": "verbose",
+            }
+        ),
+        "file": (
+            {
+                "class": "core.jsonlog.QueueJSONHandler",
+                "filename": LOGS_DIR / "django.jsonl",
+                "max_queue_size": LOG_QUEUE_SIZE,
+            }
+            if LOG_MODE == "queue"
+            else {
+                "class": "logging.FileHandler",
+                "filename": LOGS_DIR / "django.log",
+                "formatter": "verbose",
+            }
+        ),
     },
     "root": {
         "handlers": ["console"],
@@ -202,7 +400,12 @@ LOGGING = {
         },
         "apps": {
             "handlers": ["console", "file"],
-            "level": "DEBUG",
+            "level": APPS_LOG_LEVEL,
+            "propagate": False,
+        },
+        "core": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
             "propagate": False,
         },
     },
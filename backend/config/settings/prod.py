@@ -22,4 +22,8 @@ X_FRAME_OPTIONS = "DENY"
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
 
 # Logging - file and console
-LOGGING["handlers"]["file"]["filename"] = "/var/log/codementor/django.log"  # noqa: F405
+LOGGING["handlers"]["file"]["filename"] = (  # noqa: F405
+    "/var/log/codementor/django.jsonl"
+    if LOG_MODE == "queue"  # noqa: F405
+    else "/var/log/codementor/django.log"
+)
@@ -6,11 +6,15 @@ from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from core.views import metrics, profiling_log
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/auth/", include("apps.users.urls")),
     path("api/v1/problems/", include("apps.problems.urls")),
     path("api/v1/health/", include("core.urls")),
+    path("metrics", metrics, name="metrics"),
+    path("api/v1/profiling/", profiling_log, name="profiling-log"),
     # API Documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
@@ -0,0 +1,198 @@
+"""
+Two-tier cache: a bounded in-process LRU in front of ``CACHES["default"]``.
+
+Reads are answered from process memory when possible and fall through to the
+shared cache otherwise. Writes go to both tiers. Deletes, and writes that
+replace a value other workers may hold, are also broadcast over Redis
+pub/sub, so every worker drops its local copy of the key at once. Plain fills
+(after a miss, or of versioned keys that never change) are not broadcast.
+Local entries also expire after ``LOCAL_CACHE_TIMEOUT`` seconds, which bounds
+staleness if an invalidation message is ever missed.
+
+Values held locally are shared between requests: callers must not mutate
+what ``get`` returns.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+_MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded LRU with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """Process-local LRU backed by the shared Django cache."""
+
+    def __init__(self):
+        self.stats = {"local_hits": 0, "remote_hits": 0, "misses": 0, "invalidations": 0}
+        self._stats_lock = threading.Lock()
+        self._reset_process_state()
+
+    def _reset_process_state(self):
+        # Called again in a forked child: listener threads do not survive a fork.
+        self._pid = os.getpid()
+        self._origin = uuid.uuid4().hex
+        self._local = LocalLRU(settings.LOCAL_CACHE_MAX_ENTRIES)
+        self._listener = None
+        self._publisher = None
+        self._listener_lock = threading.Lock()
+
+    def get(self, key, default=None):
+        self._ensure_listener()
+        value = self._local.get(key)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("remote_hits")
+        self._local.set(key, value, settings.LOCAL_CACHE_TIMEOUT)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, replace=False):
+        """
+        Store ``value`` in both tiers.
+
+        Pass ``replace=True`` when overwriting a value other workers may hold,
+        so their local copies are dropped; fills need no broadcast.
+        """
+        cache.set(key, value, timeout)
+        if replace:
+            self._broadcast([key])
+        local_timeout = settings.LOCAL_CACHE_TIMEOUT
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        self._local.set(key, value, local_timeout)
+
+    def delete(self, *keys):
+        cache.delete_many(keys)
+        self.invalidate(*keys)
+
+    def invalidate(self, *keys):
+        """Drop keys from every process's local tier (after changing them remotely)."""
+        self._local.delete(*keys)
+        self._broadcast(keys)
+
+    def clear_local(self):
+        self._local.clear()
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats, local_entries=len(self._local))
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _broadcast(self, keys):
+        url = settings.CACHE_INVALIDATION_REDIS_URL
+        if not url:
+            return
+        if self._publisher is None:
+            self._publisher = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+        message = json.dumps({"origin": self._origin, "keys": list(keys)})
+        try:
+            self._publisher.publish(INVALIDATION_CHANNEL, message)
+        except redis.RedisError:
+            logger.warning("Could not broadcast cache invalidation for %s", keys)
+
+    def _ensure_listener(self):
+        if self._pid != os.getpid():
+            self._reset_process_state()
+        if self._listener is not None or not settings.CACHE_INVALIDATION_REDIS_URL:
+            return
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="cache-invalidation", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                client = redis.Redis.from_url(
+                    settings.CACHE_INVALIDATION_REDIS_URL,
+                    socket_connect_timeout=1,
+                    health_check_interval=30,
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Invalidations may have been missed while disconnected.
+                self._local.clear()
+                backoff = 1
+                for message in pubsub.listen():
+                    self._handle_message(message)
+            except redis.RedisError:
+                logger.warning("Cache invalidation listener disconnected; retrying")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _handle_message(self, message):
+        try:
+            payload = json.loads(message["data"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if payload.get("origin") == self._origin:
+            return
+        self._local.delete(*payload.get("keys", ()))
+        self._count("invalidations")
+
+
+tiered_cache = TwoTierCache()
@@ -0,0 +1,99 @@
+"""
+PostgreSQL backend that borrows connections from a per-process pool.
+
+Django (4.2) opens a connection per thread and, with ``CONN_MAX_AGE = 0``,
+closes it at the end of every request. Here "opening" checks a connection out
+of a shared ``ConnectionPool`` and "closing" returns it, rolled back to an
+idle state, so requests and threads reuse a bounded set of live connections.
+
+Configure it with a ``POOL`` dict next to the usual ``DATABASES`` keys::
+
+    "POOL": {"MAX_SIZE": 4, "TIMEOUT": 5, "MAX_IDLE": 30, "MAX_LIFETIME": 3600}
+
+Requires psycopg 3.
+"""
+
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base as postgresql
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from core.db.pool import ConnectionPool
+
+if not is_psycopg3:
+    raise ImproperlyConfigured("The pooled PostgreSQL backend requires psycopg 3")
+
+from psycopg.pq import TransactionStatus  # noqa: E402
+
+
+def _check_connection(connection):
+    """Validate a connection that has been idle for a while."""
+    try:
+        connection.execute("SELECT 1")
+        return True
+    except postgresql.Database.Error:
+        return False
+
+
+def _reset_connection(connection):
+    """Bring a returned connection back to an idle state; False if it cannot be reused."""
+    if connection.closed or connection.broken:
+        return False
+    status = connection.info.transaction_status
+    if status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):
+        try:
+            connection.rollback()
+        except postgresql.Database.Error:
+            return False
+        status = connection.info.transaction_status
+    return status == TransactionStatus.IDLE
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def get_pool(self, conn_params=None):
+        # Keyed by pid as well: connections must never be shared across a fork.
+        key = (self.alias, os.getpid())
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    if conn_params is None:
+                        conn_params = self.get_connection_params()
+                    pool = self._pools[key] = self._create_pool(conn_params)
+        return pool
+
+    def _create_pool(self, conn_params):
+        options = self.settings_dict.get("POOL", {})
+        connect = super().get_new_connection
+        return ConnectionPool(
+            lambda: connect(conn_params),
+            max_size=options.get("MAX_SIZE", 4),
+            timeout=options.get("TIMEOUT", 5.0),
+            max_idle=options.get("MAX_IDLE", 30.0),
+            max_lifetime=options.get("MAX_LIFETIME", 3600.0),
+            check=_check_connection,
+        )
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).acquire()
+        # The parent sets this while connecting; reused connections skip that step.
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        self.isolation_level = (
+            IsolationLevel(isolation_level)
+            if isolation_level is not None
+            else IsolationLevel.READ_COMMITTED
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().release(
+                    self.connection, reusable=_reset_connection(self.connection)
+                )
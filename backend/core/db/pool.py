@@ -0,0 +1,129 @@
+"""
+A small, thread-safe pool of DB-API connections.
+
+Used by the ``core.db.backends.postgresql_pool`` backend so that the threads
+of one worker process (ASGI ``sync_to_async`` threads, threaded Celery
+workers) share a bounded set of open connections instead of each keeping,
+or repeatedly opening, its own.
+"""
+
+import collections
+import contextlib
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded LIFO pool of connections created by ``connect()``.
+
+    Idle connections older than ``max_idle`` seconds are validated with
+    ``check(conn)`` before reuse, and connections older than ``max_lifetime``
+    are closed instead of being reused, so failovers and server-side idle
+    timeouts never hand out a dead connection.
+    """
+
+    def __init__(
+        self,
+        connect,
+        max_size,
+        timeout=5.0,
+        max_idle=30.0,
+        max_lifetime=3600.0,
+        check=None,
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._connect = connect
+        self._check = check
+        self._idle = collections.deque()  # (connection, released_at), most recent last
+        self._born = {}  # id(connection) -> created_at
+        self._size = 0  # open connections, idle or in use
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Return an open connection, waiting up to ``timeout`` seconds for one."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._take(deadline)
+            if entry is None:
+                return self._open()
+            connection, released_at = entry
+            if self._is_reusable(connection, released_at):
+                return connection
+            self._discard(connection)
+
+    def release(self, connection, reusable=True):
+        """Return a connection to the pool, or close it if it should not be reused."""
+        if reusable and not self._is_expired(connection):
+            with self._condition:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+            return
+        self._discard(connection)
+
+    def close_idle(self):
+        """Close every idle connection, e.g. before the process exits."""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._discard(connection)
+
+    def get_stats(self):
+        with self._condition:
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+    def _take(self, deadline):
+        """Pop an idle connection, or reserve a slot for a new one (returns None)."""
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._condition.wait(remaining)
+
+    def _open(self):
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._born[id(connection)] = time.monotonic()
+        return connection
+
+    def _is_expired(self, connection):
+        born = self._born.get(id(connection))
+        return born is None or time.monotonic() - born > self.max_lifetime
+
+    def _is_reusable(self, connection, released_at):
+        if self._is_expired(connection):
+            return False
+        if self._check is not None and time.monotonic() - released_at > self.max_idle:
+            return self._check(connection)
+        return True
+
+    def _discard(self, connection):
+        with contextlib.suppress(Exception):
+            connection.close()
+        with self._condition:
+            if self._born.pop(id(connection), None) is not None:
+                self._size -= 1
+            self._condition.notify()
@@ -0,0 +1,73 @@
+"""
+Read-replica routing.
+
+Reads go to a replica only inside ``replica_reads()``, which
+``core.middleware.ReplicaRoutingMiddleware`` enters for safe (GET/HEAD)
+requests. Everything else - writes, unsafe requests, Celery tasks,
+management commands, and reads inside a transaction on the primary - uses
+``default``, so background work never sees replication lag.
+
+After a successful write a user is pinned to the primary for
+``REPLICA_PIN_SECONDS``, so they read their own writes. Pins are always read
+from the shared cache, never from a worker's local copy, so a pin made by
+any worker is seen by the next request.
+"""
+
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+@contextlib.contextmanager
+def replica_reads(enabled=True):
+    """Allow (or forbid) routing reads to replicas for the duration of the block."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryPin:
+    """Read-your-writes pins, shared by all workers through the cache."""
+
+    @staticmethod
+    def make_key(user_id):
+        return f"replica_pin_{user_id}"
+
+    @staticmethod
+    def pin(user_id):
+        cache.set(PrimaryPin.make_key(user_id), 1, settings.REPLICA_PIN_SECONDS)
+
+    @staticmethod
+    def is_pinned(user_id):
+        return cache.get(PrimaryPin.make_key(user_id)) is not None
+
+
+class ReplicaRouter:
+    """Route reads to ``settings.REPLICA_DATABASES`` when allowed; writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if not replicas or not _replica_reads.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads in a transaction must see its uncommitted writes.
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,155 @@
+"""
+Readiness checks for the service's dependencies.
+
+Checks run in parallel on a small, reused thread pool, and a probe waits at
+most ``HEALTH_CHECK_TIMEOUT`` seconds for them. Every client a check uses has
+connect and socket timeouts of its own, so a hung check ends by itself; until
+it does, later probes report it as timed out instead of starting it again.
+The combined result is reused for ``HEALTH_CACHE_SECONDS`` by the process
+that computed it, so frequent probes do not turn into load on
+the database, Redis or the broker. Failing checks registered as critical
+make the service unhealthy; failing non-critical checks are only reported.
+
+Apps add their own checks with ``register_check`` in ``AppConfig.ready``.
+"""
+
+import datetime
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+MAX_CHECK_THREADS = 8
+
+_checks = {}  # name -> (check, critical)
+_running = {}  # name -> future of the check's latest run
+_executor = {"pid": None, "pool": None}
+_lock = threading.Lock()
+_cached = {"result": None, "expires_at": 0.0}
+
+
+class HealthCheckError(Exception):
+    """Raised by a check to report a failure without a traceback."""
+
+
+def register_check(name, check, critical=True):
+    """Add ``check()``; it may return a dict of details and raises when unhealthy."""
+    _checks[name] = (check, critical)
+
+
+def check_database():
+    # A connection of its own, with the check's timeouts: it never waits for a
+    # busy pool, and a slow server fails the check instead of hanging it.
+    database = connections["default"]
+    params = database.get_connection_params()
+    if database.vendor == "postgresql":
+        timeout = settings.HEALTH_CHECK_TIMEOUT
+        params["connect_timeout"] = max(1, math.ceil(timeout))  # whole seconds
+        params["options"] = " ".join(
+            filter(None, [params.get("options"), f"-c statement_timeout={int(timeout * 1000)}"])
+        )
+    connection = database.Database.connect(**params)
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def check_cache():
+    # A read is enough to prove the round trip; nothing is written.
+    cache.get("health_check")
+
+
+def check_broker():
+    client = redis.Redis.from_url(
+        settings.CELERY_BROKER_URL,
+        socket_connect_timeout=settings.HEALTH_CHECK_TIMEOUT,
+        socket_timeout=settings.HEALTH_CHECK_TIMEOUT,
+    )
+    try:
+        client.ping()
+    finally:
+        client.close()
+
+
+register_check("database", check_database)
+register_check("cache", check_cache)
+register_check("broker", check_broker, critical=False)
+
+
+def _timed(check):
+    started = time.perf_counter()
+    try:
+        details = check() or {}
+        outcome = {"status": "ok", **details}
+    except HealthCheckError as e:
+        outcome = {"status": "error", "error": str(e)}
+    except Exception as e:
+        outcome = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    outcome["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return outcome
+
+
+def _get_executor():
+    # Threads do not survive a fork: each worker process starts its own pool.
+    if _executor["pid"] != os.getpid():
+        _running.clear()
+        _executor.update(
+            pid=os.getpid(),
+            pool=ThreadPoolExecutor(max_workers=MAX_CHECK_THREADS, thread_name_prefix="health"),
+        )
+    return _executor["pool"]
+
+
+def run_checks():
+    """Run every check in parallel and return the combined report."""
+    timeout = settings.HEALTH_CHECK_TIMEOUT
+    executor = _get_executor()
+    futures = {}
+    for name, (check, _) in _checks.items():
+        future = _running.get(name)
+        # A check still running from an earlier probe is waited on, not started twice.
+        if future is None or future.done():
+            future = _running[name] = executor.submit(_timed, check)
+        futures[name] = future
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for name, future in futures.items():
+        if future.done():
+            results[name] = future.result()
+        else:
+            results[name] = {"status": "timeout", "latency_ms": round(timeout * 1000, 2)}
+
+    failed = [name for name, result in results.items() if result["status"] != "ok"]
+    unhealthy = any(_checks[name][1] for name in failed)
+    return {
+        "status": "unhealthy" if unhealthy else "healthy",
+        "degraded": sorted(name for name in failed if not _checks[name][1]),
+        "checks": results,
+        "checked_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def get_readiness():
+    """Return the latest report, running the checks at most once per cache period."""
+    with _lock:
+        # Concurrent probes wait for the run in progress instead of starting their own.
+        if _cached["expires_at"] <= time.monotonic():
+            _cached["result"] = run_checks()
+            _cached["expires_at"] = time.monotonic() + settings.HEALTH_CACHE_SECONDS
+            return dict(_cached["result"], cached=False)
+        return dict(_cached["result"], cached=True)
+
+
+def reset():
+    with _lock:
+        _cached["expires_at"] = 0.0
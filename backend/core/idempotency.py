@@ -0,0 +1,90 @@
+"""
+Idempotency keys for unsafe API requests.
+
+A client that may retry a request sends the same ``Idempotency-Key`` header
+with every attempt. The first attempt claims the key in the cache (Redis) and
+stores its response for ``IDEMPOTENCY_KEY_TTL`` seconds; retries get that
+response back, marked ``Idempotent-Replayed: true``, without running the view
+again. Keys are scoped to the user and the view.
+
+A retry that arrives while the first attempt is still running gets a 409,
+and reusing a key with a different body a 422. Server errors are not
+stored, so the request can be retried.
+"""
+
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+_IN_PROGRESS = "in_progress"
+
+
+def _cache_key(request, view_name, key):
+    user_id = request.user.pk if request.user.is_authenticated else "anonymous"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return f"idempotency_{view_name}_{user_id}_{digest}"
+
+
+def _replay(stored, fingerprint):
+    if stored == _IN_PROGRESS:
+        return Response(
+            {"error": "A request with this Idempotency-Key is still in progress"},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"error": "Idempotency-Key was already used for a different request"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(stored["data"], status=stored["status"])
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def idempotent(view_func):
+    """Honor ``Idempotency-Key`` on a DRF function view (place below ``@api_view``)."""
+
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if key is None:
+            return view_func(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = _cache_key(request, view_func.__name__, key)
+        fingerprint = hashlib.sha256(request.body).hexdigest()
+        # The claim outlives a crashed attempt only briefly.
+        if not cache.add(cache_key, _IN_PROGRESS, settings.IDEMPOTENCY_LOCK_TTL):
+            # Claimed by another attempt. If that attempt's claim is gone by now
+            # (it failed, or expired), answer 409 too: only a successful
+            # ``add`` may run the view, so two retries never both get through.
+            return _replay(cache.get(cache_key, _IN_PROGRESS), fingerprint)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+        else:
+            cache.set(
+                cache_key,
+                {"fingerprint": fingerprint, "status": response.status_code, "data": response.data},
+                settings.IDEMPOTENCY_KEY_TTL,
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,217 @@
+"""
+Non-blocking logging handlers.
+
+``QueueJSONHandler`` (JSON lines to a file) and ``QueueStreamHandler`` (the
+console) only put records on a bounded in-memory queue, so the request thread
+never waits on disk or a pipe. A background listener per handler drains the
+queue and writes records in batches. When the queue is full, records are
+dropped and counted rather than blocking the caller. At exit, and on
+``close()``, the listener writes what is still queued before it stops.
+
+Extra fields passed with ``logger.info(..., extra={...})`` and the current
+request id are written as top-level JSON keys.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import datetime
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed in ``extra``.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+}
+
+# Put on the queue to stop its listener once everything before it is written.
+_STOP = object()
+
+_stats_lock = threading.Lock()
+_stats = {"dropped": 0, "written": 0}
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the id of the request being served to every record."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Format a record as one line of JSON."""
+
+    def format(self, record):
+        created = datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+        payload = {
+            "ts": created.isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class QueuedHandler(logging.Handler):
+    """
+    Enqueue records for a background thread that writes them with ``open_stream()``.
+
+    ``max_queue_size`` bounds memory if the output falls behind; ``batch_size``
+    caps how many records are written per ``write()`` call.
+    """
+
+    close_timeout = 5.0  # seconds ``close()`` waits for queued records
+
+    def __init__(self, max_queue_size=10000, batch_size=256, level=logging.NOTSET):
+        super().__init__(level)
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.addFilter(RequestContextFilter())
+        self._listener = None
+        self._listener_pid = None
+
+    def open_stream(self):
+        """Return a context manager giving the text stream records are written to."""
+        raise NotImplementedError
+
+    def emit(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            _count("dropped")
+
+    def prepare(self, record):
+        """Resolve everything that must not be computed on the listener thread."""
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def _ensure_listener(self):
+        # Threads do not survive a fork; each worker process starts its own.
+        if self._listener_pid == os.getpid():
+            return
+        self.acquire()
+        try:
+            if self._listener_pid != os.getpid():
+                if self._listener_pid is not None:
+                    # Records queued in the parent are written by the parent.
+                    self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                self._listener_pid = os.getpid()
+                self._listener = threading.Thread(
+                    target=self._listen, name="log-writer", daemon=True
+                )
+                self._listener.start()
+                # The listener is a daemon thread: drain it before the interpreter exits.
+                atexit.register(self.close)
+        finally:
+            self.release()
+
+    def _listen(self):
+        with self.open_stream() as stream:
+            while True:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = batch[-1] is _STOP
+                self._write_batch(stream, batch[:-1] if stopping else batch)
+                for _ in batch:
+                    self.queue.task_done()
+                if stopping:
+                    return
+
+    def _write_batch(self, stream, batch):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                _count("dropped")
+        if not lines:
+            return
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+            _count("written", len(lines))
+        except (OSError, ValueError):
+            _count("dropped", len(lines))
+
+    def flush(self, timeout=5.0):
+        """Wait (up to ``timeout`` seconds) for queued records to be written."""
+        if self._listener_pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        """Write everything still queued, then stop the listener."""
+        self.acquire()
+        try:
+            listener = self._listener if self._listener_pid == os.getpid() else None
+            self._listener = self._listener_pid = None
+        finally:
+            self.release()
+        if listener is not None and listener.is_alive():
+            with contextlib.suppress(queue.Full):
+                self.queue.put(_STOP, timeout=self.close_timeout)
+            listener.join(self.close_timeout)
+        super().close()
+
+
+class QueueJSONHandler(QueuedHandler):
+    """Append records to ``filename`` as JSON lines, from a background thread."""
+
+    def __init__(self, filename, max_queue_size=10000, batch_size=256, level=logging.NOTSET):
+        super().__init__(max_queue_size, batch_size, level)
+        self.filename = os.fspath(filename)
+        self.formatter = JSONFormatter()
+
+    def open_stream(self):
+        return open(self.filename, "a", encoding="utf-8")
+
+
+class QueueStreamHandler(QueuedHandler):
+    """Write formatted records to ``stream`` (stderr by default), from a background thread."""
+
+    def __init__(self, stream=None, max_queue_size=10000, batch_size=256, level=logging.NOTSET):
+        super().__init__(max_queue_size, batch_size, level)
+        self.stream = stream
+
+    def open_stream(self):
+        return contextlib.nullcontext(self.stream or sys.stderr)
@@ -0,0 +1,107 @@
+"""
+Measure what connection setup costs a request, through Django's own connections.
+
+Each mode gets a temporary database alias copied from ``--database`` with the
+settings of one ``DB_CONNECTION_MODE``:
+
+    none        CONN_MAX_AGE=0: a new connection per request
+    persistent  CONN_MAX_AGE with health checks: one connection kept per thread
+    pool        the ``core.db.backends.postgresql_pool`` backend (PostgreSQL, psycopg 3)
+
+Each iteration stands in for one request: ``request_started``, a trivial query
+on ``connections[alias]``, then ``request_finished``, so connections are
+opened, health-checked, closed or returned exactly as they are in production.
+
+Usage:
+    python manage.py benchmark_db_connections --iterations 500 --database default
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+MODES = {
+    "none": {"CONN_MAX_AGE": 0},
+    "persistent": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "pool": {
+        "ENGINE": "core.db.backends.postgresql_pool",
+        "CONN_MAX_AGE": 0,
+        "POOL": {"MAX_SIZE": 1},
+    },
+}
+
+
+def _supports_pool(connection):
+    if connection.vendor != "postgresql":
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    return is_psycopg3
+
+
+def _run_query(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+class Command(BaseCommand):
+    help = "Compare per-request latency with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        base = connections[options["database"]]
+        iterations = options["iterations"]
+        results = {}
+        for mode, overrides in MODES.items():
+            if mode == "pool" and not _supports_pool(base):
+                self.stdout.write(f"Skipping {mode}: it needs PostgreSQL and psycopg 3")
+                continue
+            results[mode] = self._measure_mode(base, mode, overrides, iterations)
+
+        self.stdout.write(f"{base.vendor}, {iterations} iterations (ms per request)")
+        self.stdout.write(f"{'mode':<12}{'mean':>10}{'p50':>10}{'p99':>10}")
+        for mode, samples in results.items():
+            self.stdout.write(f"{mode:<12}{self._format(samples)}")
+        fresh = statistics.mean(results["none"])
+        for mode, samples in results.items():
+            if mode != "none":
+                saved = fresh - statistics.mean(samples)
+                message = f"Connection setup saved per request ({mode}): {saved:.3f} ms"
+                self.stdout.write(self.style.SUCCESS(message))
+
+    def _measure_mode(self, base, mode, overrides, iterations):
+        alias = f"benchmark_{mode}"
+        settings_dict = {**base.settings_dict, **overrides}
+        settings_dict["OPTIONS"] = dict(base.settings_dict["OPTIONS"])
+        connections.settings[alias] = settings_dict
+        try:
+            return self._measure(connections[alias], iterations)
+        finally:
+            connection = connections[alias]
+            connection.close()
+            if mode == "pool":
+                connection.get_pool().close_idle()
+            del connections[alias]
+            del connections.settings[alias]
+
+    def _measure(self, connection, iterations):
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            _run_query(connection)
+            request_finished.send(sender=self.__class__)
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    def _format(self, samples):
+        ordered = sorted(samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return f"{statistics.mean(ordered):>10.3f}{statistics.median(ordered):>10.3f}{p99:>10.3f}"
@@ -0,0 +1,284 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Counters and histograms live in a per-process ``Registry``. With several
+gunicorn workers, set ``METRICS_MULTIPROC_DIR``: every process then writes a
+snapshot of its registry there every ``METRICS_FLUSH_INTERVAL`` seconds, and
+``/metrics`` sums the snapshots of all workers, so whichever worker serves the
+scrape reports the totals. Gauges registered with ``register_gauge`` are
+evaluated at scrape time in the scraping process only (e.g. queue depth,
+which is the same for every worker).
+
+Clear the directory when the server starts, as counters of dead workers are
+kept there.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Counter:
+    def __init__(self, registry, name):
+        self._registry = registry
+        self.name = name
+
+    def inc(self, amount=1, **labels):
+        self._registry._add(self.name, _label_key(labels), amount)
+
+
+class Histogram:
+    def __init__(self, registry, name, buckets):
+        self._registry = registry
+        self.name = name
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        self._registry._observe(self.name, _label_key(labels), self.buckets, value)
+
+
+class Registry:
+    """Thread-safe store of one process's metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}  # name -> {"type", "help", "buckets"?}
+        self._values = {}  # name -> {label key -> value, or [bucket counts, sum, count]}
+        self._collectors = []  # per-process samples computed at snapshot time
+        self._gauges = {}  # name -> (help, callback), evaluated at scrape time
+        self._writer = None
+        self._writer_pid = None
+
+    def counter(self, name, help_text):
+        self._declare(name, "counter", help_text)
+        return Counter(self, name)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self._declare(name, "histogram", help_text, buckets=list(buckets))
+        return Histogram(self, name, tuple(buckets))
+
+    def register_collector(self, name, help_text, collect):
+        """Add a counter whose per-process ``(labels, value)`` samples ``collect()`` returns."""
+        self._declare(name, "counter", help_text)
+        self._collectors.append((name, collect))
+
+    def register_gauge(self, name, help_text, callback):
+        """
+        Add a gauge read by ``callback()`` when ``/metrics`` is scraped.
+
+        ``callback`` returns a number, or a list of ``(labels, value)`` samples.
+        """
+        self._gauges[name] = (help_text, callback)
+
+    def _declare(self, name, kind, help_text, **extra):
+        with self._lock:
+            self._meta[name] = {"type": kind, "help": help_text, **extra}
+            self._values.setdefault(name, {})
+
+    def _add(self, name, key, amount):
+        with self._lock:
+            samples = self._values[name]
+            samples[key] = samples.get(key, 0) + amount
+
+    def _observe(self, name, key, buckets, value):
+        with self._lock:
+            samples = self._values[name]
+            entry = samples.get(key)
+            if entry is None:
+                entry = samples[key] = [[0] * len(buckets), 0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        """Return this process's metrics as a JSON-serializable dict."""
+        collected = {}
+        for name, collect in self._collectors:
+            try:
+                collected[name] = {_label_key(labels): value for labels, value in collect()}
+            except Exception:
+                logger.exception("Metrics collector %s failed", name)
+        with self._lock:
+            return {
+                name: {
+                    **meta,
+                    "samples": [
+                        [list(key), value]
+                        for key, value in {**self._values[name], **collected.get(name, {})}.items()
+                    ],
+                }
+                for name, meta in self._meta.items()
+            }
+
+    def ensure_writer(self):
+        """Start the snapshot writer for this process (again after a fork)."""
+        if not settings.METRICS_MULTIPROC_DIR or self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+            self._writer = threading.Thread(target=self._write_loop, name="metrics", daemon=True)
+            self._writer.start()
+
+    def write_snapshot(self):
+        directory = Path(settings.METRICS_MULTIPROC_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+
+    def _write_loop(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            try:
+                self.write_snapshot()
+            except OSError:
+                logger.exception("Could not write metrics snapshot")
+
+    def collect(self):
+        """Return the metrics of every worker, merged."""
+        if not settings.METRICS_MULTIPROC_DIR:
+            return self.snapshot()
+        self.write_snapshot()
+        snapshots = []
+        for path in Path(settings.METRICS_MULTIPROC_DIR).glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # a worker is mid-write or gone
+        return merge_snapshots(snapshots)
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+                labels = dict(map(tuple, key))
+                if metric["type"] == "histogram":
+                    lines.extend(_render_histogram(name, labels, metric["buckets"], value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, (help_text, callback) in sorted(self._gauges.items()):
+            try:
+                value = callback()
+            except Exception:
+                logger.warning("Metrics gauge %s failed", name, exc_info=True)
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            samples = value if isinstance(value, list) else [({}, value)]
+            for labels, sample in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(sample)}")
+        return "\n".join(lines) + "\n"
+
+
+def merge_snapshots(snapshots):
+    """Sum counters and histograms across per-process snapshots."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for key, value in metric["samples"]:
+                key = tuple(map(tuple, key))
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif metric["type"] == "histogram":
+                    counts = [a + b for a, b in zip(current[0], value[0])]
+                    target["samples"][key] = [counts, current[1] + value[1], current[2] + value[2]]
+                else:
+                    target["samples"][key] = current + value
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+
+def _render_histogram(name, labels, buckets, value):
+    counts, total, count = value
+    cumulative = 0
+    for bound, bucket_count in zip(buckets, counts):
+        cumulative += bucket_count
+        bucket_labels = {**labels, "le": _format_value(bound)}
+        yield f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+    yield f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}"
+    yield f"{name}_sum{_format_labels(labels)} {_format_value(total)}"
+    yield f"{name}_count{_format_labels(labels)} {count}"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route, method and status."
+)
+DB_QUERIES = registry.counter(
+    "http_db_queries_total", "Database queries run by requests, by route."
+)
+DB_QUERY_SECONDS = registry.counter(
+    "http_db_query_seconds_total", "Time requests spent in database queries, by route."
+)
+
+
+def _collect_cache_stats():
+    from .cache import tiered_cache
+
+    stats = tiered_cache.get_stats()
+    return [
+        ({"result": "local_hit"}, stats["local_hits"]),
+        ({"result": "remote_hit"}, stats["remote_hits"]),
+        ({"result": "miss"}, stats["misses"]),
+    ]
+
+
+registry.register_collector(
+    "cache_requests_total", "Two-tier cache reads by result.", _collect_cache_stats
+)
+
+
+def _collect_log_stats():
+    from .jsonlog import get_stats
+
+    stats = get_stats()
+    return [({"outcome": "written"}, stats["written"]), ({"outcome": "dropped"}, stats["dropped"])]
+
+
+registry.register_collector(
+    "log_records_total", "Records handled by the queued JSON log writer.", _collect_log_stats
+)
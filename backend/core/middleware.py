@@ -4,22 +4,276 @@ Custom middleware for CodeMentor-AI.
 
 import logging
 import time
+import uuid
 
-from django.utils.deprecation import MiddlewareMixin
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import metrics, profiling
+from .db.router import PrimaryPin, replica_reads
+from .jsonlog import request_id_var
+from .query_budget import QueryBudgetExceeded, QueryCounter, get_query_budget
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
 
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(MiddlewareMixin):
-    """Log all requests with timing information."""
+class LoggingMiddleware:
+    """
+    Log every request as a structured record.
+
+    Each request gets an id (the incoming ``X-Request-ID`` or a new one), which
+    is echoed in the response and attached to every record logged while the
+    request is served. The request record carries the id, user id, status,
+    duration and query count as separate fields.
+    """
 
-    def process_request(self, request):
-        request.start_time = time.time()
+    request_id_header = "X-Request-ID"
 
-    def process_response(self, request, response):
-        if hasattr(request, "start_time"):
-            duration = time.time() - request.start_time
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.request_id = request.headers.get(self.request_id_header) or uuid.uuid4().hex
+        token = request_id_var.set(request.request_id)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            duration = time.perf_counter() - started
+            response[self.request_id_header] = request.request_id
+
+            user = getattr(request, "user", None)
             logger.info(
-                f"{request.method} {request.path} - {response.status_code} - {duration:.2f}s"
+                "%s %s - %s - %.3fs",
+                request.method,
+                request.path,
+                response.status_code,
+                duration,
+                extra={
+                    "request_id": request.request_id,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "user_id": user.pk if user is not None and user.is_authenticated else None,
+                    "query_count": getattr(request, "query_count", None),
+                },
+            )
+            return response
+        finally:
+            request_id_var.reset(token)
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and database usage per route in ``core.metrics``.
+
+    Must sit outside ``QueryBudgetMiddleware``, which measures the queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics.registry.ensure_writer()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        route = (match.view_name or match.route) if match else "unmatched"
+        metrics.REQUEST_DURATION.observe(
+            duration, route=route, method=request.method, status=response.status_code
+        )
+        if hasattr(request, "query_count"):
+            metrics.DB_QUERIES.inc(request.query_count, route=route)
+            metrics.DB_QUERY_SECONDS.inc(request.query_time, route=route)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress responses of at least ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes.
+
+    Brotli is used when the client accepts it and the ``brotli`` package is
+    installed, gzip otherwise. Streaming responses (event streams) are left
+    alone, as are responses that would not get smaller.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not settings.RESPONSE_COMPRESSION
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = self.choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+        if encoding == "br":
+            compressed = brotli.compress(
+                response.content, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY
             )
+        else:
+            compressed = compress_string(response.content, max_random_bytes=100)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
         return response
+
+    @staticmethod
+    def choose_encoding(accept_encoding):
+        accepted = set()
+        for item in accept_encoding.split(","):
+            coding, _, params = item.partition(";")
+            params = params.replace(" ", "")
+            try:
+                if params.startswith("q=") and float(params[2:]) == 0:
+                    continue  # Explicitly refused.
+            except ValueError:
+                continue
+            accepted.add(coding.strip().lower())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+
+class QueryBudgetMiddleware:
+    """
+    Count each request's queries and enforce the view's declared budget.
+
+    Over-budget requests raise ``QueryBudgetExceeded`` in strict mode, which
+    only the test suite enables: the view has already run and committed its
+    writes by then. Everywhere else they are logged as warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with counter.activate():
+            response = self.get_response(request)
+        request.query_count = counter.count
+        request.query_time = counter.duration
+
+        match = getattr(request, "resolver_match", None)
+        budget = get_query_budget(match.func) if match else None
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path} ran {counter.count} queries "
+                f"(budget {budget}) in {match.view_name}"
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe requests from read replicas, with read-your-writes pinning.
+
+    A user whose last successful write was less than ``REPLICA_PIN_SECONDS``
+    ago keeps reading from the primary. Users are identified by the JWT's
+    user id, which is known before the view authenticates the request; the
+    validated token is kept on the request as ``validated_jwt`` so
+    authentication does not validate it again.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.authentication = JWTAuthentication()
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        user_id = self.get_user_id(request)
+        if request.method in SAFE_METHODS:
+            use_replicas = user_id is None or not PrimaryPin.is_pinned(user_id)
+            with replica_reads(use_replicas):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if user_id is not None and response.status_code < 400:
+            PrimaryPin.pin(user_id)
+        return response
+
+    def get_user_id(self, request):
+        header = self.authentication.get_header(request)
+        raw_token = header and self.authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        try:
+            validated_token = self.authentication.get_validated_token(raw_token)
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except (InvalidToken, TokenError, KeyError):
+            return None
+        request.validated_jwt = validated_token
+        return user_id
+
+
+class ProfilingMiddleware:
+    """
+    Profile opted-in requests and capture slow requests and queries.
+
+    See ``core.profiling`` for how requests opt in and where captures go.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = profiling.ProfilingSession() if profiling.should_profile(request) else None
+        recorder = profiling.QueryRecorder(session, getattr(request, "request_id", None))
+        started = time.perf_counter()
+        with recorder.activate(), profiling.profile(session):
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if session is not None or duration_ms >= settings.SLOW_REQUEST_MS:
+            profiling.SlowLog.record(
+                "requests", self.build_entry(request, response, duration_ms, session)
+            )
+        return response
+
+    def build_entry(self, request, response, duration_ms, session):
+        entry = {
+            "request_id": getattr(request, "request_id", None),
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 3),
+            "at": time.time(),
+            "profiled": session is not None,
+        }
+        if session is not None:
+            entry["queries"] = session.queries
+            entry["cache_calls"] = session.cache_calls
+            entry["cprofile"] = getattr(session, "cprofile", None)
+        return entry
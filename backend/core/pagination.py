@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the ``(timestamp, id)`` of the last row seen instead of
+an offset, and no ``COUNT(*)`` is issued, so page N costs the same as page 1
+as long as a composite index covers the ordering.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only pagination over ``(ordering_field, id)``, newest first.
+
+    Subclasses set ``ordering_field`` to a timestamp column; the model needs a
+    matching ``(..., ordering_field, id)`` index for flat deep-page latency.
+    """
+
+    ordering_field = "created_at"
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(f"-{self.ordering_field}", "-id")
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(*position))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def position_filter(self, value, row_id):
+        """Rows strictly after ``(value, row_id)`` in descending order."""
+        field = self.ordering_field
+        # The redundant ``lte`` bound lets the index range scan start at the cursor.
+        return Q(**{f"{field}__lte": value}) & (
+            Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": row_id})
+        )
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw_value, row_id = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            value = parse_datetime(raw_value)
+            if value is None:
+                raise ValueError(raw_value)
+            return value, int(row_id)
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        if isinstance(row, dict):
+            value, row_id = row[self.ordering_field], row["id"]
+        else:
+            value, row_id = getattr(row, self.ordering_field), row.id
+        payload = json.dumps([value.isoformat(), row_id]).encode("ascii")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from the previous page's `next` link.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Results per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,197 @@
+"""
+Opt-in request profiling and slow request/query capture.
+
+A request is profiled when ``PROFILING_ENABLED`` is set, when it is picked by
+``PROFILING_SAMPLE_RATE``, or when it carries ``X-Profile: <PROFILING_HEADER_TOKEN>``.
+Profiled requests record every SQL statement and cache call with its timing
+(and, with ``PROFILING_CPROFILE``, the top functions from cProfile).
+
+Independently of profiling, any request slower than ``SLOW_REQUEST_MS`` and
+any statement slower than ``SLOW_QUERY_MS`` is captured. Captures go to ring
+buffers in Redis, shared by all workers, or in process memory when the cache
+is not Redis; ``GET /api/v1/profiling/`` shows them to staff users.
+"""
+
+import collections
+import contextlib
+import contextvars
+import cProfile
+import hmac
+import io
+import json
+import logging
+import pstats
+import random
+import threading
+import time
+
+import redis
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+CACHE_METHODS = ("get", "set", "add", "delete", "get_many", "set_many", "delete_many", "incr")
+MAX_SQL_LENGTH = 2000
+CPROFILE_TOP_FUNCTIONS = 30
+
+_session = contextvars.ContextVar("profiling_session", default=None)
+
+
+class ProfilingSession:
+    """What a profiled request did."""
+
+    def __init__(self):
+        self.queries = []
+        self.cache_calls = []
+
+
+class SlowLog:
+    """Bounded logs of slow requests and queries, newest first."""
+
+    KINDS = ("requests", "queries")
+    _lock = threading.Lock()
+    _local = {}
+
+    @staticmethod
+    def _redis():
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+
+    @staticmethod
+    def record(kind, entry):
+        size = settings.PROFILING_BUFFER_SIZE
+        try:
+            client = SlowLog._redis()
+        except NotImplementedError:
+            with SlowLog._lock:
+                buffer = SlowLog._local.setdefault(kind, collections.deque(maxlen=size))
+                buffer.appendleft(entry)
+            return
+        try:
+            key = f"profiling_slow_{kind}"
+            client.pipeline().lpush(key, json.dumps(entry, default=str)).ltrim(
+                key, 0, size - 1
+            ).execute()
+        except redis.RedisError:
+            logger.warning("Could not record slow %s entry", kind)
+
+    @staticmethod
+    def entries(kind):
+        try:
+            client = SlowLog._redis()
+        except NotImplementedError:
+            with SlowLog._lock:
+                return list(SlowLog._local.get(kind, ()))
+        try:
+            raw_entries = client.lrange(f"profiling_slow_{kind}", 0, -1)
+        except redis.RedisError:
+            logger.warning("Could not read slow %s entries", kind)
+            return []
+        return [json.loads(raw) for raw in raw_entries]
+
+    @staticmethod
+    def clear():
+        with SlowLog._lock:
+            SlowLog._local.clear()
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that captures slow statements, and all of them when profiling."""
+
+    def __init__(self, session, request_id=None):
+        self.session = session
+        self.request_id = request_id
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            entry = {
+                "sql": sql[:MAX_SQL_LENGTH],
+                "many": many,
+                "duration_ms": round(duration_ms, 3),
+                "database": context["connection"].alias,
+            }
+            if self.session is not None:
+                self.session.queries.append(entry)
+            if duration_ms >= settings.SLOW_QUERY_MS:
+                SlowLog.record("queries", {**entry, "request_id": self.request_id})
+
+    @contextlib.contextmanager
+    def activate(self):
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def should_profile(request):
+    if settings.PROFILING_ENABLED:
+        return True
+    token = settings.PROFILING_HEADER_TOKEN
+    header = request.headers.get(PROFILE_HEADER)
+    if token and header and hmac.compare_digest(header.encode(), token.encode()):
+        return True
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+@contextlib.contextmanager
+def profile(session):
+    """Activate ``session`` for cache instrumentation (and cProfile if configured)."""
+    token = _session.set(session)
+    profiler = cProfile.Profile() if session and settings.PROFILING_CPROFILE else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            session.cprofile = format_profile(profiler)
+        _session.reset(token)
+
+
+def format_profile(profiler):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(CPROFILE_TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def _instrument(method, name):
+    def wrapper(self, *args, **kwargs):
+        session = _session.get()
+        if session is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            session.cache_calls.append(
+                {
+                    "method": name,
+                    "key": str(args[0])[:200] if args else None,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                }
+            )
+
+    wrapper.profiling_wrapped = True
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+def install_cache_instrumentation():
+    """Wrap the configured cache backends' methods; a no-op outside profiled requests."""
+    for config in settings.CACHES.values():
+        backend = import_string(config["BACKEND"])
+        for name in CACHE_METHODS:
+            method = getattr(backend, name, None)
+            if method is not None and not getattr(method, "profiling_wrapped", False):
+                setattr(backend, name, _instrument(method, name))
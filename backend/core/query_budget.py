@@ -0,0 +1,58 @@
+"""
+Per-view database query budgets.
+
+Views declare how many queries a request may cost, either with the
+``query_budget`` decorator (function views) or a ``query_budget`` class
+attribute (class-based views). ``core.middleware.QueryBudgetMiddleware``
+counts the queries each request actually runs and enforces the budget.
+"""
+
+import contextlib
+import time
+
+from django.db import connections
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a view runs more queries than it declared."""
+
+
+class QueryCounter:
+    """Count and time queries on every database connection while active."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+
+    @contextlib.contextmanager
+    def activate(self):
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of queries a function view may run."""
+
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+
+    return decorator
+
+
+def get_query_budget(view_func):
+    """Return the budget declared by a resolved view, or None."""
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None:
+        budget = getattr(getattr(view_func, "cls", None), "query_budget", None)
+    return budget
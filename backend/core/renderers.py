@@ -0,0 +1,32 @@
+"""
+JSON rendering with orjson.
+
+``ORJSONRenderer`` is a drop-in replacement for DRF's ``JSONRenderer``:
+same media type and output, several times faster on large payloads. Types
+orjson does not know, or formats differently (``Decimal``, dates, lazy
+translations, ...), go through DRF's encoder. Without orjson installed it
+falls back to the stdlib renderer.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        # Dates go through DRF's encoder too, so they are formatted the same way.
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        rendered = orjson.dumps(data, default=self.encoder_class().default, option=options)
+        # Like JSONRenderer, escape the separators JavaScript treats as line breaks.
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,37 @@
+"""
+Shared serializer utilities.
+"""
+
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients ask for a subset of a serializer's fields with ``?fields=a,b``.
+
+    Fields can also be restricted in code with the ``fields`` keyword argument.
+    Unknown names are ignored, and the query parameter only applies to safe
+    (read) requests so it can never drop fields from a write.
+    """
+
+    sparse_fields_param = "fields"
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            fields = self.get_requested_fields(self.context.get("request"))
+        if fields:
+            allowed = set(fields)
+            for name in list(self.fields):
+                if name not in allowed:
+                    self.fields.pop(name)
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Return the field names requested by ``request``, or None for all of them."""
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        value = request.query_params.get(cls.sparse_fields_param)
+        if not value:
+            return None
+        return [name.strip() for name in value.split(",") if name.strip()]
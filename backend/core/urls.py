@@ -4,8 +4,10 @@ Core URL patterns.
 
 from django.urls import path
 
-from .views import health_check
+from .views import health_check, liveness
 
 urlpatterns = [
     path("", health_check, name="health-check"),
+    path("live/", liveness, name="health-live"),
+    path("ready/", health_check, name="health-ready"),
 ]
@@ -2,42 +2,76 @@
 Core views for health checks and utilities.
 """
 
-from django.core.cache import cache
-from django.db import connection
+import hmac
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
+from .health import get_readiness
+from .metrics import registry
+from .profiling import SlowLog
+from .query_budget import query_budget
+
+
+@query_budget(0)
+@require_GET
+def liveness(request):
+    """
+    Liveness probe: the process is up and serving. Touches no dependency.
+    """
+    return JsonResponse({"status": "alive"})
+
 
+@query_budget(0)
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def health_check(request):
     """
-    Health check endpoint to verify service status.
+    Readiness probe: dependency checks with per-check latency, briefly cached.
     """
-    health_status = {
-        "status": "healthy",
-        "database": "unknown",
-        "cache": "unknown",
-    }
+    report = get_readiness()
+    ok = report["status"] == "healthy"
+    return Response(
+        report, status=status.HTTP_200_OK if ok else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
 
-    # Check database
-    try:
-        connection.ensure_connection()
-        health_status["database"] = "connected"
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["database"] = f"error: {str(e)}"
 
-    # Check cache
+@query_budget(0)
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint, aggregated across worker processes.
+    """
+    if not _may_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _may_scrape(request):
+    """With ``METRICS_TOKEN``, require it; otherwise only allow internal clients."""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        return hmac.compare_digest(request.headers.get("Authorization", ""), expected)
     try:
-        cache.set("health_check", "ok", 10)
-        if cache.get("health_check") == "ok":
-            health_status["cache"] = "connected"
-        else:
-            health_status["cache"] = "error"
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["cache"] = f"error: {str(e)}"
-
-    return Response(health_status)
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+
+@query_budget(1)  # Authenticated user on a cache miss
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profiling_log(request):
+    """
+    Recent slow and profiled requests, and slow queries, newest first.
+    """
+    return Response({kind: SlowLog.entries(kind) for kind in SlowLog.KINDS})
@@ -0,0 +1,60 @@
+"""
+Compare benchmark results against a stored baseline.
+
+Usage:
+    python -m tests.benchmarks.compare baseline.json benchmark-results.json --threshold 0.25
+
+Exits with status 1 when any benchmark present in both files got slower
+than the baseline by more than ``threshold`` (as a fraction) on ``metric``,
+or when a load scenario returned errors.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as stream:
+        return json.load(stream)["results"]
+
+
+def compare(baseline, current, metric, threshold):
+    """Return ``(rows, regressions)``; a row is ``(name, before, after, change)``."""
+    rows, regressions = [], []
+    for name in sorted(current):
+        after = current[name][metric]
+        before = baseline.get(name, {}).get(metric)
+        change = (after - before) / before if before else None
+        rows.append((name, before, after, change))
+        if (change is not None and change > threshold) or current[name].get("errors"):
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(
+        load(args.baseline), load(args.current), args.metric, args.threshold
+    )
+    print(f"{'benchmark':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, before, after, change in rows:
+        before_text = "-" if before is None else f"{before:.3f}"
+        change_text = "new" if change is None else f"{change:+.1%}"
+        flag = "  <- regression" if name in regressions else ""
+        print(f"{name:<40}{before_text:>12}{after:>12.3f}{change_text:>10}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark fixtures.
+
+Benchmarks are skipped unless selected with ``pytest -m benchmark``. They are
+configured with environment variables:
+
+- ``BENCHMARK_SCALE``: ``smoke`` (default), ``medium`` or ``full``
+- ``BENCHMARK_ITERATIONS``: timed calls per micro-benchmark (default 50)
+- ``BENCHMARK_REQUESTS``: requests per load scenario (default 200)
+- ``BENCHMARK_OUTPUT``: where to write the JSON results
+  (default ``benchmark-results.json``)
+"""
+
+import os
+
+import pytest
+from django.db import connection, transaction
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .factories import seed
+from .harness import RESULTS, write_results
+
+SCALE = os.getenv("BENCHMARK_SCALE", "smoke")
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "50"))
+OUTPUT = os.getenv("BENCHMARK_OUTPUT", "benchmark-results.json")
+
+
+def pytest_collection_modifyitems(config, items):
+    if "benchmark" in (config.option.markexpr or ""):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with -m benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_sessionfinish(session):
+    if RESULTS:
+        write_results(
+            OUTPUT, {"scale": SCALE, "iterations": ITERATIONS, "database": connection.vendor}
+        )
+
+
+@pytest.fixture(scope="session")
+def benchmark_data(django_db_setup, django_db_blocker):
+    """
+    Seed the data set once per session.
+
+    Seeding happens in a transaction that is rolled back when the session
+    ends; each test runs in a savepoint inside it.
+    """
+    from django.contrib.auth import get_user_model
+
+    from apps.problems.models import Problem
+
+    with django_db_blocker.unblock(), transaction.atomic():
+        counts = seed(SCALE)
+        # Submissions are skewed towards the first users, so this one has the longest history.
+        user = get_user_model().objects.order_by("id").first()
+        problems = list(Problem.objects.order_by("id").values_list("id", "slug")[:100])
+        yield {
+            "counts": counts,
+            "user": user,
+            "token": str(AccessToken.for_user(user)),
+            "problem_ids": [problem_id for problem_id, _ in problems],
+            "slugs": [slug for _, slug in problems],
+        }
+        transaction.set_rollback(True)
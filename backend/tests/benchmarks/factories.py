@@ -0,0 +1,150 @@
+"""
+Factories and bulk seeding for benchmark data.
+
+``seed(scale)`` fills the database with a reproducible data set: the same
+seed always produces the same users, problems and submissions. Rows are
+built with factory_boy and written with ``bulk_create`` in batches, so
+model signals do not fire; normalized tags are written directly instead.
+"""
+
+import factory
+import factory.random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from apps.problems.models import Problem, ProblemTag, Submission, Tag
+
+User = get_user_model()
+
+SCALES = {
+    # Fast enough for a laptop or a CI job.
+    "smoke": {"users": 500, "problems": 200, "submissions": 5_000},
+    "medium": {"users": 10_000, "problems": 2_000, "submissions": 100_000},
+    # Production-like volumes.
+    "full": {"users": 100_000, "problems": 10_000, "submissions": 1_000_000},
+}
+BATCH_SIZE = 2_000
+PASSWORD = "benchmark-password"
+
+TAGS = [
+    "array",
+    "string",
+    "hash-table",
+    "math",
+    "dynamic-programming",
+    "sorting",
+    "greedy",
+    "graph",
+    "tree",
+    "binary-search",
+    "two-pointers",
+    "stack",
+    "heap",
+    "recursion",
+    "bit-manipulation",
+]
+CODE_SAMPLES = [
+    "a, b = map(int, input().split())\nprint(a + b)\n",
+    "import sys\nprint(sum(map(int, sys.stdin.read().split())))\n",
+    "def solve(nums):\n    return sorted(nums)\n\nprint(*solve(list(map(int, input().split()))))\n",
+    "n = int(input())\nprint(n * (n + 1) // 2)\n",
+]
+
+
+def _tags():
+    randgen = factory.random.randgen
+    return randgen.sample(TAGS, randgen.randint(1, 4))
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f"bench_user_{n}")
+    email = factory.LazyAttribute(lambda user: f"{user.username}@example.com")
+    bio = factory.Faker("sentence")
+
+
+class ProblemFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Problem
+
+    title = factory.Sequence(lambda n: f"Benchmark Problem {n}")
+    slug = factory.Sequence(lambda n: f"benchmark-problem-{n}")
+    description = factory.Faker("paragraph", nb_sentences=12)
+    difficulty = factory.Iterator(["easy", "medium", "hard"])
+    tags = factory.LazyFunction(_tags)
+    examples = factory.LazyFunction(
+        lambda: [{"input": "1 2\n", "output": "3\n"}, {"input": "10 -4\n", "output": "6\n"}]
+    )
+    constraints = "1 <= n <= 10^5"
+    starter_code = "def solve():\n    pass\n"
+    hints = factory.LazyFunction(lambda: ["Think about the edge cases."])
+
+
+class SubmissionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Submission
+
+    code = factory.Iterator(CODE_SAMPLES)
+    language = "python"
+    status = factory.Iterator(["accepted", "wrong_answer", "accepted", "time_limit_exceeded"])
+    runtime = factory.LazyFunction(lambda: factory.random.randgen.randint(5, 900))
+    memory = factory.LazyFunction(lambda: factory.random.randgen.randint(8_000, 64_000))
+
+
+def _skewed(items):
+    # A few users and problems get most of the traffic, as in production.
+    return items[int(len(items) * factory.random.randgen.random() ** 3)]
+
+
+def _bulk_create(model, build, count):
+    for start in range(0, count, BATCH_SIZE):
+        model.objects.bulk_create(build(min(BATCH_SIZE, count - start)), batch_size=BATCH_SIZE)
+
+
+def seed_tags():
+    """Write ``Tag`` and ``ProblemTag`` rows for every seeded problem."""
+    counts = {}
+    links = []
+    for problem_id, tags in Problem.objects.values_list("id", "tags").iterator():
+        for name in tags:
+            counts[name] = counts.get(name, 0) + 1
+            links.append((problem_id, name))
+    Tag.objects.bulk_create(
+        [Tag(name=name, problem_count=count) for name, count in counts.items()],
+        batch_size=BATCH_SIZE,
+    )
+    tag_ids = dict(Tag.objects.values_list("name", "id"))
+    ProblemTag.objects.bulk_create(
+        [ProblemTag(problem_id=problem_id, tag_id=tag_ids[name]) for problem_id, name in links],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def seed(scale="smoke", seed_value=1234):
+    """Create the data set for ``scale`` and return its size."""
+    counts = SCALES[scale]
+    factory.random.reseed_random(seed_value)
+    password = make_password(PASSWORD)
+
+    _bulk_create(User, lambda n: UserFactory.build_batch(n, password=password), counts["users"])
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+
+    author_id = user_ids[0]
+    _bulk_create(
+        Problem,
+        lambda n: ProblemFactory.build_batch(n, created_by_id=author_id),
+        counts["problems"],
+    )
+    problem_ids = list(Problem.objects.order_by("id").values_list("id", flat=True))
+    seed_tags()
+
+    def submissions(n):
+        return [
+            SubmissionFactory.build(user_id=_skewed(user_ids), problem_id=_skewed(problem_ids))
+            for _ in range(n)
+        ]
+
+    _bulk_create(Submission, submissions, counts["submissions"])
+    return counts
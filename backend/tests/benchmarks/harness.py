@@ -0,0 +1,254 @@
+"""
+Timing, load generation and JSON results for the benchmark suite.
+
+``measure`` times a callable in-process. ``WSGILoad`` and ``ASGILoad`` send
+requests through the project's real WSGI and ASGI applications, with every
+middleware, without a network server in between, so the numbers isolate
+the application from the HTTP server and the network.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+
+RESULTS = {}
+
+
+def summarize(samples_ms, elapsed=None):
+    """Latency percentiles (ms) and throughput for a list of samples."""
+    ordered = sorted(samples_ms)
+
+    def percentile(fraction):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+    elapsed = elapsed if elapsed is not None else sum(ordered) / 1000
+    return {
+        "iterations": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1], 3),
+        "ops_per_sec": round(len(ordered) / elapsed, 1) if elapsed else None,
+    }
+
+
+def measure(func, iterations, warmup=5):
+    """Call ``func`` ``warmup`` times untimed, then time ``iterations`` calls."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def record(name, result):
+    RESULTS[name] = result
+    return result
+
+
+def write_results(path, meta):
+    """Write everything recorded this session to ``path`` as JSON."""
+    payload = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            **meta,
+        },
+        "results": dict(sorted(RESULTS.items())),
+    }
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(payload, stream, indent=2)
+        stream.write("\n")
+
+
+@contextlib.contextmanager
+def keep_connections():
+    """
+    Stop the handlers from closing database connections between requests.
+
+    The benchmark runs inside the test's transaction, as Django's test client
+    does; closing the connection would end it.
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        yield
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+class Request:
+    """One request of a load scenario."""
+
+    def __init__(self, method, url, token=None, body=None):
+        self.method = method
+        parts = urlsplit(url)
+        self.path, self.query = parts.path, parts.query
+        self.token = token
+        self.body = json.dumps(body).encode() if body is not None else b""
+
+
+class LoadResult:
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, duration_ms, status):
+        with self._lock:
+            self.samples.append(duration_ms)
+            if status >= 400:
+                self.errors += 1
+
+    def summary(self, elapsed):
+        return {**summarize(self.samples, elapsed), "errors": self.errors}
+
+
+class WSGILoad:
+    """
+    Drive ``config.wsgi.application`` from ``concurrency`` threads.
+
+    Threads need a database every thread can reach; the in-memory SQLite
+    database of the test settings is per connection, so keep concurrency at
+    1 there.
+    """
+
+    def __init__(self, concurrency=1):
+        from config.wsgi import application
+
+        self.application = application
+        self.concurrency = concurrency
+
+    def _environ(self, request):
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "PATH_INFO": request.path,
+            "QUERY_STRING": request.query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": "127.0.0.1",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(request.body)),
+            "wsgi.input": io.BytesIO(request.body),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0),
+            "wsgi.multithread": self.concurrency > 1,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        if request.token:
+            environ["HTTP_AUTHORIZATION"] = f"Bearer {request.token}"
+        return environ
+
+    def _send(self, request, result):
+        statuses = []
+        started = time.perf_counter()
+        body = self.application(
+            self._environ(request), lambda status, headers, exc_info=None: statuses.append(status)
+        )
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        result.add((time.perf_counter() - started) * 1000, int(statuses[0].split()[0]))
+
+    def run(self, requests):
+        result = LoadResult()
+        started = time.perf_counter()
+        with keep_connections():
+            if self.concurrency == 1:
+                for request in requests:
+                    self._send(request, result)
+            else:
+                with ThreadPoolExecutor(self.concurrency) as executor:
+                    list(executor.map(lambda request: self._send(request, result), requests))
+        return result.summary(time.perf_counter() - started)
+
+
+class ASGILoad:
+    """Drive ``config.asgi.application`` with ``concurrency`` concurrent requests."""
+
+    def __init__(self, concurrency=10):
+        from config.asgi import application
+
+        self.application = application
+        self.concurrency = concurrency
+
+    def _scope(self, request):
+        headers = [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(request.body)).encode()),
+        ]
+        if request.token:
+            headers.append((b"authorization", f"Bearer {request.token}".encode()))
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": "http",
+            "path": request.path,
+            "raw_path": request.path.encode(),
+            "query_string": request.query.encode(),
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+
+    async def _send(self, request, result):
+        messages = [{"type": "http.request", "body": request.body, "more_body": False}]
+        status = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()  # No disconnect while the response is pending.
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        started = time.perf_counter()
+        await self.application(self._scope(request), receive, send)
+        result.add((time.perf_counter() - started) * 1000, status[0])
+
+    async def _run(self, requests, result):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(request):
+            async with semaphore:
+                await self._send(request, result)
+
+        await asyncio.gather(*(bounded(request) for request in requests))
+
+    def run(self, requests):
+        result = LoadResult()
+        started = time.perf_counter()
+        # Entered from this thread, so sync views run back on it (and its database connection).
+        with keep_connections():
+            async_to_sync(self._run)(requests, result)
+        return result.summary(time.perf_counter() - started)
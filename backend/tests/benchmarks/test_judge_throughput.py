@@ -0,0 +1,34 @@
+"""
+Judge throughput with a fresh interpreter per run, with warm templates, and
+with every test in one batched process.
+"""
+
+import os
+
+import pytest
+
+from apps.problems.judge import executor, interpreters
+
+from .harness import measure, record
+
+pytestmark = pytest.mark.benchmark
+
+ITERATIONS = int(os.getenv("BENCHMARK_JUDGE_ITERATIONS", "20"))
+SOLUTION = "a, b = map(int, input().split())\nprint(a + b)\n"
+TEST_CASES = [(f"{n} {n}\n", f"{2 * n}\n") for n in range(10)]
+
+
+@pytest.mark.parametrize("mode", ["cold", "warm", "batch"])
+def test_judge_throughput(mode):
+    """Benchmark judging a ten-test submission on one core."""
+    interpreters.configure(200 if mode == "warm" else 0)
+    batch = mode == "batch"
+    try:
+        result = measure(
+            lambda: executor.evaluate(SOLUTION, "python", TEST_CASES, batch=batch), ITERATIONS
+        )
+    finally:
+        interpreters.configure(0)
+    # One process judges sequentially, so this is runs per second per core.
+    result["runs_per_sec_per_core"] = round(result["ops_per_sec"] * len(TEST_CASES), 1)
+    record(f"judge.{mode}", result)
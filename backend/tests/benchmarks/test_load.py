@@ -0,0 +1,70 @@
+"""
+Load scenarios driven through the real WSGI and ASGI applications.
+"""
+
+import itertools
+import os
+
+import pytest
+
+from .harness import ASGILoad, Request, WSGILoad, record
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "200"))
+ASGI_CONCURRENCY = int(os.getenv("BENCHMARK_ASGI_CONCURRENCY", "10"))
+WSGI_THREADS = int(os.getenv("BENCHMARK_WSGI_THREADS", "1"))
+
+
+@pytest.fixture(params=["wsgi", "asgi"])
+def server(request):
+    if request.param == "wsgi":
+        return request.param, WSGILoad(concurrency=WSGI_THREADS)
+    return request.param, ASGILoad(concurrency=ASGI_CONCURRENCY)
+
+
+def run(server, scenario, requests):
+    name, load = server
+    # Warm caches and code paths so the run measures the steady state.
+    load.run(requests[:10])
+    result = record(f"load.{name}.{scenario}", load.run(requests))
+    assert result["errors"] == 0, f"{scenario} returned errors"
+
+
+class TestLoad:
+    """Measure throughput and latency of the main API endpoints."""
+
+    def test_problem_list(self, server, benchmark_data):
+        """Load the first page of the problem list."""
+        token = benchmark_data["token"]
+        run(server, "problem_list", [Request("GET", "/api/v1/problems/", token)] * REQUESTS)
+
+    def test_problem_detail(self, server, benchmark_data):
+        """Load problem details across the first hundred problems."""
+        token = benchmark_data["token"]
+        slugs = itertools.cycle(benchmark_data["slugs"])
+        requests = [
+            Request("GET", f"/api/v1/problems/{next(slugs)}/", token) for _ in range(REQUESTS)
+        ]
+        run(server, "problem_detail", requests)
+
+    def test_submit(self, server, benchmark_data):
+        """Load the submit endpoint with distinct programs."""
+        token = benchmark_data["token"]
+        problem_ids = itertools.cycle(benchmark_data["problem_ids"])
+        requests = [
+            Request(
+                "POST",
+                "/api/v1/problems/submit/",
+                token,
+                {"problem_id": next(problem_ids), "code": f"print({n})\n", "language": "python"},
+            )
+            for n in range(REQUESTS)
+        ]
+        run(server, "submit", requests)
+
+    def test_submissions(self, server, benchmark_data):
+        """Load the busiest user's submission history."""
+        token = benchmark_data["token"]
+        requests = [Request("GET", "/api/v1/problems/submissions/", token)] * REQUESTS
+        run(server, "submissions", requests)
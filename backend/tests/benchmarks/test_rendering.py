@@ -0,0 +1,75 @@
+"""
+Compare the stdlib and orjson renderers, and the cost of compressing responses.
+"""
+
+import functools
+import gzip
+
+import pytest
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+
+from apps.problems.models import Problem
+from apps.problems.serializers import ProblemSerializer, SubmissionSerializer
+from apps.problems.services.problem_service import ProblemService
+from core.renderers import ORJSONRenderer
+
+from .conftest import ITERATIONS
+from .harness import Request, WSGILoad, measure, record
+from .test_load import REQUESTS
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+RENDERERS = {"stdlib": JSONRenderer, "orjson": ORJSONRenderer}
+ENDPOINTS = {
+    "problem_list": "/api/v1/problems/",
+    "submissions": "/api/v1/problems/submissions/",
+}
+
+
+@pytest.fixture
+def payloads(benchmark_data):
+    problems = Problem.objects.all()[:20]
+    submissions = ProblemService.get_user_submissions(benchmark_data["user"].id)[:20]
+    return {
+        # Full problems: the large examples/hints/description case.
+        "problems": {"results": ProblemSerializer(problems, many=True).data},
+        "submissions": {"results": SubmissionSerializer(submissions, many=True).data},
+    }
+
+
+class TestRendering:
+    """Time rendering and compressing serialized pages."""
+
+    @pytest.mark.parametrize("renderer", RENDERERS)
+    @pytest.mark.parametrize("payload", ["problems", "submissions"])
+    def test_render(self, payloads, renderer, payload):
+        """Benchmark rendering a page of serialized rows to JSON bytes."""
+        render = RENDERERS[renderer]().render
+        data = payloads[payload]
+        record(f"render.{renderer}.{payload}", measure(lambda: render(data), ITERATIONS))
+
+    @pytest.mark.parametrize("encoding", ["gzip", "br"])
+    def test_compress(self, payloads, encoding):
+        """Benchmark compressing a rendered page and record the size saved."""
+        body = ORJSONRenderer().render(payloads["problems"])
+        if encoding == "br":
+            brotli = pytest.importorskip("brotli")
+            compress = functools.partial(brotli.compress, body, quality=4)
+        else:
+            compress = functools.partial(gzip.compress, body, compresslevel=6)
+        result = measure(compress, ITERATIONS)
+        result["ratio"] = round(len(compress()) / len(body), 3)
+        record(f"compress.{encoding}.problems", result)
+
+    @pytest.mark.parametrize("renderer", RENDERERS)
+    @pytest.mark.parametrize("endpoint", ENDPOINTS)
+    def test_endpoint(self, benchmark_data, monkeypatch, renderer, endpoint):
+        """Benchmark an endpoint end to end with each renderer."""
+        path = ENDPOINTS[endpoint]
+        monkeypatch.setattr(resolve(path).func.cls, "renderer_classes", [RENDERERS[renderer]])
+        requests = [Request("GET", path, benchmark_data["token"])] * REQUESTS
+        load = WSGILoad()
+        load.run(requests[:10])
+        result = record(f"load.wsgi.{endpoint}.{renderer}", load.run(requests))
+        assert result["errors"] == 0
@@ -0,0 +1,94 @@
+"""
+Micro-benchmarks for the service layer and serializers.
+"""
+
+import pytest
+
+from apps.problems.models import Problem
+from apps.problems.serializers import (
+    ProblemSerializer,
+    ProblemSummarySerializer,
+    SubmissionSerializer,
+)
+from apps.problems.services.problem_service import ProblemService
+from apps.users.services.user_service import UserService
+
+from .conftest import ITERATIONS
+from .harness import measure, record
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+PAGE_SIZE = 20
+
+
+def bench(name, func):
+    assert func(), f"{name} did no work"
+    return record(name, measure(func, ITERATIONS))
+
+
+class TestProblemServiceBenchmarks:
+    """Time ``ProblemService`` reads against the seeded data set."""
+
+    def test_problem_list_page(self, benchmark_data):
+        """Benchmark the first page of the unfiltered problem list."""
+        bench(
+            "service.problems.list_page",
+            lambda: list(ProblemService.get_problems_list()[:PAGE_SIZE]),
+        )
+
+    def test_problem_list_by_tags(self, benchmark_data):
+        """Benchmark a page of problems filtered on any of two tags."""
+        filters = {"tags": ["array", "graph"], "match": "any"}
+        bench(
+            "service.problems.list_by_tags",
+            lambda: list(ProblemService.get_problems_list(filters)[:PAGE_SIZE]),
+        )
+
+    def test_problem_detail(self, benchmark_data):
+        """Benchmark the cached, serialized problem detail."""
+        slug = benchmark_data["slugs"][0]
+        bench("service.problems.detail", lambda: ProblemService.get_problem_detail(slug))
+
+    def test_user_submissions_page(self, benchmark_data):
+        """Benchmark a page of the busiest user's submission history."""
+        user_id = benchmark_data["user"].id
+        bench(
+            "service.submissions.user_page",
+            lambda: list(ProblemService.get_user_submissions(user_id)[:PAGE_SIZE]),
+        )
+
+
+class TestUserServiceBenchmarks:
+    """Time ``UserService`` reads."""
+
+    def test_user_profile(self, benchmark_data):
+        """Benchmark a cached profile lookup."""
+        user_id = benchmark_data["user"].id
+        bench("service.users.profile", lambda: UserService.get_user_profile(user_id))
+
+
+class TestSerializerBenchmarks:
+    """Time serializing already-loaded rows."""
+
+    def test_problem_summary_page(self, benchmark_data):
+        """Benchmark serializing a page of problem summaries."""
+        problems = list(Problem.objects.all()[:PAGE_SIZE])
+        bench(
+            "serializer.problem_summary.page",
+            lambda: ProblemSummarySerializer(problems, many=True).data,
+        )
+
+    def test_problem_detail(self, benchmark_data):
+        """Benchmark serializing one full problem."""
+        problem = Problem.objects.get(slug=benchmark_data["slugs"][0])
+        bench("serializer.problem.detail", lambda: ProblemSerializer(problem).data)
+
+    def test_submission_page(self, benchmark_data):
+        """Benchmark serializing a page of submissions with their joined fields."""
+        submissions = list(
+            ProblemService.get_user_submissions(benchmark_data["user"].id)[:PAGE_SIZE]
+        )
+        bench(
+            "serializer.submission.page",
+            lambda: SubmissionSerializer(submissions, many=True).data,
+        )
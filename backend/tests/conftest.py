@@ -2,6 +2,10 @@
 Pytest configuration for CodeMentor-AI backend.
 """
 
+import shutil
+import tempfile
+from pathlib import Path
+
 import pytest
 from django.conf import settings
 
@@ -13,3 +17,64 @@ def django_db_setup():
         "NAME": ":memory:",
         "ATOMIC_REQUESTS": False,
     }
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail any request that runs more queries than its view's ``query_budget``."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached verdicts and profiles from leaking between tests."""
+    from django.core.cache import cache
+
+    from core.cache import tiered_cache
+
+    cache.clear()
+    tiered_cache.clear_local()
+
+
+@pytest.fixture
+def open_tmp_path():
+    """A temporary directory any user can reach, unlike ``tmp_path``, for sandbox tests."""
+    path = Path(tempfile.mkdtemp())
+    path.chmod(0o755)
+    yield path
+    shutil.rmtree(path)
+
+
+@pytest.fixture
+def user(db):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        username="student", email="student@example.com", password="password123"
+    )
+
+
+@pytest.fixture
+def problem(user):
+    from apps.problems.models import Problem
+
+    return Problem.objects.create(
+        title="Sum",
+        slug="sum",
+        description="Add two numbers.",
+        difficulty="easy",
+        tags=["math"],
+        examples=[{"input": "1 2\n", "output": "3\n"}, {"input": "10 -4", "output": "6"}],
+        constraints="",
+        starter_code="",
+        created_by=user,
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
@@ -0,0 +1,55 @@
+"""
+Tests for cached JWT authentication.
+"""
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.services.user_cache import UserCache
+
+
+@pytest.fixture
+def token_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    """Test that authenticated users come from cached snapshots."""
+
+    def test_repeat_requests_skip_user_query(self, token_client, django_assert_num_queries):
+        """Test that only the first request loads the user."""
+        token_client.get(reverse("profile"))
+
+        with django_assert_num_queries(0):
+            response = token_client.get(reverse("profile"))
+
+        assert response.status_code == 200
+        assert response.data["username"] == "student"
+
+    def test_deactivation_invalidates(self, token_client, user, django_capture_on_commit_callbacks):
+        """Test that a deactivated user is rejected straight away."""
+        token_client.get(reverse("profile"))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+
+        assert token_client.get(reverse("profile")).status_code == 401
+
+    def test_snapshot_user_never_writes_password(self, user):
+        """Test that saving a snapshot user leaves the password intact."""
+        user.set_password("s3cret-pass")
+        user.save()
+
+        snapshot_user, _ = UserCache.get(user.id)
+        snapshot_user.bio = "hi"
+        snapshot_user.save()
+
+        user.refresh_from_db()
+        assert user.bio == "hi"
+        assert user.check_password("s3cret-pass")
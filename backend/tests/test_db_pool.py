@@ -0,0 +1,68 @@
+"""
+Tests for the database connection pool.
+"""
+
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+    """Test connection reuse and bounds."""
+
+    def test_reuses_released_connections(self):
+        """Test that a released connection is handed out again."""
+        pool = ConnectionPool(FakeConnection, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+
+        assert pool.acquire() is first
+        assert pool.get_stats() == {"size": 1, "idle": 0, "max_size": 2}
+
+    def test_times_out_when_exhausted(self):
+        """Test that a full pool makes callers wait, then fail."""
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.01)
+        pool.acquire()
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire()
+
+    def test_discards_unusable_connections(self):
+        """Test that broken and stale connections are closed, freeing their slot."""
+        pool = ConnectionPool(FakeConnection, max_size=1, max_idle=0, check=lambda conn: False)
+        broken = pool.acquire()
+        pool.release(broken, reusable=False)
+        stale = pool.acquire()
+        pool.release(stale)
+
+        fresh = pool.acquire()
+
+        assert broken.closed and stale.closed
+        assert fresh is not stale and not fresh.closed
+
+
+@pytest.mark.django_db
+class TestBenchmarkCommand:
+    """Test the connection reuse benchmark."""
+
+    def test_compares_modes_through_django_connections(self):
+        """Test that each mode runs on its own temporary alias, removed afterwards."""
+        out = io.StringIO()
+
+        call_command("benchmark_db_connections", iterations=3, stdout=out)
+
+        output = out.getvalue()
+        assert "\nnone " in output and "\npersistent " in output
+        assert not [alias for alias in connections.settings if alias.startswith("benchmark_")]
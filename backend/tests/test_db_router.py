@@ -0,0 +1,96 @@
+"""
+Tests for read-replica routing.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.problems.models import Problem
+from apps.users.authentication import CachedJWTAuthentication
+from apps.users.services.user_cache import UserCache
+from core.db.router import PrimaryPin, ReplicaRouter, replica_reads
+from core.middleware import ReplicaRoutingMiddleware
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ["replica"]
+    settings.CACHE_INVALIDATION_REDIS_URL = ""
+
+
+class TestReplicaRouter:
+    """Test where reads and writes are sent."""
+
+    def test_reads_use_replicas_only_when_allowed(self, replicas):
+        """Test that reads outside replica_reads() stay on the primary."""
+        router = ReplicaRouter()
+
+        assert router.db_for_read(Problem) == "default"
+        with replica_reads():
+            assert router.db_for_read(Problem) == "replica"
+            assert router.db_for_write(Problem) == "default"
+
+
+class TestReplicaRoutingMiddleware:
+    """Test read-your-writes pinning."""
+
+    def make_request(self, method, token):
+        factory = RequestFactory()
+        return getattr(factory, method)("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_writer_is_pinned_to_primary(self, replicas):
+        """Test that a user's reads go to the primary right after a write."""
+        token = AccessToken()
+        token["user_id"] = 7
+        routed = []
+
+        def view(request):
+            routed.append(ReplicaRouter().db_for_read(Problem))
+            return HttpResponse(status=201 if request.method == "POST" else 200)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        middleware(self.make_request("get", token))
+        middleware(self.make_request("post", token))
+        middleware(self.make_request("get", token))
+
+        assert routed == ["replica", "default", "default"]
+
+    def test_token_is_validated_once(self, replicas, monkeypatch):
+        """Test that authentication reuses the token the middleware already validated."""
+        token = AccessToken()
+        token["user_id"] = 7
+        validations = []
+        validate = JWTAuthentication.get_validated_token
+        monkeypatch.setattr(
+            JWTAuthentication,
+            "get_validated_token",
+            lambda self, raw: validations.append(raw) or validate(self, raw),
+        )
+        monkeypatch.setattr(UserCache, "get", lambda user_id: None)
+
+        def view(request):
+            with pytest.raises(AuthenticationFailed):
+                CachedJWTAuthentication().authenticate(Request(request))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(self.make_request("get", token))
+
+        assert len(validations) == 1
+
+
+class TestPrimaryPin:
+    """Test where pins are looked up."""
+
+    def test_pin_from_another_worker_is_seen_at_once(self):
+        """Test that a pin written after a "not pinned" answer is honored by the next lookup."""
+        assert not PrimaryPin.is_pinned(7)
+
+        cache.set(PrimaryPin.make_key(7), 1)  # pinned by another worker
+
+        assert PrimaryPin.is_pinned(7)
@@ -2,10 +2,27 @@
 Tests for health check endpoint.
 """
 
+import threading
+import time
+
 import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from core import health
+
+
+@pytest.fixture(autouse=True)
+def fresh_report(monkeypatch):
+    # Checks run in their own threads, which cannot see the in-memory test database.
+    monkeypatch.setitem(health._checks, "database", (lambda: None, True))
+    monkeypatch.setitem(health._checks, "broker", (lambda: None, False))
+    # Forget checks still running from earlier tests.
+    monkeypatch.setattr(health, "_running", {})
+    health.reset()
+    yield
+    health.reset()
+
 
 @pytest.mark.django_db
 class TestHealthCheck:
@@ -20,3 +37,80 @@ class TestHealthCheck:
         assert response.status_code == 200
         assert "status" in response.data
         assert response.data["status"] in ["healthy", "unhealthy"]
+
+    def test_liveness_does_no_io(self, django_assert_num_queries, monkeypatch):
+        """Test that the liveness probe runs no checks."""
+        monkeypatch.setattr(health, "run_checks", None)
+
+        with django_assert_num_queries(0):
+            response = APIClient().get(reverse("health-live"))
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_readiness_reports_latency_per_check(self):
+        """Test that every dependency is reported with its latency."""
+        response = APIClient().get(reverse("health-ready"))
+
+        assert {"database", "cache", "broker", "judge"} <= set(response.data["checks"])
+        assert response.data["checks"]["database"]["status"] == "ok"
+        assert all("latency_ms" in check for check in response.data["checks"].values())
+
+    def test_critical_failure_returns_503(self, monkeypatch):
+        """Test that a failing critical check makes the service unready."""
+
+        def down():
+            raise ConnectionError("refused")
+
+        monkeypatch.setitem(health._checks, "cache", (down, True))
+
+        response = APIClient().get(reverse("health-ready"))
+
+        assert response.status_code == 503
+        assert response.data["checks"]["cache"]["error"] == "ConnectionError: refused"
+
+    def test_slow_check_times_out(self, monkeypatch, settings):
+        """Test that a hung check is reported without holding up the probe."""
+        settings.HEALTH_CHECK_TIMEOUT = 0.05
+        monkeypatch.setitem(health._checks, "broker", (lambda: time.sleep(1), False))
+
+        started = time.monotonic()
+        response = APIClient().get(reverse("health-ready"))
+
+        assert time.monotonic() - started < 0.5
+        assert response.status_code == 200
+        assert response.data["checks"]["broker"]["status"] == "timeout"
+        assert "broker" in response.data["degraded"]
+
+    def test_report_is_cached(self, monkeypatch):
+        """Test that probes within the cache period reuse the last report."""
+        calls = []
+        monkeypatch.setitem(health._checks, "broker", (lambda: calls.append(1), False))
+        client = APIClient()
+
+        first = client.get(reverse("health-ready"))
+        second = client.get(reverse("health-ready"))
+
+        assert len(calls) == 1
+        assert not first.data["cached"] and second.data["cached"]
+
+    def test_hung_check_is_not_started_again(self, monkeypatch, settings):
+        """Test that probes wait on a still-running check instead of piling up threads."""
+        settings.HEALTH_CHECK_TIMEOUT = 0.05
+        release = threading.Event()
+        calls = []
+
+        def hung():
+            calls.append(1)
+            release.wait(5)
+
+        monkeypatch.setitem(health._checks, "broker", (hung, False))
+        try:
+            for _ in range(3):
+                health.reset()
+                report = health.get_readiness()
+                assert report["checks"]["broker"]["status"] == "timeout"
+        finally:
+            release.set()
+
+        assert len(calls) == 1
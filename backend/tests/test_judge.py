@@ -0,0 +1,349 @@
+"""
+Tests for the judge engine.
+"""
+
+import pwd
+import re
+
+import pytest
+
+from apps.problems.judge import batch, executor, interpreters, sandbox
+from apps.problems.judge.pool import shutdown_pool
+from apps.problems.judge.sandbox import RunLimits, SandboxError
+from apps.problems.models import Submission
+from apps.problems.services.judge_service import JudgeService
+from apps.problems.services.verdict_cache import VerdictCache
+
+ECHO_SUM = "a, b = map(int, input().split())\nprint(a + b)\n"
+TEST_CASES = [("1 2\n", "3\n"), ("10 -4", "6")]
+
+
+class TestExecutor:
+    """Test sandboxed evaluation."""
+
+    def test_correct_solution_is_accepted(self):
+        """Test that a correct program is accepted with runtime and memory."""
+        verdict = executor.evaluate(ECHO_SUM, "python", TEST_CASES)
+
+        assert verdict["status"] == executor.ACCEPTED
+        assert verdict["runtime"] >= 0
+        assert verdict["memory"] > 0
+
+    def test_wrong_output_is_rejected(self):
+        """Test that a wrong program stops on the first failing test."""
+        verdict = executor.evaluate("print(3)\n", "python", TEST_CASES)
+
+        assert verdict["status"] == executor.WRONG_ANSWER
+        assert verdict["error_message"] == "Wrong answer on test 2"
+
+    def test_infinite_loop_hits_time_limit(self):
+        """Test that a program running past the limit is killed."""
+        limits = RunLimits(time_limit=0.5)
+        verdict = executor.evaluate("while True:\n    pass\n", "python", TEST_CASES, limits)
+
+        assert verdict["status"] == executor.TIME_LIMIT_EXCEEDED
+
+    def test_exception_is_reported_as_error(self):
+        """Test that a crashing program reports its traceback."""
+        verdict = executor.evaluate("raise ValueError('boom')\n", "python", TEST_CASES)
+
+        assert verdict["status"] == executor.ERROR
+        assert "ValueError: boom" in verdict["error_message"]
+
+    def test_error_message_hides_judge_paths_and_is_capped(self):
+        """Test that only the cleaned end of a crashing program's stderr is reported."""
+        code = "import sys\nsys.stderr.write('\\x1b[31m' + 'x' * 5000)\nraise ValueError('boom')\n"
+        verdict = executor.evaluate(code, "python", TEST_CASES)
+
+        message = verdict["error_message"]
+        assert message.endswith("ValueError: boom")
+        assert 'File "solution.py"' in message
+        assert "judge-runs" not in message and "\x1b" not in message
+        assert len(message) <= executor.MAX_STDERR_LENGTH + 100
+
+    def test_unsupported_language(self):
+        """Test that unknown languages are rejected without running anything."""
+        verdict = executor.evaluate("x", "cobol", TEST_CASES)
+
+        assert verdict["status"] == executor.ERROR
+        assert verdict["runtime"] is None
+
+
+class TestWarmInterpreters:
+    """Test runs forked from a warm template interpreter."""
+
+    @pytest.fixture(autouse=True)
+    def warm(self):
+        interpreters.configure(3)
+        yield
+        interpreters.configure(0)
+
+    def template_pid(self):
+        return interpreters._templates["python"].process.pid
+
+    @pytest.mark.parametrize(
+        "code, status",
+        [
+            (ECHO_SUM, executor.ACCEPTED),
+            ("print(3)\n", executor.WRONG_ANSWER),
+            ("raise ValueError('boom')\n", executor.ERROR),
+            ("import sys\nsys.exit(2)\n", executor.ERROR),
+        ],
+    )
+    def test_verdicts_match_cold_runs(self, code, status):
+        """Test that warm runs judge programs exactly like fresh interpreters."""
+        warm = executor.evaluate(code, "python", TEST_CASES)
+        interpreters.configure(0)
+        cold = executor.evaluate(code, "python", TEST_CASES)
+
+        assert warm["status"] == cold["status"] == status
+        # Tracebacks only differ in the name of the temporary directory.
+        assert re.sub(r"judge-\w+", "", warm["error_message"]) == re.sub(
+            r"judge-\w+", "", cold["error_message"]
+        )
+
+    def test_limit_violation_replaces_template(self):
+        """Test that a run killed for its time limit gets a fresh template."""
+        first = self.template_pid()
+        limits = RunLimits(time_limit=0.5)
+
+        verdict = executor.evaluate("while True:\n    pass\n", "python", TEST_CASES, limits)
+
+        assert verdict["status"] == executor.TIME_LIMIT_EXCEEDED
+        assert self.template_pid() != first
+
+    def test_template_is_recycled_after_max_runs(self):
+        """Test that a template serves at most ``max_runs`` runs."""
+        first = self.template_pid()
+
+        executor.evaluate(ECHO_SUM, "python", TEST_CASES)  # 2 runs
+        assert self.template_pid() == first
+        executor.evaluate(ECHO_SUM, "python", TEST_CASES)  # 3rd run recycles
+
+        assert self.template_pid() != first
+
+    def test_dead_template_falls_back_to_cold_run(self):
+        """Test that a run still gets judged when its template died."""
+        interpreters._templates["python"].process.kill()
+
+        verdict = executor.evaluate(ECHO_SUM, "python", TEST_CASES)
+
+        assert verdict["status"] == executor.ACCEPTED
+
+
+@pytest.mark.skipif(not batch.SUPPORTED, reason="batched runs need fork")
+class TestBatchedRuns:
+    """Test running every test case through one sandboxed process."""
+
+    @pytest.mark.parametrize(
+        "code, status",
+        [
+            (ECHO_SUM, executor.ACCEPTED),
+            ("print(3)\n", executor.WRONG_ANSWER),
+            ("raise ValueError('boom')\n", executor.ERROR),
+            ("def f(:\n", executor.ERROR),
+            ("import sys\nsys.exit(2)\n", executor.ERROR),
+        ],
+    )
+    def test_verdicts_match_separate_runs(self, code, status):
+        """Test that batched runs judge programs exactly like one process per test."""
+        batched = executor.evaluate(code, "python", TEST_CASES, batch=True)
+        separate = executor.evaluate(code, "python", TEST_CASES)
+
+        assert batched["status"] == separate["status"] == status
+        assert re.sub(r"judge-\w+", "", batched["error_message"]) == re.sub(
+            r"judge-\w+", "", separate["error_message"]
+        )
+        assert [test["status"] for test in batched["test_results"]] == [
+            test["status"] for test in separate["test_results"]
+        ]
+
+    def test_records_each_test_and_stops_at_first_failure(self):
+        """Test that per-test results are kept and later tests are skipped."""
+        cases = [("1 2\n", "3\n"), ("1 1\n", "3\n"), ("2 2\n", "4\n")]
+
+        verdict = executor.evaluate(ECHO_SUM, "python", cases, batch=True)
+
+        assert verdict["status"] == executor.WRONG_ANSWER
+        assert [test["status"] for test in verdict["test_results"]] == [
+            executor.ACCEPTED,
+            executor.WRONG_ANSWER,
+        ]
+        assert verdict["runtime"] == max(test["runtime"] for test in verdict["test_results"])
+        assert verdict["memory"] == max(test["memory"] for test in verdict["test_results"])
+        assert all(test["memory"] > 0 for test in verdict["test_results"])
+
+    def test_program_state_does_not_leak_between_tests(self):
+        """Test that every test starts with a fresh ``__main__``."""
+        code = "seen = globals().get('seen', 0) + 1\nprint(seen)\n"
+
+        verdict = executor.evaluate(code, "python", [("", "1"), ("", "1")], batch=True)
+
+        assert verdict["status"] == executor.ACCEPTED
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "import builtins\nbuiltins.runs = getattr(builtins, 'runs', 0) + 1\n"
+            "print(builtins.runs)\n",
+            "import sys\nprint(1 + hasattr(sys, 'seen'))\nsys.seen = True\n",
+            "import sys\nprint(1 if sys.getrecursionlimit() != 50 else 2)\n"
+            "sys.setrecursionlimit(50)\n",
+        ],
+    )
+    def test_interpreter_state_does_not_leak_between_tests(self, code):
+        """Test that builtins, modules and interpreter settings start fresh for every test."""
+        verdict = executor.evaluate(code, "python", [("", "1"), ("", "1")], batch=True)
+
+        assert verdict["status"] == executor.ACCEPTED
+
+    def test_threads_finish_within_their_test(self):
+        """Test that output from a program's leftover thread counts, as in a cold run."""
+        code = (
+            "import threading, time\n"
+            "print(1)\n"
+            "threading.Thread(target=lambda: (time.sleep(0.2), print('late'))).start()\n"
+        )
+        cases = [("", "1"), ("", "1")]
+
+        batched = executor.evaluate(code, "python", cases, batch=True)
+        separate = executor.evaluate(code, "python", cases)
+
+        assert batched["status"] == separate["status"] == executor.WRONG_ANSWER
+        assert batched["error_message"] == "Wrong answer on test 1"
+
+    def test_program_cannot_answer_for_the_runner(self):
+        """Test that the control pipes are closed before the program runs."""
+        code = (
+            "import json, os\n"
+            "reply = json.dumps({'exit_code': 0, 'wall_time_ms': 1, 'peak_rss_kb': 1,"
+            " 'timed_out': False}).encode() + b'\\n'\n"
+            "written = 0\n"
+            "for fd in range(3, 1024):\n"
+            "    try:\n"
+            "        written += os.write(fd, reply)\n"
+            "    except OSError:\n"
+            "        pass\n"
+            "print(written)\n"
+        )
+
+        verdict = executor.evaluate(code, "python", [("", "0"), ("", "0")], batch=True)
+
+        assert verdict["status"] == executor.ACCEPTED
+        assert len(verdict["test_results"]) == 2
+
+    def test_time_limit_on_a_later_test(self):
+        """Test that a slow test is stopped at its own time limit."""
+        code = "n = int(input())\nwhile n:\n    pass\nprint(n)\n"
+        limits = RunLimits(time_limit=0.5)
+
+        verdict = executor.evaluate(code, "python", [("0", "0"), ("1", "1")], limits, batch=True)
+
+        assert verdict["status"] == executor.TIME_LIMIT_EXCEEDED
+        assert verdict["error_message"] == "Time limit exceeded on test 2"
+
+    def test_program_that_exits_its_process_is_restarted(self):
+        """Test that ``os._exit`` in one test does not fail the next."""
+        code = "import os\n" + ECHO_SUM + "import sys\nsys.stdout.flush()\nos._exit(0)\n"
+
+        verdict = executor.evaluate(code, "python", TEST_CASES, batch=True)
+
+        assert verdict["status"] == executor.ACCEPTED
+        assert len(verdict["test_results"]) == 2
+
+
+class TestIsolation:
+    """Test what submitted code can reach when isolation is configured."""
+
+    @pytest.fixture(params=["cold", "warm", "batch"])
+    def mode(self, request, open_tmp_path):
+        secret = open_tmp_path / "hidden" / "secret"
+        secret.parent.mkdir(mode=0o755)
+        secret.write_text("expected output")
+        try:
+            sandbox.configure_isolation("nobody", [secret.parent])
+        except SandboxError as exc:
+            pytest.skip(f"isolation is not available here: {exc}")
+        interpreters.configure(3 if request.param == "warm" else 0)
+        yield request.param, secret
+        interpreters.configure(0)
+        sandbox.configure_isolation("")
+
+    @pytest.mark.parametrize(
+        "code, expected",
+        [
+            ("import os\nprint(os.getuid(), os.getgid())", "{uid} {gid}"),
+            (
+                "import os\ntry:\n    open(f'/proc/{os.getppid()}/environ').read()\n"
+                "    print('read')\nexcept PermissionError:\n    print('denied')",
+                "denied",
+            ),
+            (
+                "import socket\ntry:\n    socket.create_connection(('1.1.1.1', 53), timeout=1)\n"
+                "    print('online')\nexcept OSError:\n    print('offline')",
+                "offline",
+            ),
+            ("import os\nprint(os.path.exists({secret!r}))", "False"),
+            (
+                "import os\nopen('scratch.txt', 'w').write('x')\nprint(os.listdir('.'))",
+                "['scratch.txt']",
+            ),
+            (
+                "import os\ntry:\n    os.listdir(os.path.dirname(os.path.dirname(os.getcwd())))\n"
+                "    print('listed')\nexcept PermissionError:\n    print('denied')",
+                "denied",
+            ),
+        ],
+        ids=["user", "worker-environment", "network", "hidden-path", "scratch", "other-runs"],
+    )
+    def test_program_is_confined(self, mode, code, expected, monkeypatch):
+        """Test that code runs as the sandbox user, offline, in an empty scratch directory."""
+        monkeypatch.setenv("SECRET_FOR_TEST", "hunter2")
+        name, secret = mode
+        nobody = pwd.getpwnam("nobody")
+        code = code.replace("{secret!r}", repr(str(secret)))
+        expected = expected.format(uid=nobody.pw_uid, gid=nobody.pw_gid)
+
+        verdict = executor.evaluate(code, "python", [("", expected)], batch=name == "batch")
+
+        assert verdict["status"] == executor.ACCEPTED, verdict["error_message"]
+
+
+@pytest.mark.django_db
+class TestJudgeService:
+    """Test judging stored submissions."""
+
+    def teardown_method(self):
+        shutdown_pool()
+
+    def test_judge_refuses_to_run_unconfined(self, user, problem, settings):
+        """Test that a worker that cannot isolate code fails the submission, not runs it."""
+        settings.JUDGE_SANDBOX_USER = "no-such-user"
+        submission = Submission.objects.create(
+            user=user, problem=problem, code=ECHO_SUM, language="python"
+        )
+
+        JudgeService.judge_submission(submission.id)
+
+        submission.refresh_from_db()
+        assert submission.status == "error"
+        assert submission.error_message == "Internal judge error"
+
+    def test_judge_submission_stores_verdict(self, user, problem, settings):
+        """Test that the verdict is written back to the submission."""
+        settings.JUDGE_SANDBOX_USER = ""  # the test runner need not be root
+        submission = Submission.objects.create(
+            user=user, problem=problem, code=ECHO_SUM, language="python"
+        )
+
+        JudgeService.judge_submission(submission.id)
+
+        submission.refresh_from_db()
+        assert submission.status == "accepted"
+        assert submission.runtime is not None
+        assert submission.memory > 0
+        assert [test["status"] for test in submission.test_results] == ["accepted", "accepted"]
+        cached = VerdictCache.get(
+            problem.id, problem.tests_version, "python", VerdictCache.hash_code(ECHO_SUM)
+        )
+        assert cached["status"] == "accepted"
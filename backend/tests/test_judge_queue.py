@@ -0,0 +1,201 @@
+"""
+Tests for judge queue routing, per-user caps and the queue readout.
+"""
+
+import json
+
+import pytest
+import redis
+
+from apps.problems import tasks
+from apps.problems.models import Submission
+from apps.problems.services import judge_queue
+from apps.problems.services.judge_queue import JudgeQueue
+from apps.problems.services.judge_service import JudgeService
+
+
+class FakeBroker:
+    """Just enough of a Redis client for ``JudgeQueue.get_stats``."""
+
+    def __init__(self, queues):
+        self.queues = queues
+        self.calls = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def llen(self, queue):
+        self.calls.append(len(self.queues.get(queue, [])))
+
+    def lindex(self, queue, index):
+        messages = self.queues.get(queue, [])
+        self.calls.append(messages[index] if messages else None)
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return calls
+
+
+@pytest.mark.django_db
+class TestEnqueue:
+    """Test which queue judge tasks are sent to."""
+
+    @pytest.fixture
+    def sent(self, monkeypatch):
+        sent = []
+        monkeypatch.setattr(
+            tasks.judge_submission,
+            "apply_async",
+            lambda args, kwargs, **options: sent.append((args, kwargs, options)),
+        )
+        return sent
+
+    @pytest.fixture
+    def submission(self, user, problem):
+        return Submission.objects.create(user=user, problem=problem, code="x", language="python")
+
+    def test_interactive_submission_counts_against_its_user(
+        self, submission, sent, django_capture_on_commit_callbacks
+    ):
+        """Test that submits go to the interactive queue with their user."""
+        with django_capture_on_commit_callbacks(execute=True):
+            JudgeService.enqueue(submission)
+
+        [(args, kwargs, options)] = sent
+        assert args == (submission.id,)
+        assert kwargs == {"user_id": submission.user_id}
+        assert options["queue"] == "judge.interactive"
+        assert options["headers"]["enqueued_at"] > 0
+
+    def test_rejudge_goes_to_its_own_queue_uncapped(
+        self, submission, sent, django_capture_on_commit_callbacks
+    ):
+        """Test that low-priority work is not tied to a user's cap."""
+        with django_capture_on_commit_callbacks(execute=True):
+            JudgeService.enqueue(submission, priority="rejudge")
+
+        [(_, kwargs, options)] = sent
+        assert kwargs == {"user_id": None}
+        assert options["queue"] == "judge.rejudge"
+
+
+class TestUserCap:
+    """Test the per-user concurrency cap in the judge task."""
+
+    def test_task_over_the_cap_is_requeued(self, monkeypatch):
+        """Test that a capped task goes back to the queue without judging."""
+        judged = []
+        monkeypatch.setattr(JudgeQueue, "acquire_slot", lambda user_id, submission_id: False)
+        monkeypatch.setattr(JudgeService, "judge_submission", judged.append)
+
+        def retry(**options):
+            raise RuntimeError(f"retry {options['countdown']}")
+
+        monkeypatch.setattr(tasks.judge_submission, "retry", retry)
+
+        with pytest.raises(RuntimeError, match="retry 1"):
+            tasks.judge_submission.run(5, user_id=7)
+        assert judged == []
+
+    def test_requeue_delay_backs_off_with_jitter(self, monkeypatch, settings):
+        """Test that each turn over the cap waits up to twice as long, up to the maximum."""
+        settings.JUDGE_USER_RETRY_DELAY = 1
+        settings.JUDGE_USER_RETRY_MAX_DELAY = 30
+        monkeypatch.setattr(judge_queue.random, "uniform", lambda low, high: (low, high))
+
+        assert JudgeQueue.retry_delay(0) == (1, 1)
+        assert JudgeQueue.retry_delay(3) == (1, 8)
+        assert JudgeQueue.retry_delay(10) == (1, 30)
+
+    def test_task_out_of_retries_is_judged_over_the_cap(self, monkeypatch, settings):
+        """Test that a task is not requeued forever while its user stays at the cap."""
+        settings.JUDGE_USER_MAX_RETRIES = 3
+        judged = []
+        monkeypatch.setattr(JudgeQueue, "acquire_slot", lambda user_id, submission_id: False)
+        monkeypatch.setattr(JudgeQueue, "release_slot", lambda user_id, submission_id: 1 / 0)
+        monkeypatch.setattr(JudgeService, "judge_submission", judged.append)
+
+        tasks.judge_submission.push_request(retries=3)
+        try:
+            tasks.judge_submission.run(5, user_id=7)
+        finally:
+            tasks.judge_submission.pop_request()
+
+        assert judged == [5]
+
+    def test_slot_is_released_after_judging(self, monkeypatch):
+        """Test that the user's slot is freed even when judging fails."""
+        released = []
+        monkeypatch.setattr(JudgeQueue, "acquire_slot", lambda user_id, submission_id: True)
+        monkeypatch.setattr(
+            JudgeQueue, "release_slot", lambda user_id, submission_id: released.append(user_id)
+        )
+
+        def fail(submission_id):
+            raise ValueError("boom")
+
+        monkeypatch.setattr(JudgeService, "judge_submission", fail)
+
+        with pytest.raises(ValueError):
+            tasks.judge_submission.run(5, user_id=7)
+        assert released == [7]
+
+    def test_cap_is_not_enforced_without_redis(self, monkeypatch):
+        """Test that an unreachable Redis does not stop judging."""
+
+        def unreachable():
+            raise redis.ConnectionError("no redis")
+
+        monkeypatch.setattr(judge_queue, "_get_client", unreachable)
+
+        assert JudgeQueue.acquire_slot(7, 5) is True
+
+
+class TestQueueStats:
+    """Test the queue depth and latency readout."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_stats(self, monkeypatch):
+        monkeypatch.setattr(judge_queue, "_stats", {"at": None, "value": None})
+
+    def test_reports_depth_and_oldest_age(self, monkeypatch):
+        """Test that each priority reports its depth and its next task's wait."""
+        message = json.dumps({"headers": {"enqueued_at": 1000.0}})
+        broker = FakeBroker({"judge.interactive": [b"newer", message], "judge.rejudge": [b"{}"]})
+        monkeypatch.setattr(judge_queue, "_get_client", lambda: broker)
+        monkeypatch.setattr(judge_queue.time, "time", lambda: 1012.5)
+
+        stats = JudgeQueue.get_stats()
+
+        assert list(stats) == ["interactive", "contest", "rejudge"]
+        assert stats["interactive"] == {
+            "queue": "judge.interactive",
+            "depth": 2,
+            "oldest_age_s": 12.5,
+        }
+        assert stats["contest"]["depth"] == 0
+        assert stats["contest"]["oldest_age_s"] == 0.0
+        assert stats["rejudge"]["oldest_age_s"] is None
+        assert JudgeQueue.get_gauge("oldest_age_s") == [
+            ({"priority": "interactive"}, 12.5),
+            ({"priority": "contest"}, 0.0),
+        ]
+
+    def test_gauges_share_one_broker_read(self, monkeypatch):
+        """Test that one scrape reads the broker once for both queue gauges."""
+        broker = FakeBroker({"judge.interactive": [b"{}"]})
+        reads = []
+        execute = broker.execute
+        monkeypatch.setattr(broker, "execute", lambda: reads.append(1) or execute())
+        monkeypatch.setattr(judge_queue, "_get_client", lambda: broker)
+
+        JudgeQueue.get_gauge("depth")
+        JudgeQueue.get_gauge("oldest_age_s")
+
+        assert reads == [1]
@@ -0,0 +1,119 @@
+"""
+Tests for structured request logging.
+"""
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+from django.urls import reverse
+
+from core import jsonlog
+from core.jsonlog import QueueJSONHandler, QueueStreamHandler
+
+
+@pytest.fixture
+def records():
+    captured = []
+    handler = logging.Handler()
+    handler.emit = captured.append
+    logger = logging.getLogger("core.middleware")
+    logger.addHandler(handler)
+    yield captured
+    logger.removeHandler(handler)
+
+
+class TestQueueJSONHandler:
+    """Test the queued JSON-lines writer."""
+
+    def test_writes_json_lines_with_extra_fields(self, tmp_path):
+        """Test that records are written as JSON with extras and the request id."""
+        handler = QueueJSONHandler(tmp_path / "app.jsonl")
+        logger = logging.getLogger("tests.jsonlog")
+        logger.addHandler(handler)
+        token = jsonlog.request_id_var.set("req-1")
+        try:
+            logger.warning("judged %s", 7, extra={"duration_ms": 12.5})
+        finally:
+            jsonlog.request_id_var.reset(token)
+            logger.removeHandler(handler)
+        handler.flush()
+
+        line = json.loads((tmp_path / "app.jsonl").read_text())
+        assert line["message"] == "judged 7"
+        assert line["duration_ms"] == 12.5
+        assert line["request_id"] == "req-1"
+        assert line["level"] == "WARNING"
+
+    def test_drops_when_queue_is_full(self, tmp_path, monkeypatch):
+        """Test that a full queue drops and counts records instead of blocking."""
+        handler = QueueJSONHandler(tmp_path / "app.jsonl", max_queue_size=1)
+        monkeypatch.setattr(handler, "_ensure_listener", lambda: None)
+        dropped = jsonlog.get_stats()["dropped"]
+
+        for _ in range(3):
+            handler.handle(logging.makeLogRecord({"msg": "x"}))
+
+        assert jsonlog.get_stats()["dropped"] == dropped + 2
+
+    def test_close_writes_queued_records_and_stops_listener(self, tmp_path, monkeypatch):
+        """Test that closing, as the exit hook does, drains the queue before stopping."""
+        exit_hooks = []
+        monkeypatch.setattr(jsonlog.atexit, "register", exit_hooks.append)
+        handler = QueueJSONHandler(tmp_path / "app.jsonl", batch_size=4)
+        release = threading.Event()
+        write_batch = handler._write_batch
+        monkeypatch.setattr(
+            handler, "_write_batch", lambda *args: release.wait(5) and write_batch(*args)
+        )
+
+        for number in range(10):
+            handler.handle(logging.makeLogRecord({"msg": f"record {number}"}))
+        listener = handler._listener
+        release.set()
+        exit_hooks[0]()
+
+        lines = (tmp_path / "app.jsonl").read_text().splitlines()
+        assert exit_hooks == [handler.close]
+        assert [json.loads(line)["message"] for line in lines] == [
+            f"record {number}" for number in range(10)
+        ]
+        assert not listener.is_alive()
+
+
+class TestQueueStreamHandler:
+    """Test the queued console writer."""
+
+    def test_writes_formatted_records_from_the_listener(self):
+        """Test that records are formatted with the configured formatter off the caller's thread."""
+        stream = io.StringIO()
+        handler = QueueStreamHandler(stream)
+        handler.setFormatter(logging.Formatter("{levelname} {message}", style="{"))
+        writers = []
+        write = stream.write
+        stream.write = lambda text: writers.append(threading.current_thread()) or write(text)
+
+        record = logging.makeLogRecord({"msg": "judged %s", "args": (7,), "levelname": "INFO"})
+        handler.handle(record)
+        handler.close()
+
+        assert stream.getvalue() == "INFO judged 7\n"
+        assert threading.current_thread() not in writers
+
+
+@pytest.mark.django_db
+class TestLoggingMiddleware:
+    """Test the request log record."""
+
+    def test_request_record_is_structured(self, client, records):
+        """Test that the request id is echoed and logged with the query count."""
+        response = client.get(reverse("health-live"), HTTP_X_REQUEST_ID="abc123")
+
+        assert response["X-Request-ID"] == "abc123"
+        (record,) = records
+        assert record.request_id == "abc123"
+        assert record.status == 200
+        assert record.query_count == 0
+        assert record.user_id is None
@@ -0,0 +1,77 @@
+"""
+Tests for the metrics registry and endpoint.
+"""
+
+import pytest
+from django.urls import reverse
+
+from core.metrics import Registry, merge_snapshots
+
+
+class TestRegistry:
+    """Test recording, rendering and aggregation."""
+
+    def test_renders_histogram(self):
+        """Test that histograms render cumulative buckets, sum and count."""
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        latency.observe(0.05, route="a")
+        latency.observe(5, route="a")
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1",route="a"} 1' in text
+        assert 'latency_seconds_bucket{le="1.0",route="a"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf",route="a"} 2' in text
+        assert 'latency_seconds_count{route="a"} 2' in text
+
+    def test_renders_labelled_gauge(self):
+        """Test that a gauge callback may return labelled samples."""
+        registry = Registry()
+        registry.register_gauge(
+            "depth", "Depth.", lambda: [({"queue": "a"}, 3), ({"queue": "b"}, 0)]
+        )
+
+        text = registry.render()
+
+        assert 'depth{queue="a"} 3' in text
+        assert 'depth{queue="b"} 0' in text
+
+    def test_merges_worker_snapshots(self):
+        """Test that counters and histograms are summed across processes."""
+        workers = []
+        for _ in range(2):
+            registry = Registry()
+            registry.counter("queries_total", "Queries.").inc(3, route="a")
+            registry.histogram("latency_seconds", "Latency.", buckets=(1.0,)).observe(0.5)
+            workers.append(registry.snapshot())
+
+        merged = merge_snapshots(workers)
+
+        assert merged["queries_total"]["samples"] == [[[("route", "a")], 6]]
+        assert merged["latency_seconds"]["samples"] == [[[], [[2], 1.0, 2]]]
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Test the scrape endpoint."""
+
+    def test_reports_request_latency(self, client, settings):
+        """Test that served requests show up per route."""
+        settings.METRICS_TOKEN = "scrape"
+        client.get(reverse("health-live"))
+
+        assert client.get("/metrics").status_code == 403
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape")
+
+        assert response.status_code == 200
+        assert 'route="health-live",status="200"' in response.content.decode()
+
+    def test_without_token_only_internal_clients_scrape(self, client, settings):
+        """Test that with no token configured, only allowed networks may scrape."""
+        settings.METRICS_TOKEN = ""
+
+        assert client.get("/metrics").status_code == 200
+        assert client.get("/metrics", REMOTE_ADDR="203.0.113.5").status_code == 403
+        settings.METRICS_ALLOWED_NETWORKS = ["203.0.113.0/24"]
+        assert client.get("/metrics", REMOTE_ADDR="203.0.113.5").status_code == 200
@@ -0,0 +1,39 @@
+"""
+Tests for data migrations.
+"""
+
+import importlib
+
+import pytest
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+
+
+def migration_state(app_label, name):
+    """The historical models as of ``name``, and the migration module."""
+    apps = MigrationLoader(connection).project_state((app_label, name)).apps
+    module = importlib.import_module(f"apps.{app_label}.migrations.{name}")
+    return apps, module
+
+
+@pytest.mark.django_db
+class TestNormalizedTagsMigration:
+    """Test the tag backfill of 0007_normalized_tags."""
+
+    def test_over_long_tags_are_cut_to_the_column(self, user):
+        """Test that existing tags longer than Tag.name are backfilled cut to 50 characters."""
+        apps, migration = migration_state("problems", "0007_normalized_tags")
+        Problem = apps.get_model("problems", "Problem")
+        # Historical models send no signals, so nothing has synced the tags yet.
+        Problem.objects.create(
+            title="Long",
+            slug="long",
+            difficulty="easy",
+            tags=["X" * 60, "math"],
+            created_by_id=user.id,
+        )
+
+        migration.backfill_tags(apps, connection.schema_editor())
+
+        Tag = apps.get_model("problems", "Tag")
+        assert sorted(Tag.objects.values_list("name", flat=True)) == ["math", "x" * 50]
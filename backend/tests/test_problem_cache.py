@@ -0,0 +1,60 @@
+"""
+Tests for the problem detail cache.
+"""
+
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.problems.services.problem_cache import ProblemCache
+
+
+@pytest.mark.django_db
+class TestProblemDetailCache:
+    """Test that the detail view serves and invalidates cached payloads."""
+
+    def test_second_read_skips_database(self, api_client, problem, django_assert_num_queries):
+        """Test that a cached problem is served without queries."""
+        url = reverse("problem-detail", args=[problem.slug])
+        api_client.get(url)
+
+        with django_assert_num_queries(0):
+            response = api_client.get(url)
+
+        assert response.status_code == 200
+        assert response.data["title"] == "Sum"
+
+    def test_save_invalidates(self, api_client, problem, django_capture_on_commit_callbacks):
+        """Test that edits, renames and deletes are visible immediately."""
+        api_client.get(reverse("problem-detail", args=["sum"]))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            problem.title = "Add"
+            problem.slug = "add"
+            problem.save()
+
+        assert api_client.get(reverse("problem-detail", args=["sum"])).status_code == 404
+        assert api_client.get(reverse("problem-detail", args=["add"])).data["title"] == "Add"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            problem.delete()
+
+        assert api_client.get(reverse("problem-detail", args=["add"])).status_code == 404
+
+
+class TestSingleFlight:
+    """Test stampede protection."""
+
+    def test_serves_stale_while_another_process_refreshes(self):
+        """Test that only the lock holder recomputes an expiring entry."""
+        version = ProblemCache.get_version("hot")
+        key = f"problem_detail_hot_v{version}"
+        cache.set(key, {"data": "old", "delta": 0.1, "expires_at": time.time() - 1})
+        cache.add(f"{key}_lock", 1)
+
+        def compute():
+            raise AssertionError("recomputed without the lock")
+
+        assert ProblemCache.get_or_compute("hot", compute) == "old"
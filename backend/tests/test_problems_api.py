@@ -0,0 +1,152 @@
+"""
+Tests for the problems API.
+"""
+
+import pytest
+from django.urls import reverse
+
+from apps.problems.models import Problem, Submission, Tag
+from apps.problems.serializers import ProblemSerializer
+from apps.problems.services.tag_service import MAX_TAG_LENGTH
+
+
+@pytest.mark.django_db
+class TestProblemList:
+    """Test the problem list endpoint."""
+
+    def test_lists_summaries(self, api_client, problem):
+        """Test that list pages only carry summary fields."""
+        response = api_client.get(reverse("problem-list"))
+
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {
+                "id": problem.id,
+                "slug": "sum",
+                "title": "Sum",
+                "difficulty": "easy",
+                "tags": ["math"],
+            }
+        ]
+
+    def test_sparse_fieldset(self, api_client, problem):
+        """Test that ?fields= narrows the representation."""
+        response = api_client.get(reverse("problem-list"), {"fields": "slug,title,solution"})
+
+        assert response.data["results"] == [{"slug": "sum", "title": "Sum"}]
+
+
+@pytest.mark.django_db
+class TestTagFiltering:
+    """Test multi-tag filtering and tag facets."""
+
+    @pytest.fixture
+    def tagged(self, problem, user):
+        Problem.objects.create(slug="paths", title="Paths", tags=["DP", "graph"], created_by=user)
+        Problem.objects.create(slug="knap", title="Knapsack", tags=["dp"], created_by=user)
+
+    def slugs(self, api_client, params):
+        response = api_client.get(reverse("problem-list"), params)
+        return sorted(row["slug"] for row in response.data["results"])
+
+    def test_match_all_and_any(self, api_client, tagged):
+        """Test that tags are ANDed by default and ORed with match=any."""
+        assert self.slugs(api_client, {"tags": "dp,graph"}) == ["paths"]
+        assert self.slugs(api_client, {"tags": "graph,math", "match": "any"}) == ["paths", "sum"]
+
+    def test_facets_follow_edits(self, api_client, tagged):
+        """Test that tag counts track tag edits and deletes."""
+        Problem.objects.get(slug="knap").delete()
+        paths = Problem.objects.get(slug="paths")
+        paths.tags = ["graph", "math"]
+        paths.save()
+
+        response = api_client.get(reverse("problem-tags"))
+
+        assert response.status_code == 200
+        assert response.data == [
+            {"name": "math", "problem_count": 2},
+            {"name": "graph", "problem_count": 1},
+        ]
+
+    def test_over_long_tags_are_cut_to_the_column(self, user):
+        """Test that saving a problem with a tag longer than the tag name column still works."""
+        Problem.objects.create(slug="long", title="Long", tags=["x" * 80], created_by=user)
+
+        assert Tag.objects.get(name="x" * MAX_TAG_LENGTH).problem_count == 1
+
+    def test_serializer_rejects_over_long_tags(self, problem):
+        """Test that the problem serializer reports over-long tags instead of cutting them."""
+        serializer = ProblemSerializer(problem, data={"tags": ["x" * 80]}, partial=True)
+
+        assert not serializer.is_valid()
+        assert "tags" in serializer.errors
+
+
+@pytest.mark.django_db
+class TestProblemSearch:
+    """Test the problem search endpoint."""
+
+    def test_title_matches_rank_first(self, api_client, problem, user):
+        """Test that title hits outrank description-only hits."""
+        Problem.objects.create(
+            slug="pairs", title="Pairs", description="Find the sum of pairs.", created_by=user
+        )
+
+        response = api_client.get(reverse("problem-search"), {"q": "sum"})
+
+        assert response.status_code == 200
+        assert [row["slug"] for row in response.data["results"]] == ["sum", "pairs"]
+
+    def test_blank_query(self, api_client, problem):
+        """Test that a blank query matches nothing."""
+        response = api_client.get(reverse("problem-search"), {"q": " "})
+
+        assert response.data == {"results": []}
+
+
+@pytest.mark.django_db
+class TestProblemDetail:
+    """Test the problem detail endpoint."""
+
+    def test_sparse_fieldset(self, api_client, problem):
+        """Test that the detail view honours ?fields= too."""
+        response = api_client.get(
+            reverse("problem-detail", args=[problem.slug]), {"fields": "title,hints"}
+        )
+
+        assert response.status_code == 200
+        assert response.data == {"title": "Sum", "hints": []}
+
+
+@pytest.mark.django_db
+class TestSubmissionHistory:
+    """Test keyset pagination of the submission history."""
+
+    def test_pages_through_ties_without_gaps(self, api_client, user, problem):
+        """Test that rows sharing a timestamp are split across pages exactly once."""
+        submissions = [
+            Submission.objects.create(user=user, problem=problem, code=f"print({n})")
+            for n in range(5)
+        ]
+        Submission.objects.filter(id__in=[s.id for s in submissions[1:4]]).update(
+            submitted_at=submissions[0].submitted_at
+        )
+
+        seen = []
+        url = reverse("user-submissions")
+        params = {"page_size": 2}
+        while url:
+            response = api_client.get(url, params)
+            assert response.status_code == 200
+            seen.extend(row["id"] for row in response.data["results"])
+            url, params = response.data["next"], None
+
+        assert sorted(seen) == sorted(s.id for s in submissions)
+        assert len(seen) == len(set(seen))
+
+    def test_invalid_cursor(self, api_client):
+        """Test that a tampered cursor is rejected."""
+        response = api_client.get(reverse("user-submissions"), {"cursor": "not-a-cursor"})
+
+        assert response.status_code == 404
@@ -0,0 +1,70 @@
+"""
+Tests for request profiling and slow request capture.
+"""
+
+import pytest
+import redis
+from django.urls import reverse
+
+from core.profiling import SlowLog
+
+
+@pytest.fixture(autouse=True)
+def empty_slow_log():
+    SlowLog.clear()
+    yield
+    SlowLog.clear()
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    """Test opt-in profiling and the staff endpoint."""
+
+    def test_header_profiles_request(self, api_client, problem, settings):
+        """Test that a request sent with the profiling token records SQL and cache calls."""
+        settings.PROFILING_HEADER_TOKEN = "let-me-see"
+
+        api_client.get(reverse("problem-detail", args=["sum"]), HTTP_X_PROFILE="let-me-see")
+
+        (entry,) = SlowLog.entries("requests")
+        assert entry["profiled"] and entry["path"] == "/api/v1/problems/sum/"
+        assert any("problems" in query["sql"] for query in entry["queries"])
+        assert any(call["method"] == "get" for call in entry["cache_calls"])
+
+    def test_wrong_token_is_ignored(self, api_client, problem, settings):
+        """Test that the header needs the configured token."""
+        settings.PROFILING_HEADER_TOKEN = "let-me-see"
+
+        api_client.get(reverse("problem-detail", args=["sum"]), HTTP_X_PROFILE="guess")
+
+        assert SlowLog.entries("requests") == []
+
+    def test_slow_queries_are_captured(self, api_client, problem, settings):
+        """Test that statements over the threshold land in the slow query log."""
+        settings.SLOW_QUERY_MS = 0
+
+        api_client.get(reverse("problem-list"))
+
+        assert SlowLog.entries("queries")
+
+    def test_log_is_staff_only(self, api_client, user):
+        """Test that only staff can read captured requests."""
+        assert api_client.get(reverse("profiling-log")).status_code == 403
+
+        user.is_staff = True
+        user.save()
+        response = api_client.get(reverse("profiling-log"))
+
+        assert response.status_code == 200
+        assert set(response.data) == {"requests", "queries"}
+
+    def test_log_survives_redis_outage(self, monkeypatch):
+        """Test that reading the slow log while Redis is down returns nothing instead of failing."""
+
+        class DownRedis:
+            def lrange(self, *args):
+                raise redis.ConnectionError("down")
+
+        monkeypatch.setattr(SlowLog, "_redis", staticmethod(DownRedis))
+
+        assert SlowLog.entries("requests") == []
@@ -0,0 +1,64 @@
+"""
+Tests for per-view query budgets.
+"""
+
+import asyncio
+
+import pytest
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from apps.problems.models import Submission
+from apps.problems.views import ProblemListView
+from core.query_budget import QueryBudgetExceeded, get_query_budget
+
+UNBUDGETED_PREFIXES = ("admin/", "api/schema/", "api/docs/")
+
+
+def _iter_views(patterns, prefix=""):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _iter_views(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern.callback
+
+
+class TestBudgetDeclarations:
+    """Test that endpoints declare their budgets."""
+
+    def test_every_api_view_declares_a_budget(self):
+        """Test that no synchronous API view is left without a query budget."""
+        missing = [
+            route
+            for route, view in _iter_views(get_resolver().url_patterns)
+            if not route.startswith(UNBUDGETED_PREFIXES)
+            and not asyncio.iscoroutinefunction(view)
+            and get_query_budget(view) is None
+        ]
+
+        assert missing == []
+
+
+@pytest.mark.django_db
+class TestBudgetEnforcement:
+    """Test that budgets are enforced per request."""
+
+    def test_over_budget_request_fails(self, api_client, problem, monkeypatch):
+        """Test that exceeding the declared budget raises in strict mode."""
+        monkeypatch.setattr(ProblemListView, "query_budget", 0)
+
+        with pytest.raises(QueryBudgetExceeded):
+            api_client.get(reverse("problem-list"))
+
+    def test_submission_history_does_not_grow_with_rows(self, api_client, user, problem):
+        """Test that listing many submissions stays within one query."""
+        Submission.objects.bulk_create(
+            Submission(user=user, problem=problem, code="print(1)", language="python")
+            for _ in range(10)
+        )
+
+        response = api_client.get(reverse("user-submissions"))
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["problem_title"] == "Sum"
+        assert response.data["results"][0]["username"] == "student"
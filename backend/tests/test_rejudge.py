@@ -0,0 +1,142 @@
+"""
+Tests for bulk rejudging.
+"""
+
+import contextlib
+
+import pytest
+from django.core.management import call_command
+
+from apps.problems import tasks
+from apps.problems.models import Submission
+from apps.problems.services.judge_service import JudgeService
+from apps.problems.services.rejudge_service import RejudgeService
+from apps.problems.services.verdict_cache import VerdictCache
+
+ACCEPTED = {
+    "status": "accepted",
+    "runtime": 5,
+    "memory": 9000,
+    "error_message": "",
+    "test_results": [{"test": 1, "status": "accepted", "runtime": 5, "memory": 9000}],
+}
+
+
+@pytest.fixture
+def submissions(user, problem):
+    """Five stale submissions of three distinct programs, one in flight."""
+
+    def submit(code, **fields):
+        fields = {"code_hash": VerdictCache.hash_code(code), "status": "wrong_answer", **fields}
+        return Submission.objects.create(
+            user=user, problem=problem, code=code, language="python", **fields
+        )
+
+    return [
+        submit("print(3)"),
+        submit("print(3)  \n"),  # same program once normalized
+        submit("print(3)", code_hash=""),  # saved before hashes were recorded
+        submit("print(4)"),
+        submit("print(5)"),
+        submit("print(6)", status="pending"),
+    ]
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Capture rejudge batches instead of sending them to the broker."""
+    sent = []
+    app = tasks.rejudge_programs.app
+    monkeypatch.setattr(app, "producer_or_acquire", lambda: contextlib.nullcontext())
+    monkeypatch.setattr(
+        tasks.rejudge_programs,
+        "apply_async",
+        lambda args, **options: sent.append((args, options["queue"])),
+    )
+    return sent
+
+
+@pytest.fixture
+def judged(monkeypatch):
+    calls = []
+
+    def evaluate(problem, code, language, code_hash=""):
+        calls.append(code)
+        return ACCEPTED
+
+    monkeypatch.setattr(JudgeService, "evaluate", evaluate)
+    return calls
+
+
+@pytest.mark.django_db
+class TestRejudge:
+    """Test queueing, judging and writing back a rejudge."""
+
+    def test_start_queues_each_distinct_program_once(self, problem, submissions, queued):
+        """Test that copies of a program collapse into one and in-flight work is skipped."""
+        result = RejudgeService.start(problem)
+
+        assert result == {"programs": 3, "tasks": 1}
+        [((problem_id, tests_version, programs), queue)] = queued
+        assert (problem_id, tests_version, queue) == (problem.id, 1, "judge.rejudge")
+        assert sorted(code_hash for _, _, code_hash in programs) == sorted(
+            {VerdictCache.hash_code(code) for code in ("print(3)", "print(4)", "print(5)")}
+        )
+        submissions[2].refresh_from_db()
+        assert submissions[2].code_hash == VerdictCache.hash_code("print(3)")
+
+    def test_batch_judges_once_and_updates_every_copy(
+        self, problem, submissions, queued, judged, django_assert_max_num_queries
+    ):
+        """Test that one run per program updates all of its stale submissions."""
+        RejudgeService.start(problem)
+        [((problem_id, tests_version, programs), _)] = queued
+
+        with django_assert_max_num_queries(6):
+            updated = RejudgeService.rejudge_programs(problem_id, tests_version, programs)
+
+        assert updated == 5
+        assert sorted(judged) == ["print(3)", "print(4)", "print(5)"]
+        rejudged = Submission.objects.exclude(status="pending")
+        assert {(row.status, row.tests_version) for row in rejudged} == {("accepted", 1)}
+        assert rejudged.first().test_results == ACCEPTED["test_results"]
+        assert RejudgeService.get_progress(problem) == {"tests_version": 1, "total": 5, "stale": 0}
+
+    def test_rerun_resumes_with_what_is_still_stale(self, problem, submissions, queued, judged):
+        """Test that a second start only queues the programs not rejudged yet."""
+        RejudgeService.start(problem)
+        [((problem_id, tests_version, programs), _)] = queued
+        RejudgeService.rejudge_programs(problem_id, tests_version, programs[:1])
+        queued.clear()
+
+        RejudgeService.start(problem)
+
+        [((_, _, remaining), _)] = queued
+        assert remaining == programs[1:]
+
+    def test_cached_verdicts_are_not_judged_again(self, problem, submissions, queued, judged):
+        """Test that programs judged against the new tests reuse that verdict."""
+        for code in ("print(3)", "print(4)", "print(5)"):
+            VerdictCache.set(problem.id, 1, "python", VerdictCache.hash_code(code), ACCEPTED)
+        RejudgeService.start(problem)
+        [((problem_id, tests_version, programs), _)] = queued
+
+        assert RejudgeService.rejudge_programs(problem_id, tests_version, programs) == 5
+        assert judged == []
+
+    def test_batch_for_outdated_tests_is_dropped(self, problem, submissions, queued, judged):
+        """Test that tasks queued before another test change do nothing."""
+        RejudgeService.start(problem)
+        [((problem_id, tests_version, programs), _)] = queued
+        RejudgeService.bump_tests_version(problem)
+
+        assert RejudgeService.rejudge_programs(problem_id, tests_version, programs) == 0
+        assert judged == []
+
+    def test_command_reports_progress(self, problem, submissions, queued, capsys):
+        """Test the management command's queueing and progress output."""
+        call_command("rejudge", problem.slug, "--all")
+
+        output = capsys.readouterr().out
+        assert "queued 3 programs in 1 tasks" in output
+        assert "0/5 submissions judged against tests v2, 5 stale" in output
@@ -0,0 +1,113 @@
+"""
+Tests for JSON rendering, parsing and response compression.
+"""
+
+import datetime
+import decimal
+import gzip
+import io
+import json
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core import middleware, parsers, renderers
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+PAYLOAD = {
+    "title": "Two Sum   café",
+    "price": decimal.Decimal("1.50"),
+    "when": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+    "label": gettext_lazy("Easy"),
+    "nested": [{"id": 1, "tags": ["array"]}],
+    1: "non-string key",
+}
+
+
+class TestORJSONRenderer:
+    """Test that the orjson renderer matches DRF's output."""
+
+    def test_matches_stdlib_renderer(self):
+        """Test that both renderers produce the same JSON document."""
+        fast = ORJSONRenderer().render(PAYLOAD)
+        stdlib = JSONRenderer().render(PAYLOAD)
+
+        assert json.loads(fast) == json.loads(stdlib)
+        assert b"\\u2028" in fast
+
+    def test_falls_back_without_orjson(self, monkeypatch):
+        """Test that the stdlib renderer is used when orjson is missing."""
+        monkeypatch.setattr(renderers, "orjson", None)
+
+        assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+class TestORJSONParser:
+    """Test request body parsing."""
+
+    def test_parses_json(self):
+        """Test that a UTF-8 body is parsed."""
+        body = io.BytesIO('{"code": "print(\'é\')", "problem_id": 3}'.encode())
+
+        assert ORJSONParser().parse(body) == {"code": "print('é')", "problem_id": 3}
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_invalid_json_is_a_parse_error(self, monkeypatch, use_orjson):
+        """Test that malformed bodies raise ParseError with or without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(parsers, "orjson", None)
+
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"code": '), parser_context={})
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    """Test compression of large API responses."""
+
+    @pytest.fixture
+    def many_problems(self, user):
+        from apps.problems.models import Problem
+
+        for index in range(20):
+            Problem.objects.create(
+                title=f"Problem {index}",
+                slug=f"problem-{index}",
+                description="",
+                difficulty="easy",
+                tags=["array", "hash-table"],
+                constraints="",
+                starter_code="",
+                created_by=user,
+            )
+
+    def test_gzips_large_responses(self, api_client, many_problems, monkeypatch):
+        """Test that gzip is used when the client accepts it."""
+        monkeypatch.setattr(middleware, "brotli", None)
+
+        response = api_client.get(reverse("problem-list"), HTTP_ACCEPT_ENCODING="gzip, br")
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert len(json.loads(gzip.decompress(response.content))["results"]) == 20
+
+    def test_prefers_brotli(self, api_client, many_problems):
+        """Test that brotli wins when both sides support it."""
+        brotli = pytest.importorskip("brotli")
+
+        response = api_client.get(reverse("problem-list"), HTTP_ACCEPT_ENCODING="gzip, br")
+
+        assert response["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(response.content))["results"]
+
+    def test_leaves_small_or_refused_responses(self, api_client, many_problems, problem):
+        """Test that small responses and q=0 encodings are sent as is."""
+        small = api_client.get(reverse("problem-detail", args=["sum"]), HTTP_ACCEPT_ENCODING="gzip")
+        refused = api_client.get(reverse("problem-list"), HTTP_ACCEPT_ENCODING="gzip;q=0, br;q=0")
+
+        assert not small.has_header("Content-Encoding")
+        assert not refused.has_header("Content-Encoding")
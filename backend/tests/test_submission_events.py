@@ -0,0 +1,130 @@
+"""
+Tests for the submission event stream.
+"""
+
+import contextlib
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.problems.models import Submission
+from apps.problems.services import submission_events
+from apps.problems.services.submission_events import SubmissionEvents
+
+
+async def _read_stream(response):
+    return b"".join([part async for part in response.streaming_content]).decode()
+
+
+def _events(body):
+    return [
+        json.loads(line.removeprefix("data: "))
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+class FakeChannels:
+    """In-memory stand-in for Redis pub/sub: publishers and subscribers share channels."""
+
+    def __init__(self):
+        self.channels = {}
+
+    def publish(self, channel, message):
+        self.channels.setdefault(channel, []).append(message)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, submission_id):
+        yield FakePubSub(self.channels.setdefault(SubmissionEvents.channel(submission_id), []))
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        return {"data": self.messages.pop(0)} if self.messages else None
+
+
+@pytest.mark.django_db
+class TestSubmissionEvents:
+    """Test streaming submission status over server-sent events."""
+
+    @pytest.fixture
+    def submission(self, user, problem):
+        return Submission.objects.create(
+            user=user, problem=problem, code="print(3)", language="python"
+        )
+
+    def open_stream(self, api_client, submission):
+        ticket_url = reverse("submission-events-ticket", args=[submission.id])
+        ticket = api_client.post(ticket_url).json()["ticket"]
+        url = reverse("submission-events", args=[submission.id])
+        return APIClient().get(url, {"ticket": ticket})
+
+    def test_final_submission_sends_one_event_and_closes(self, api_client, submission):
+        """Test that a judged submission is reported without subscribing."""
+        Submission.objects.filter(id=submission.id).update(status="accepted")
+
+        response = self.open_stream(api_client, submission)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        body = async_to_sync(_read_stream)(response)
+        assert body.startswith("event: status\n")
+        [event] = _events(body)
+        assert event["id"] == submission.id
+        assert event["status"] == "accepted"
+
+    def test_streams_published_transitions_until_final(self, api_client, submission, monkeypatch):
+        """Test that judge events published for a pending submission are streamed in order."""
+        channels = FakeChannels()
+        monkeypatch.setattr(submission_events, "_get_publisher", lambda: channels)
+        monkeypatch.setattr(SubmissionEvents, "subscribe", channels.subscribe)
+        response = self.open_stream(api_client, submission)
+
+        SubmissionEvents.publish(submission.id, {"status": "running"})
+        SubmissionEvents.publish(submission.id, {"status": "accepted", "runtime": 5})
+        SubmissionEvents.publish(submission.id, {"status": "error"})  # after the stream closed
+
+        events = _events(async_to_sync(_read_stream)(response))
+        assert [event["status"] for event in events] == ["pending", "running", "accepted"]
+        assert events[-1]["runtime"] == 5
+
+    def test_ticket_opens_one_stream_of_one_submission(self, api_client, user, problem):
+        """Test that tickets are single use and bound to their submission."""
+        first, second = (
+            Submission.objects.create(
+                user=user, problem=problem, code="x", language="python", status="accepted"
+            )
+            for _ in range(2)
+        )
+        ticket_url = reverse("submission-events-ticket", args=[first.id])
+        first_url = reverse("submission-events", args=[first.id])
+        ticket = api_client.post(ticket_url).json()["ticket"]
+
+        opened = APIClient().get(first_url, {"ticket": ticket})
+        reused = APIClient().get(first_url, {"ticket": ticket})
+        ticket = api_client.post(ticket_url).json()["ticket"]
+        other = APIClient().get(reverse("submission-events", args=[second.id]), {"ticket": ticket})
+
+        assert opened.status_code == 200
+        assert reused.status_code == other.status_code == 401
+
+    def test_requires_authentication(self, submission):
+        """Test that anonymous requests are rejected."""
+        response = APIClient().get(reverse("submission-events", args=[submission.id]))
+
+        assert response.status_code == 401
+
+    def test_tickets_only_for_own_submissions(self, api_client, submission, django_user_model):
+        """Test that a user cannot get a ticket for someone else's submission."""
+        other = django_user_model.objects.create_user(username="other", password="password123")
+        api_client.force_authenticate(other)
+
+        response = api_client.post(reverse("submission-events-ticket", args=[submission.id]))
+
+        assert response.status_code == 404
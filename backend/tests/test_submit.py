@@ -0,0 +1,184 @@
+"""
+Tests for the submit endpoints: idempotency keys and batch submits.
+"""
+
+import contextlib
+
+import pytest
+from django.urls import reverse
+
+from apps.problems import tasks
+from apps.problems.models import Problem, Submission
+from apps.problems.services.verdict_cache import VerdictCache
+from core import idempotency
+
+ACCEPTED = {"status": "accepted", "runtime": 5, "memory": 9000, "error_message": ""}
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Capture judge and fan-out tasks instead of sending them to the broker."""
+    sent = []
+    for task in (tasks.judge_submission, tasks.enqueue_submissions):
+        monkeypatch.setattr(
+            task,
+            "apply_async",
+            lambda args, kwargs=None, task=task, **options: sent.append((task.name, args)),
+        )
+    return sent
+
+
+@pytest.mark.django_db
+class TestIdempotencyKey:
+    """Test that retried submits are answered with the original submission."""
+
+    def submit(self, api_client, problem, key, code="print(3)"):
+        return api_client.post(
+            reverse("submit-solution"),
+            {"problem_id": problem.id, "code": code, "language": "python"},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_is_replayed(self, api_client, problem, sent, django_capture_on_commit_callbacks):
+        """Test that a retry with the same key creates and queues nothing."""
+        with django_capture_on_commit_callbacks(execute=True):
+            first = self.submit(api_client, problem, "key-1")
+            retry = self.submit(api_client, problem, "key-1")
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.json()["id"] == first.json()["id"]
+        assert retry["Idempotent-Replayed"] == "true"
+        assert Submission.objects.count() == 1
+        assert len(sent) == 1
+
+    def test_new_key_submits_again(self, api_client, problem, sent):
+        """Test that keys are per request, not per body."""
+        self.submit(api_client, problem, "key-1")
+        response = self.submit(api_client, problem, "key-2")
+
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response
+        assert Submission.objects.count() == 2
+
+    def test_key_reused_for_another_body(self, api_client, problem, sent):
+        """Test that a key cannot be replayed for a different submission."""
+        self.submit(api_client, problem, "key-1")
+        response = self.submit(api_client, problem, "key-1", code="print(4)")
+
+        assert response.status_code == 422
+        assert Submission.objects.count() == 1
+
+    def test_claim_lost_between_add_and_get(self, api_client, problem, sent, monkeypatch):
+        """Test that a retry whose key vanished after a failed claim does not run the view."""
+
+        class RacingCache:
+            """The first attempt held the key on ``add`` and released it before ``get``."""
+
+            def add(self, key, value, timeout):
+                return False
+
+            def get(self, key, default=None):
+                return default
+
+        monkeypatch.setattr(idempotency, "cache", RacingCache())
+
+        response = self.submit(api_client, problem, "key-1")
+
+        assert response.status_code == 409
+        assert Submission.objects.count() == 0
+
+    def test_keys_are_scoped_to_the_user(self, api_client, problem, sent, django_user_model):
+        """Test that another user's request with the same key is not replayed."""
+        self.submit(api_client, problem, "key-1")
+        other = django_user_model.objects.create_user(username="other", password="password123")
+        api_client.force_authenticate(other)
+
+        response = self.submit(api_client, problem, "key-1")
+
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response
+        assert Submission.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestBatchSubmit:
+    """Test the batch submit endpoint."""
+
+    @pytest.fixture
+    def problems(self, problem, user):
+        second = Problem.objects.create(
+            title="Product",
+            slug="product",
+            description="Multiply two numbers.",
+            difficulty="easy",
+            examples=[],
+            constraints="",
+            starter_code="",
+            created_by=user,
+        )
+        return [problem, second]
+
+    def submit(self, api_client, entries, **extra):
+        return api_client.post(
+            reverse("submit-batch"), {"submissions": entries}, format="json", **extra
+        )
+
+    def test_creates_all_and_queues_one_message(
+        self,
+        api_client,
+        problems,
+        sent,
+        django_assert_max_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        """Test that a batch is inserted in bulk and fanned out from a single task."""
+        VerdictCache.set(problems[0].id, 1, "python", VerdictCache.hash_code("cached"), ACCEPTED)
+        entries = [
+            {"problem_id": problem.id, "code": code, "language": "python"}
+            for problem in problems
+            for code in ("cached", "print(1)", "print(2)")
+        ]
+
+        with django_assert_max_num_queries(3), django_capture_on_commit_callbacks(execute=True):
+            response = self.submit(api_client, entries)
+
+        assert response.status_code == 201
+        results = response.json()["results"]
+        assert [row["problem_title"] for row in results] == ["Sum"] * 3 + ["Product"] * 3
+        assert [row["status"] for row in results] == ["accepted"] + ["pending"] * 5
+        assert Submission.objects.count() == 6
+        [(name, (submission_ids, priority, _))] = sent
+        assert name == tasks.enqueue_submissions.name
+        assert priority == "contest"
+        assert submission_ids == [row["id"] for row in results[1:]]
+
+    def test_unknown_problems_create_nothing(self, api_client, problems, sent):
+        """Test that the missing problem ids are reported and the batch is rejected."""
+        entries = [
+            {"problem_id": problems[0].id, "code": "print(1)"},
+            {"problem_id": 9999, "code": "print(1)"},
+        ]
+
+        response = self.submit(api_client, entries)
+
+        assert response.status_code == 404
+        assert response.json()["problem_ids"] == [9999]
+        assert Submission.objects.count() == 0
+        assert sent == []
+
+    def test_batch_size_is_capped(self, api_client, problem, settings):
+        """Test that oversized batches are rejected."""
+        settings.SUBMIT_BATCH_MAX_SIZE = 1
+        entries = [{"problem_id": problem.id, "code": "print(1)"}] * 2
+
+        assert self.submit(api_client, entries).status_code == 400
+
+    def test_fan_out_sends_one_judge_task_per_submission(self, monkeypatch, sent):
+        """Test that the fan-out task publishes uncapped judge tasks on its queue."""
+        app = tasks.judge_submission.app
+        monkeypatch.setattr(app, "producer_or_acquire", lambda: contextlib.nullcontext())
+
+        tasks.enqueue_submissions.run([3, 4], "contest", 1000.0)
+
+        assert sent == [(tasks.judge_submission.name, (3,)), (tasks.judge_submission.name, (4,))]
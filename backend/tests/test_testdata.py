@@ -0,0 +1,149 @@
+"""
+Tests for packed test data storage.
+"""
+
+import os
+
+import pytest
+from django.core.management import call_command
+
+from apps.problems.judge import executor, sandbox
+from apps.problems.judge.sandbox import SandboxError
+from apps.problems.judge.testdata import CasePack, PackFormatError, write_pack
+from apps.problems.models import Submission
+from apps.problems.services.testdata_service import ProblemTestDataService
+
+
+class TestCasePackFormat:
+    """Test writing and memory-mapping packs."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that packed cases read back byte for byte."""
+        big_input = tmp_path / "big.in"
+        big_input.write_bytes(b"7 " * 500_000)
+        pack_path = tmp_path / "cases.pack"
+
+        count = write_pack(pack_path, [(b"1 2\n", b"3\n"), (big_input, b"ok")])
+
+        with CasePack(pack_path) as pack:
+            assert count == len(pack) == 2
+            assert bytes(pack[0][0]) == b"1 2\n"
+            assert bytes(pack[1][0]) == big_input.read_bytes()
+            assert bytes(pack[1][1]) == b"ok"
+
+    def test_rejects_foreign_files(self, tmp_path):
+        """Test that files without the pack header are refused."""
+        path = tmp_path / "not-a-pack"
+        path.write_bytes(b"{}" * 16)
+
+        with pytest.raises(PackFormatError):
+            CasePack(path)
+
+    def test_judge_reads_pack(self, tmp_path):
+        """Test that the executor accepts a pack path as its test source."""
+        pack_path = tmp_path / "cases.pack"
+        write_pack(pack_path, [(b"2 3\n", b"5\n"), (b"4 4\n", b"8\n")])
+
+        verdict = executor.evaluate(
+            "a, b = map(int, input().split())\nprint(a + b)\n", "python", str(pack_path)
+        )
+
+        assert verdict["status"] == executor.ACCEPTED
+
+
+@pytest.mark.django_db
+class TestImportTestcasesCommand:
+    """Test the import_testcases management command."""
+
+    def test_imports_directory_per_slug(self, tmp_path, settings, problem):
+        """Test that each slug directory becomes a new pack version."""
+        settings.JUDGE_TESTDATA_ROOT = tmp_path / "store"
+        case_directory = tmp_path / "import" / "sum"
+        case_directory.mkdir(parents=True)
+        for number in (1, 2, 10):
+            (case_directory / f"{number}.in").write_text(f"{number} {number}\n")
+            (case_directory / f"{number}.out").write_text(f"{number * 2}\n")
+
+        call_command("import_testcases", str(tmp_path / "import"))
+        call_command("import_testcases", str(case_directory), problem="sum")
+
+        test_data = problem.test_data
+        test_data.refresh_from_db()
+        assert test_data.case_count == 3
+        assert test_data.version == 2
+        problem.refresh_from_db()
+        assert problem.tests_version == 3
+        with CasePack(test_data.absolute_path) as pack:
+            assert [bytes(case[0]) for case in pack] == [b"1 1\n", b"2 2\n", b"10 10\n"]
+
+
+@pytest.mark.django_db
+class TestPackRetention:
+    """Test that superseded packs outlive the judges still reading them."""
+
+    def import_cases(self, tmp_path, problem, answer):
+        directory = tmp_path / f"import-{answer}"
+        directory.mkdir()
+        (directory / "1.in").write_text("1 2\n")
+        (directory / "1.out").write_text(f"{answer}\n")
+        return ProblemTestDataService.import_directory(problem, directory)
+
+    def test_old_pack_is_kept_while_a_judge_uses_it(
+        self, tmp_path, settings, user, problem, django_capture_on_commit_callbacks
+    ):
+        """Test that an import during judging leaves the old pack readable until pruned."""
+        settings.JUDGE_TESTDATA_ROOT = tmp_path / "store"
+        old_path = self.import_cases(tmp_path, problem, 3).absolute_path
+        running = Submission.objects.create(
+            user=user, problem=problem, code="x", language="python", status="running"
+        )
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            new_path = self.import_cases(tmp_path, problem, 4).absolute_path
+
+        assert len(callbacks) == 1  # the delayed prune
+        verdict = executor.evaluate("print(3)\n", "python", old_path)
+        assert verdict["status"] == executor.ACCEPTED
+        assert ProblemTestDataService.prune_packs(problem.id) is False
+        assert os.path.exists(old_path)
+
+        Submission.objects.filter(id=running.id).update(status="accepted")
+
+        assert ProblemTestDataService.prune_packs(problem.id) is True
+        assert not os.path.exists(old_path)
+        assert os.path.exists(new_path)
+
+
+@pytest.mark.django_db
+class TestPackAccess:
+    """Test that submitted code cannot read the expected outputs."""
+
+    OPEN_PACK = (
+        "try:\n    open({path!r}, 'rb').read()\n    print('read')\n"
+        "except OSError:\n    print('denied')\n"
+    )
+
+    @pytest.mark.parametrize("hidden", [False, True], ids=["permissions", "hidden"])
+    def test_submission_cannot_open_the_pack(
+        self, tmp_path, open_tmp_path, settings, problem, hidden
+    ):
+        """Test that the pack is unreadable to the sandbox user, even where it is visible."""
+        settings.JUDGE_TESTDATA_ROOT = open_tmp_path / "store"
+        directory = tmp_path / "import"
+        directory.mkdir()
+        (directory / "1.in").write_text("")
+        (directory / "1.out").write_text("denied\n")
+        pack_path = ProblemTestDataService.import_directory(problem, directory).absolute_path
+        assert os.stat(pack_path).st_mode & 0o777 == 0o600
+        try:
+            sandbox.configure_isolation("nobody", [open_tmp_path / "store"] if hidden else ())
+        except SandboxError as exc:
+            pytest.skip(f"isolation is not available here: {exc}")
+
+        try:
+            code = self.OPEN_PACK.format(path=str(pack_path))
+            verdict = executor.evaluate(code, "python", pack_path)
+        finally:
+            sandbox.configure_isolation("")
+
+        assert verdict["status"] == executor.ACCEPTED, verdict["error_message"]
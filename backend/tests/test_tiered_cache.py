@@ -0,0 +1,72 @@
+"""
+Tests for the two-tier cache.
+"""
+
+import json
+
+from django.core.cache import cache
+
+from core.cache import LocalLRU, TwoTierCache
+
+
+class TestLocalLRU:
+    """Test the in-process tier."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry goes first when full."""
+        lru = LocalLRU(max_entries=2)
+        lru.set("a", 1, 60)
+        lru.set("b", 2, 60)
+        lru.get("a")
+        lru.set("c", 3, 60)
+
+        assert lru.get("a") == 1
+        assert lru.get("c") == 3
+        assert len(lru) == 2
+
+
+class TestTwoTierCache:
+    """Test read-through and invalidation."""
+
+    def test_reads_stay_in_process(self, settings):
+        """Test that repeated reads are served locally and counted."""
+        settings.CACHE_INVALIDATION_REDIS_URL = ""
+        tiers = TwoTierCache()
+        cache.set("profile", {"id": 1})
+
+        assert tiers.get("profile") == {"id": 1}
+        cache.delete("profile")
+        assert tiers.get("profile") == {"id": 1}
+        assert tiers.get("absent") is None
+        assert tiers.get_stats() == {
+            "local_hits": 1,
+            "remote_hits": 1,
+            "misses": 1,
+            "invalidations": 0,
+            "local_entries": 1,
+        }
+
+    def test_peer_invalidation_evicts(self, settings):
+        """Test that invalidations broadcast by other workers drop local copies."""
+        settings.CACHE_INVALIDATION_REDIS_URL = ""
+        tiers = TwoTierCache()
+        tiers.set("profile", "old")
+        cache.set("profile", "new")
+
+        tiers._handle_message({"data": json.dumps({"origin": "peer", "keys": ["profile"]})})
+
+        assert tiers.get("profile") == "new"
+
+    def test_only_invalidations_are_broadcast(self, settings, monkeypatch):
+        """Test that fills stay off the wire while deletes and replacements are published."""
+        settings.CACHE_INVALIDATION_REDIS_URL = ""
+        tiers = TwoTierCache()
+        broadcasts = []
+        monkeypatch.setattr(tiers, "_broadcast", lambda keys: broadcasts.append(list(keys)))
+
+        tiers.set("problem_detail_sum_v1", {"id": 1})
+        tiers.set("profile", {"bio": "new"}, replace=True)
+        tiers.delete("profile")
+
+        assert broadcasts == [["profile"], ["profile"]]
+        assert tiers.get("problem_detail_sum_v1") == {"id": 1}
@@ -0,0 +1,75 @@
+"""
+Tests for the verdict cache.
+"""
+
+import pytest
+
+from apps.problems.services import judge_service
+from apps.problems.services.judge_service import JudgeService
+from apps.problems.services.problem_service import ProblemService
+from apps.problems.services.verdict_cache import VerdictCache
+
+SOLUTION = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+
+class TestCodeHash:
+    """Test code normalization."""
+
+    def test_whitespace_only_changes_hash_the_same(self):
+        """Test that line endings and trailing whitespace are ignored."""
+        reformatted = "\n\r\na, b = map(int, input().split())   \r\nprint(a + b)\n\n\n"
+
+        assert VerdictCache.hash_code(reformatted) == VerdictCache.hash_code(SOLUTION)
+
+    def test_indentation_is_significant(self):
+        """Test that indentation changes produce a different hash."""
+        assert VerdictCache.hash_code("if x:\n    y\n") != VerdictCache.hash_code("if x:\ny\n")
+
+
+@pytest.mark.django_db
+class TestCachedSubmission:
+    """Test that identical resubmissions reuse earlier verdicts."""
+
+    def test_identical_resubmission_is_answered_from_cache(self, user, problem):
+        """Test that a cached verdict finishes the submission immediately."""
+        verdict = {"status": "accepted", "runtime": 12, "memory": 9000, "error_message": ""}
+        VerdictCache.set(
+            problem.id, problem.tests_version, "python", VerdictCache.hash_code(SOLUTION), verdict
+        )
+
+        submission = ProblemService.create_submission(user, problem.id, SOLUTION + "\n", "python")
+
+        assert submission.status == "accepted"
+        assert submission.runtime == 12
+        assert submission.memory == 9000
+
+    def test_editing_examples_invalidates_cache(self, user, problem):
+        """Test that changing the tests moves the problem to a new revision."""
+        code_hash = VerdictCache.hash_code(SOLUTION)
+        VerdictCache.set(
+            problem.id, problem.tests_version, "python", code_hash, {"status": "accepted"}
+        )
+
+        problem.examples = [{"input": "2 2\n", "output": "4\n"}]
+        problem.save()
+
+        assert problem.tests_version == 2
+        submission = ProblemService.create_submission(user, problem.id, SOLUTION, "python")
+        assert submission.status == "pending"
+        assert submission.code_hash == code_hash
+
+    def test_runner_crash_is_not_cached(self, problem, monkeypatch):
+        """Test that an error verdict, which a dead batch runner also produces, is not reused."""
+        crashed = {
+            "status": "error",
+            "runtime": 2000,
+            "memory": 0,
+            "error_message": "Runtime error on test 1:",
+            "test_results": [],
+        }
+        monkeypatch.setattr(judge_service, "run_in_pool", lambda *args, **kwargs: crashed)
+
+        JudgeService.evaluate(problem, SOLUTION, "python")
+
+        code_hash = VerdictCache.hash_code(SOLUTION)
+        assert VerdictCache.get(problem.id, problem.tests_version, "python", code_hash) is None
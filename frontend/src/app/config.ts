@@ -1,7 +1,10 @@
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api/v1'
+// Submission event streams are served by the ASGI app; defaults to the API host.
+const EVENTS_BASE_URL = import.meta.env.VITE_EVENTS_BASE_URL || API_BASE_URL
 
 export const config = {
   apiBaseUrl: API_BASE_URL,
+  eventsBaseUrl: EVENTS_BASE_URL,
   tokenKey: 'access_token',
   refreshTokenKey: 'refresh_token',
 }
@@ -1,9 +1,9 @@
 import { create } from 'zustand'
-import { Problem, Submission } from '@/types'
+import { Problem, ProblemSummary, Submission } from '@/types'
 import { problemService } from '@/services/problem.service'
 
 interface ProblemState {
-  problems: Problem[]
+  problems: ProblemSummary[]
   currentProblem: Problem | null
   submissions: Submission[]
   isLoading: boolean
@@ -29,8 +29,8 @@ export const useProblemStore = create<ProblemState>((set) => ({
   fetchProblems: async (filters) => {
     set({ isLoading: true, error: null })
     try {
-      const problems = await problemService.getProblems(filters)
-      set({ problems, isLoading: false })
+      const page = await problemService.getProblems(filters)
+      set({ problems: page.results, isLoading: false })
     } catch (error) {
       const message = error instanceof Error ? error.message : 'Failed to fetch problems'
       set({ error: message, isLoading: false })
@@ -66,8 +66,8 @@ export const useProblemStore = create<ProblemState>((set) => ({
   fetchUserSubmissions: async () => {
     set({ isLoading: true, error: null })
     try {
-      const submissions = await problemService.getUserSubmissions()
-      set({ submissions, isLoading: false })
+      const page = await problemService.getUserSubmissions()
+      set({ submissions: page.results, isLoading: false })
     } catch (error) {
       const message = error instanceof Error ? error.message : 'Failed to fetch submissions'
       set({ error: message, isLoading: false })
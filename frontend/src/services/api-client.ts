@@ -23,6 +23,11 @@ class ApiClient {
         if (token) {
           config.headers.Authorization = `Bearer ${token}`
         }
+        // Retries of this request (token refresh, network errors) reuse the key,
+        // so the server answers them with the original response.
+        if (config.method === 'post' && !config.headers['Idempotency-Key']) {
+          config.headers['Idempotency-Key'] = crypto.randomUUID()
+        }
         return config
       },
       (error) => {
@@ -34,7 +39,21 @@ class ApiClient {
     this.client.interceptors.response.use(
       (response) => response,
       async (error: AxiosError) => {
-        const originalRequest = error.config as AxiosRequestConfig & { _retry?: boolean }
+        const originalRequest = error.config as AxiosRequestConfig & {
+          _retry?: boolean
+          _networkRetry?: boolean
+        }
+
+        // No response: the request may or may not have reached the server. Resend
+        // once when the idempotency key makes that safe.
+        if (
+          !error.response &&
+          originalRequest?.headers?.['Idempotency-Key'] &&
+          !originalRequest._networkRetry
+        ) {
+          originalRequest._networkRetry = true
+          return this.client(originalRequest)
+        }
 
         // Handle 401 errors - attempt to refresh token
         if (error.response?.status === 401 && !originalRequest._retry) {
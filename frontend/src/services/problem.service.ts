@@ -1,13 +1,47 @@
 import { apiClient } from './api-client'
-import { Problem, Submission } from '@/types'
+import { config } from '@/app/config'
+import {
+  CursorPage,
+  Problem,
+  ProblemSummary,
+  Submission,
+  SubmissionStatusEvent,
+  TagCount,
+} from '@/types'
+
+const FINAL_STATUSES = new Set<Submission['status']>([
+  'accepted',
+  'wrong_answer',
+  'time_limit_exceeded',
+  'memory_limit_exceeded',
+  'error',
+])
+
+const STREAM_RECONNECT_DELAY_MS = 1000
 
 export const problemService = {
-  async getProblems(filters?: { difficulty?: string; tags?: string }): Promise<Problem[]> {
+  async getProblems(
+    filters?: { difficulty?: string; tags?: string; match?: 'all' | 'any' },
+    cursor?: string
+  ): Promise<CursorPage<ProblemSummary>> {
     const params = new URLSearchParams()
     if (filters?.difficulty) params.append('difficulty', filters.difficulty)
     if (filters?.tags) params.append('tags', filters.tags)
+    if (filters?.match) params.append('match', filters.match)
+    if (cursor) params.append('cursor', cursor)
+
+    return apiClient.get<CursorPage<ProblemSummary>>(`/problems/?${params.toString()}`)
+  },
+
+  async searchProblems(query: string): Promise<ProblemSummary[]> {
+    const page = await apiClient.get<{ results: ProblemSummary[] }>('/problems/search/', {
+      params: { q: query },
+    })
+    return page.results
+  },
 
-    return apiClient.get<Problem[]>(`/problems/?${params.toString()}`)
+  async getTags(): Promise<TagCount[]> {
+    return apiClient.get<TagCount[]>('/problems/tags/')
   },
 
   async getProblem(slug: string): Promise<Problem> {
@@ -22,7 +56,51 @@ export const problemService = {
     return apiClient.post<Submission>('/problems/submit/', data)
   },
 
-  async getUserSubmissions(): Promise<Submission[]> {
-    return apiClient.get<Submission[]>('/problems/submissions/')
+  async getUserSubmissions(cursor?: string): Promise<CursorPage<Submission>> {
+    return apiClient.get<CursorPage<Submission>>('/problems/submissions/', {
+      params: cursor ? { cursor } : undefined,
+    })
+  },
+
+  /**
+   * Follow a submission's judge status over server-sent events instead of polling.
+   * The stream is opened with a single-use ticket, so the JWT never appears in a URL.
+   * Returns a function that closes the stream.
+   */
+  watchSubmission(id: number, onEvent: (event: SubmissionStatusEvent) => void): () => void {
+    let source: EventSource | null = null
+    let closed = false
+
+    const close = () => {
+      closed = true
+      source?.close()
+    }
+
+    const open = async () => {
+      const { ticket } = await apiClient.post<{ ticket: string }>(
+        `/problems/submissions/${id}/events/ticket/`
+      )
+      if (closed) return
+      source = new EventSource(
+        `${config.eventsBaseUrl}/problems/submissions/${id}/events/?ticket=${encodeURIComponent(ticket)}`
+      )
+      source.addEventListener('status', (message) => {
+        const event: SubmissionStatusEvent = JSON.parse((message as MessageEvent<string>).data)
+        onEvent(event)
+        if (FINAL_STATUSES.has(event.status)) {
+          close()
+        }
+      })
+      // EventSource would retry with the spent ticket; reconnect with a fresh one instead.
+      source.onerror = () => {
+        source?.close()
+        if (!closed) {
+          setTimeout(() => void open().catch(close), STREAM_RECONNECT_DELAY_MS)
+        }
+      }
+    }
+
+    void open().catch(close)
+    return close
   },
 }
@@ -43,6 +43,13 @@ export interface Problem {
   updated_at: string
 }
 
+export type ProblemSummary = Pick<Problem, 'id' | 'slug' | 'title' | 'difficulty' | 'tags'>
+
+export interface TagCount {
+  name: string
+  problem_count: number
+}
+
 export interface Submission {
   id: number
   problem: number
@@ -50,13 +57,30 @@ export interface Submission {
   username: string
   code: string
   language: string
-  status: 'pending' | 'accepted' | 'wrong_answer' | 'error'
+  status:
+    | 'pending'
+    | 'running'
+    | 'accepted'
+    | 'wrong_answer'
+    | 'time_limit_exceeded'
+    | 'memory_limit_exceeded'
+    | 'error'
   runtime?: number
   memory?: number
   error_message?: string
   submitted_at: string
 }
 
+export type SubmissionStatusEvent = Pick<
+  Submission,
+  'id' | 'status' | 'runtime' | 'memory' | 'error_message'
+>
+
+export interface CursorPage<T> {
+  next: string | null
+  results: T[]
+}
+
 export interface ApiError {
   message: string
   errors?: Record<string, string[]>